@@ -0,0 +1,59 @@
+import comms
+
+'''Conversions between arm joint values and the arm packets of comms.Protocol'''
+
+JOINT_COUNT = 4 # Joints on the arm, base to wrist
+ANGLE_SCALE = 1000.0 # Radians to the milliradians that are sent
+CURRENT_SCALE = 1000.0 # Amps to the milliamps that are sent
+
+_SEQUENCE_MODULO = 1 << 16
+_SHORT_MIN = -(1 << 15)
+_SHORT_MAX = (1 << 15) - 1
+
+def _to_short(value, scale):
+    '''Scales a float to a short, saturating instead of overflowing'''
+    return max(_SHORT_MIN, min(_SHORT_MAX, int(round(value * scale))))
+
+def next_sequence(sequence):
+    '''Returns the sequence number that follows the given one'''
+    return (sequence + 1) % _SEQUENCE_MODULO
+
+def is_newer(sequence, last):
+    '''
+    Returns True if `sequence` was sent after `last`, taking wrap around into account
+
+    UDP can reorder packets, older ones should be ignored. If `last` is None every sequence is newer.
+    '''
+    if last is None:
+        return True
+    difference = (sequence - last) % _SEQUENCE_MODULO
+    return 0 < difference < _SEQUENCE_MODULO // 2
+
+def setpoints_packet(sequence, angles):
+    '''Returns an arm_setpoints packet for the given joint angles in radians'''
+    packet = {"type": comms.Protocol.arm_setpoints, "sequence": sequence}
+    for i in range(JOINT_COUNT):
+        packet["joint_" + str(i + 1)] = _to_short(angles[i], ANGLE_SCALE)
+    return packet
+
+def read_setpoints(packet):
+    '''Returns a tuple of the format (sequence, angles) from an arm_setpoints packet, angles are in radians'''
+    angles = [packet["joint_" + str(i + 1)] / ANGLE_SCALE for i in range(JOINT_COUNT)]
+    return packet["sequence"], angles
+
+def state_packet(sequence, positions, currents):
+    '''Returns an arm_state packet for the given joint angles in radians and motor currents in amps'''
+    packet = {"type": comms.Protocol.arm_state, "sequence": sequence}
+    for i in range(JOINT_COUNT):
+        packet["position_" + str(i + 1)] = _to_short(positions[i], ANGLE_SCALE)
+        packet["current_" + str(i + 1)] = _to_short(currents[i], CURRENT_SCALE)
+    return packet
+
+def read_state(packet):
+    '''
+    Returns a tuple of the format (sequence, positions, currents) from an arm_state packet
+    Positions are in radians and currents in amps
+    '''
+    positions = [packet["position_" + str(i + 1)] / ANGLE_SCALE for i in range(JOINT_COUNT)]
+    currents = [packet["current_" + str(i + 1)] / CURRENT_SCALE for i in range(JOINT_COUNT)]
+    return packet["sequence"], positions, currents
@@ -0,0 +1,77 @@
+#! /usr/bin/env python2
+import os
+import socket
+import sys
+
+import comms
+import arm_channel
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+import benchmark
+
+'''
+Benchmarks of comms, run by benchmark.py at the root of the repository or on its own:
+
+    python benchmark_comms.py [--repeat 5]
+
+Packing and unpacking time one packet. The loopback case sends BATCH packets over UDP on this machine to a
+comms server and receives them from its queue, which times the listening thread and the queue as well.
+'''
+
+# Packets in flight in the loopback case, few enough that the socket buffer never drops one
+BATCH = 32
+
+
+def free_port(host="127.0.0.1"):
+    '''Returns a UDP port nothing is bound to'''
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def loopback(host="127.0.0.1"):
+    '''
+    Starts a comms server on this machine
+    :return: A function sending BATCH movement packets to the server and receiving them, and one stopping it
+    '''
+    port = free_port(host)
+    comms.setup_server(host, port)
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    data = comms.pack_message({"type": comms.Protocol.movement, "throttle": 100, "steering": -20})
+
+    def send_and_receive():
+        for i in range(BATCH):
+            client.sendto(data, (host, port))
+        for i in range(BATCH):
+            comms.receive_message(block=True)
+
+    def stop():
+        client.close()
+        comms.shutdown()
+    return send_and_receive, stop
+
+
+def cases(repeat):
+    send_and_receive, stop = loopback()
+    try:
+        movement = {"type": comms.Protocol.movement, "throttle": 100, "steering": -20}
+        movement_data = comms.pack_message(movement)
+        state = arm_channel.state_packet(1, [0.5, -0.25, 1.0, 0.1], [1.5, 0.2, 0.3, 0.4])
+        state_data = comms.pack_message(state)
+
+        return [
+            benchmark.measure("pack movement", lambda: comms.pack_message(movement), repeat=repeat),
+            benchmark.measure("unpack movement", lambda: comms.unpack_message(movement_data), repeat=repeat),
+            benchmark.measure("pack arm state", lambda: comms.pack_message(state), repeat=repeat),
+            benchmark.measure("unpack arm state", lambda: arm_channel.read_state(comms.unpack_message(state_data)),
+                              repeat=repeat),
+            benchmark.measure("loopback movement packet", send_and_receive, BATCH, repeat),
+        ]
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    benchmark.main(cases, "Benchmarks comms packing and loopback throughput")
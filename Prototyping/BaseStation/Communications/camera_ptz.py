@@ -1,10 +1,16 @@
-import urllib
-import urllib2
 import base64
+import httplib
+import socket
+import threading
+import time
 
 """
 This module implements a subset of the Messoa IP Camera protocol for panning,
 tilting, and zooming.
+
+PTZCamera sends one blocking request per call over a persistent connection.
+PTZController drives several cameras from input callbacks without blocking them,
+see test_ptz_server.py for a stand-in camera to run it against.
 """
 
 class PTZCamera:
@@ -13,12 +19,15 @@ class PTZCamera:
     """
     Initialize a PTZCamera.
 
-    `camera_address` is a string for the address to the camera (IP or symbolic)
+    `camera_address` is a string for the address to the camera (IP or symbolic),
+    optionally followed by :port
 
     `username` and `password` are the credentials as strings for authenticating with the
     camera's web interface.
+
+    `timeout` is the number of seconds to wait for the camera before giving up on a request
     """
-    def __init__(self, camera_address, username, password):
+    def __init__(self, camera_address, username, password, timeout=2.0):
         base64_credentials = base64.b64encode("{}:{}".format(username,
                                                              password))
         self._headers = {
@@ -26,19 +35,38 @@ class PTZCamera:
             'Authorization': 'Basic {credentials}'.format(
                 credentials=base64_credentials)
         }
-        self._base_url =  "http://{cam_addr}/".format(cam_addr=camera_address)
+        self._address = camera_address
+        self._timeout = timeout
+        self._connection = None
 
     """
     Sends a GET request to the camera to the root address `relative_url` (as a string)
     with the URL arguments `values` (a dictionary of string keys and values)
+
+    The connection is kept open between requests. If the camera closed it in the meantime
+    the request is retried once on a new connection. Returns the HTTP status.
     """
     def _send_data(self, relative_url, values):
         data = list()
         for key, value in values.items():
             data.append("=".join((key, value)))
-        url = self._base_url + relative_url + "?" + "&".join(data)
-        req = urllib2.Request(url, headers=self._headers)
-        response = urllib2.urlopen(req)
+        url = "/" + relative_url + "?" + "&".join(data)
+
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = httplib.HTTPConnection(self._address, timeout=self._timeout)
+            try:
+                self._connection.request("GET", url, headers=self._headers)
+                response = self._connection.getresponse()
+                # The body has to be read before the connection can be used again
+                response.read()
+                if response.getheader("connection", "").lower() == "close":
+                    self.close()
+                return response.status
+            except (httplib.HTTPException, socket.error):
+                self.close()
+                if attempt == 1:
+                    raise
 
     """
     Sends the x and y speeds to the camera. They must be integers between
@@ -49,13 +77,148 @@ class PTZCamera:
             'continuouspantiltmove': '{x_speed},{y_speed}'.format(
                 x_speed=x_speed, y_speed=y_speed)
         }
-        self._send_data("ptz.cgi", values)
+        return self._send_data("ptz.cgi", values)
+
+    """
+    Closes the connection to the camera, the next request opens a new one
+    """
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class _CameraWorker:
+    """Sends the speeds of one camera on a thread of its own"""
+
+    def __init__(self, camera, period):
+        self.camera = camera
+        self.period = period
+
+        self.pending = None # Latest speeds that haven't been sent
+        self.last_sent = (0, 0)
+        self.next_send = 0
+        self.stopping = False
+        self.condition = threading.Condition()
+
+        self.updates = 0
+        self.requests = 0
+        self.errors = 0
+        self.last_error = None
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+
+    def update(self, speeds):
+        """Replaces the pending speeds, called from the input thread"""
+        with self.condition:
+            self.updates += 1
+            self.pending = speeds
+            self.condition.notify()
+
+    def stop(self):
+        """Stops the camera if it is moving and waits for the thread to finish"""
+        with self.condition:
+            self.pending = (0, 0)
+            self.stopping = True
+            self.condition.notify()
+        self.thread.join()
+        self.camera.close()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopping:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                # Wait for the next request to be allowed, updates arriving meanwhile replace the pending speeds
+                wait = self.next_send - time.time()
+                if wait > 0 and not self.stopping:
+                    self.condition.wait(wait)
+                    continue
+                speeds = self.pending
+                self.pending = None
+                stopping = self.stopping
+
+            if speeds != self.last_sent:
+                self.next_send = time.time() + self.period
+                self.requests += 1
+                try:
+                    self.camera.set_speeds(*speeds)
+                    self.last_sent = speeds
+                except (httplib.HTTPException, socket.error) as e:
+                    self.errors += 1
+                    self.last_error = e
+                    # Try again after the period unless newer speeds arrived
+                    with self.condition:
+                        if self.pending is None:
+                            self.pending = speeds
+            if stopping:
+                return
+
+
+class PTZController:
+    """
+    Sends the speeds of several cameras without blocking the caller
+
+    set_speeds only stores the speeds. Every camera has its own thread that sends at most
+    `rate` requests a second, always the latest speeds, so input that changes faster than
+    the camera can take is coalesced instead of queued. A slow camera doesn't hold up the
+    others or the input thread.
+    """
+
+    """
+    `cameras` is a dictionary of camera name to PTZCamera
+
+    `rate` is the maximum number of requests sent to each camera every second
+    """
+    def __init__(self, cameras, rate=10):
+        self._workers = dict((name, _CameraWorker(camera, 1.0 / rate)) for name, camera in cameras.items())
+
+    """
+    Starts the thread of every camera
+    """
+    def start(self):
+        for worker in self._workers.values():
+            worker.thread.start()
+
+    """
+    Stops every camera and its thread
+    """
+    def stop(self):
+        for worker in self._workers.values():
+            worker.stop()
+
+    """
+    Sets the x and y speeds of the camera named `name`, integers between -100 and 100.
+    Returns right away, the speeds are sent by the thread of the camera.
+    """
+    def set_speeds(self, name, x_speed, y_speed):
+        self._workers[name].update((int(x_speed), int(y_speed)))
+
+    """
+    Returns a dictionary of camera name to a dictionary of counters: updates given to
+    set_speeds, requests sent, updates coalesced away and requests that failed
+    """
+    def stats(self):
+        stats = dict()
+        for name, worker in self._workers.items():
+            stats[name] = {
+                "updates": worker.updates,
+                "requests": worker.requests,
+                "coalesced": worker.updates - worker.requests,
+                "errors": worker.errors
+            }
+        return stats
 
 if __name__ == "__main__":
     import sys
-    import time
     camera_ip, username, password = sys.argv[1:]
     cam_instance = PTZCamera(camera_ip, username, password)
     cam_instance.set_speeds(-100, -100)
     time.sleep(5)
     cam_instance.set_speeds(100, 100)
+    time.sleep(5)
+    cam_instance.set_speeds(0, 0)
+    cam_instance.close()
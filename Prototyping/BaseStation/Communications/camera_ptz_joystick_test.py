@@ -1,93 +1,62 @@
 # -*- coding: utf-8 -*-
 
+import os
+import sys
 import time
 import signal
-import threading
+import argparse
 
-import sdl2
-import sdl2.ext
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ui", "ui_components"))
+import joystick_rewrite
 
 import camera_ptz
 
-class PTZController:
-    def __init__(self, camera_ip, username, password):
+"""
+Pans and tilts cameras with joysticks, the first joystick drives the first camera and so on
 
-        self.x_speed = 0
-        self.y_speed = 0
-        self.last_x_sent = 0
-        self.last_y_sent = 0
-        self.camera_instance = camera_ptz.PTZCamera(camera_ip, username, password)
-        self._sdl2_update_thread = threading.Thread(target=self._update_sdl2)
-        self._sdl2_update_thread.daemon = True
-        self._value_lock = threading.Lock()
-        self._stopping = False
+The joystick thread only hands the speeds to a PTZController, which sends them to the
+cameras on threads of their own at a limited rate.
+"""
 
-        # Setup SDL2
-        sdl2.SDL_Init(sdl2.SDL_INIT_JOYSTICK)
-        #sdl2.SDL_Init(sdl2.SDL_INIT_VIDEO)
-        self.joystick = sdl2.SDL_JoystickOpen(0)
+# Speed the cameras move at while a stick is pushed past the deadzone
+SPEED = 50
 
-    def _update_sdl2(self):
-        while not self._stopping:
-            with self._value_lock:
-                for event in sdl2.ext.get_events():
-                    if event.type == sdl2.SDL_KEYDOWN:
-                        print(sdl2.SDL_GetKeyName(event.key.keysym.sym).lower())
-                    elif event.type == sdl2.SDL_JOYAXISMOTION:
-                        #print(event.jaxis.which, "axis motion:", "-", "axis:", event.jaxis.axis, "value:", event.jaxis.value)
-                        #if abs(event.jaxis.value) > 32768 * 0.9:
-                        #    target_speed = (event.jaxis.value / abs(event.jaxis.value)) * 75
-                        if abs(event.jaxis.value) > 32768 * 0.3:
-                            target_speed = (event.jaxis.value / abs(event.jaxis.value)) * 50
-                        else:
-                            target_speed = 0
+class PTZJoystick:
+    def __init__(self, camera_ips, username, password, rate=10):
+        self.cameras = list(camera_ips)
+        self.controller = camera_ptz.PTZController(
+            dict((ip, camera_ptz.PTZCamera(ip, username, password)) for ip in self.cameras), rate)
+        self._stopping = False
 
-                        if event.jaxis.axis == 1:
-                            self.y_speed = target_speed
-                            #self.y_speed = int(round(event.jaxis.value / 32768.0, 1)*75)
-                        elif event.jaxis.axis == 0:
-                            self.x_speed = target_speed
-                            #self.x_speed = int(round(event.jaxis.value / 32768.0, 1)*75)
-                    elif event.type == sdl2.SDL_JOYBALLMOTION:
-                        print(event.jball.which, "ball motion", "-", "ball:", event.jball.ball, "xrel:", event.jball.xrel, "yrel:", event.jball.yrel)
-                    elif event.type == sdl2.SDL_JOYHATMOTION:
-                        print(event.jhat.which, "hat motion", "-", "hat:", event.jhat.hat, "value:", event.jhat.value)
-                    elif event.type == sdl2.SDL_JOYBUTTONDOWN:
-                        print(event.jbutton.which, "button down", "-", "button:", event.jbutton.button, "state:", event.jbutton.state)
-                    elif event.type == sdl2.SDL_JOYBUTTONUP:
-                        print(event.jbutton.which, "button up", "-", "button:", event.jbutton.button, "state:", event.jbutton.state)
-                    elif event.type == sdl2.SDL_JOYDEVICEADDED:
-                        print(event.jdevice.which, "joystick added")
-                        self.joystick = sdl2.SDL_JoystickOpen(0)
-                    elif event.type == sdl2.SDL_JOYDEVICEREMOVED:
-                        print(event.jdevice.which, "joystick removed")
-            time.sleep(1.0 / 120.0)
-
-    def _send_speeds(self):
-        while not self._stopping:
-            with self._value_lock:
-                if self.last_x_sent != self.x_speed or self.last_y_sent != self.y_speed:
-                    print self.x_speed, self.y_speed
-                    #if (self.x_speed != self.last_x_sent) or (self.y_speed != self.last_y_sent):
-                    #    self.camera_instance.set_speeds(0, 0)
-                    self.camera_instance.set_speeds(self.x_speed, self.y_speed)
-                    self.last_x_sent = self.x_speed
-                    self.last_y_sent = self.y_speed
-            time.sleep(1.0 / 50.0)
+    def update(self, state):
+        if state.id >= len(self.cameras) or len(state.axis) < 2:
+            return
+        x_speed = cmp(state.axis[0], 0) * SPEED
+        y_speed = cmp(state.axis[1], 0) * SPEED
+        self.controller.set_speeds(self.cameras[state.id], x_speed, y_speed)
 
     def start_loops(self):
-        self._sdl2_update_thread.start()
-        self._send_speeds()
+        self.controller.start()
+        joystick_rewrite.joystick_manager.subscribe(self.update, axes=[0, 1])
+        joystick_rewrite.joystick_manager.start(deadzone=.3)
+        while not self._stopping:
+            time.sleep(.1)
+        joystick_rewrite.joystick_manager.stop()
+        self.controller.stop()
+        print self.controller.stats()
 
     def stop_loops(self, *args):
-        with self._value_lock:
-            self._stopping = True
-        self._sdl2_update_thread.join()
-        
+        self._stopping = True
+
 if __name__ == '__main__':
-    import sys
-    camera_ip, username, password = sys.argv[1:]
-    controller = PTZController(camera_ip, username, password)
+    parser = argparse.ArgumentParser(description="Pans and tilts cameras with joysticks")
+    parser.add_argument("username")
+    parser.add_argument("password")
+    parser.add_argument("camera_ips", nargs="+", help="Address of each camera, optionally with :port")
+    parser.add_argument("--rate", type=int, default=10, help="Most requests sent to a camera every second")
+    args = parser.parse_args()
+
+    controller = PTZJoystick(args.camera_ips, args.username, args.password, args.rate)
     signal.signal(signal.SIGINT, controller.stop_loops)
     signal.signal(signal.SIGTERM, controller.stop_loops)
     controller.start_loops()
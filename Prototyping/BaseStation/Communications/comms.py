@@ -24,14 +24,19 @@ class Protocol:
            - They are also used in the returned packet data
            - They should not contain 'type' to prevent conflicting the existing field in the resulting parsed packet
 
-    NOTE: The definitions are overridden during runtime with the header byte
-        during _compile_protocol()
+    NOTE: The definitions are overridden with the header byte by _compile_protocol()
+        when this module is imported, so packets can be built before comms is setup
     '''
 
     # TODO: Implement actual protocol here
     emergency_stop = [0, None, None]
     movement = [1, "<hh", ("throttle", "steering")]
     gps_coords = [2, "<ff", ("longitude", "latitude")]
+    # Joint angles in milliradians from the base to the wrist, the sequence number wraps around at 65536
+    arm_setpoints = [3, "<Hhhhh", ("sequence", "joint_1", "joint_2", "joint_3", "joint_4")]
+    # Measured joint angles in milliradians and motor currents in milliamps from the base to the wrist
+    arm_state = [4, "<Hhhhhhhhh", ("sequence", "position_1", "position_2", "position_3", "position_4",
+                                   "current_1", "current_2", "current_3", "current_4")]
 
 def _setup_globals():
     '''Defines the global variables'''
@@ -99,19 +104,48 @@ def _listen_loop():
         except Exception:
             break
         if data:
-            packet_type = data[0] # TODO: Don't hardcode to a byte like the rest of the code
-            payload = data[1:]
-            struct_obj, descriptor = _header_struct_dict[packet_type]
-            packet = dict()
-            packet["type"] = packet_type
-            if struct_obj:
-                data_tuple = struct_obj.unpack(payload)
-                for i in range(len(descriptor)):
-                    packet[descriptor[i]] = data_tuple[i]
-            _receive_buffer.put((packet, addr), True)
+            _receive_buffer.put((unpack_message(data), addr), True)
         with _global_lock:
             is_stopping = _stopping
 
+def pack_message(packet):
+    '''
+    Returns the bytes for the given packet. `packet` has the same format as the packet in receive_message(). Extraneous fields in packet are ignored.
+
+    Can be used without setting up communications, for code that owns its own socket.
+    '''
+    _compile_protocol()
+    if "type" not in packet:
+        raise Exception("packet has no type key")
+    struct_obj, descriptor = _header_struct_dict[packet["type"]]
+    data = packet["type"]
+    if struct_obj:
+        values_to_pack = list()
+        for label in descriptor:
+            if label not in packet:
+                raise Exception("packet has no key: " + label)
+            values_to_pack.append(packet[label])
+        data += struct_obj.pack(*values_to_pack)
+    return data
+
+def unpack_message(data):
+    '''
+    Returns the packet dictionary for the given bytes, the reverse of pack_message()
+
+    Can be used without setting up communications, for code that owns its own socket.
+    '''
+    _compile_protocol()
+    packet_type = data[0] # TODO: Don't hardcode to a byte like the rest of the code
+    payload = data[1:]
+    struct_obj, descriptor = _header_struct_dict[packet_type]
+    packet = dict()
+    packet["type"] = packet_type
+    if struct_obj:
+        data_tuple = struct_obj.unpack(payload)
+        for i in range(len(descriptor)):
+            packet[descriptor[i]] = data_tuple[i]
+    return packet
+
 def _common_presetup():
     '''Setup functions common to both server and client'''
     _compile_protocol()
@@ -189,17 +223,7 @@ def send_message(packet, addr=None):
             raise Exception("addr has been omitted for a non-client setup")
     if not addr:
         addr = _server_address
-    if "type" not in packet:
-        raise Exception("packet has no type key")
-    struct_obj, descriptor = _header_struct_dict[packet["type"]]
-    data = packet["type"]
-    if struct_obj:
-        values_to_pack = list()
-        for label in descriptor:
-            if label not in packet:
-                raise Exception("packet has no key: " + label)
-            values_to_pack.append(packet[label])
-        data += struct_obj.pack(*values_to_pack)
+    data = pack_message(packet)
     with _global_lock:
         _sock.sendto(data, addr)
     if mode == "client":
@@ -233,3 +257,4 @@ def shutdown():
         _setup_globals()
 
 _setup_globals()
+_compile_protocol()
@@ -0,0 +1,103 @@
+import collections
+
+from teleop import Histogram, now
+
+'''
+Latency of teleop drive commands, from the joystick to the motors of the rover
+
+Every drive packet carries a trace id and the time it was sent. The rover stamps the trace with its own
+monotonic clock when it receives the packet and when it first writes a motor with it, and sends those times
+back with its telemetry along with the time of the reply, see Rover/BBB/latency.py. The two clocks don't
+agree, so the offset between them is worked out like NTP does from the four times of each round trip,
+keeping the estimate of the round trip that took the least time. With the offset the one way network
+latency and the latency from the joystick changing to the first motor write are known.
+
+Only the first trace to reach the motors after the joystick changes counts towards the end to end latency,
+the ones after it would only measure how long the joystick was left alone. It isn't always the trace of the
+first packet with the change, the rover only follows the newest packet it has and drops the others when its
+main loop is slower than the drive packets.
+'''
+
+# Trace ids wrap around after this
+_ID_MODULO = 1 << 32
+
+
+class TeleopLatency(object):
+    '''
+    Traces the drive packets sent by one thread
+
+    The histograms are "send_wait" from the joystick changing to the packet with the change being sent,
+    "network" from sending to the main loop of the rover reading it from its socket, "rover" from receiving
+    to the first motor write and "end_to_end" from the joystick changing to the first motor write
+    '''
+
+    def __init__(self, rounds=32, pending=256):
+        '''
+        :param rounds: Round trips the clock offset is picked from
+        :param pending: Packets waiting for their reply that are remembered
+        '''
+        self.offset = None # Rover clock minus base station clock, None until the first reply
+        self.round_trip = None # Round trip the offset was measured with
+        self.histograms = dict((name, Histogram()) for name in ("send_wait", "network", "rover", "end_to_end"))
+
+        self._next_id = 1
+        self._last_input = None
+        self._counted_input = None # Joystick change whose end to end latency is in the histogram already
+        self._rounds = collections.deque(maxlen=rounds)
+        self._pending = collections.OrderedDict()
+        self._pending_limit = pending
+
+    def sent(self, input_time):
+        '''
+        Starts a trace for a drive packet about to be sent
+        :param input_time: now() when the joystick values the packet carries were read
+        :return: Tuple of (trace id, time sent) to put in the packet
+        '''
+        trace_id = self._next_id
+        self._next_id = self._next_id % (_ID_MODULO - 1) + 1 # 0 is an untraced packet
+        sent = now()
+        fresh = input_time is not None and input_time != self._last_input
+        self._last_input = input_time
+        if fresh:
+            self.histograms["send_wait"].add(sent - input_time)
+
+        self._pending[trace_id] = (sent, input_time)
+        while len(self._pending) > self._pending_limit:
+            self._pending.popitem(last=False)
+        return trace_id, sent
+
+    def replied(self, trace_id, received, motors, replied):
+        '''
+        Takes in the trace of a telemetry packet of the rover
+        :param trace_id: Latest drive packet the rover received
+        :param received: When the rover received it, on the rover clock
+        :param motors: When the rover first wrote a motor with it, 0 if it hasn't yet
+        :param replied: When the rover sent the telemetry packet
+        :return: End to end latency in seconds of the packet, None if it isn't known
+        '''
+        arrived = now()
+        trace = self._pending.get(trace_id)
+        if trace is None or not received:
+            return None
+        sent, input_time = trace
+
+        # The network takes as long both ways and the rover held the packet for replied - received
+        round_trip = (arrived - sent) - (replied - received)
+        self._rounds.append((round_trip, ((received - sent) + (replied - arrived)) / 2))
+        self.round_trip, self.offset = min(self._rounds)
+
+        if not motors:
+            return None
+        del self._pending[trace_id]
+        self.histograms["network"].add(received - self.offset - sent)
+        self.histograms["rover"].add(motors - received)
+        if input_time is None or input_time == self._counted_input:
+            return None
+        self._counted_input = input_time
+        end_to_end = motors - self.offset - input_time
+        self.histograms["end_to_end"].add(end_to_end)
+        return end_to_end
+
+    def summary(self):
+        '''Returns a dictionary of histogram name to its summary'''
+        return dict((name, histogram.summary()) for name, histogram in self.histograms.items())
@@ -0,0 +1,97 @@
+import ctypes
+import ctypes.util
+import math
+import time
+
+'''
+What the base station and the rover share about teleop: the formats of the packets between them and the clock and
+histogram of the latency tracing, see latency.py here and Rover/BBB/latency.py. Both ends load this file so they
+can't drift apart, the rover from the BaseStation folder next to its own. The fields are listed in
+packet_structure.txt.
+'''
+
+# Drive packet: auto, throttle, steering, trace id, time sent
+DRIVE_FORMAT = "<?hhId"
+
+# Drive packet of base stations from before latency tracing, without the trace id and time sent
+LEGACY_DRIVE_FORMAT = "<?hh"
+
+# GPS destination packet: more destinations follow, latitude, longitude
+GPS_FORMAT = "<?ff"
+
+# Start of the telemetry packet of the rover: potentiometer, magnetometer, encoders 1-4, latitude, longitude
+SENSOR_FORMAT = "<ffffffff"
+
+# Telemetry packet of the rover: SENSOR_FORMAT then trace id, time received, time of the first motor write and
+# time of the reply on the rover clock
+TELEMETRY_FORMAT = SENSOR_FORMAT + "Iddd"
+
+
+def _monotonic_clock():
+    '''Returns a function giving seconds on a clock that never jumps, time.time if there is none'''
+    if hasattr(time, "monotonic"):
+        return time.monotonic
+
+    class Timespec(ctypes.Structure):
+        _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+    try:
+        librt = ctypes.CDLL(ctypes.util.find_library("rt") or "librt.so.1", use_errno=True)
+        clock_gettime = librt.clock_gettime
+    except (OSError, AttributeError):
+        return time.time
+    clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(Timespec)]
+    timespec = Timespec()
+    CLOCK_MONOTONIC = 1
+
+    def monotonic():
+        clock_gettime(CLOCK_MONOTONIC, ctypes.byref(timespec))
+        return timespec.tv_sec + timespec.tv_nsec * 1e-9
+    return monotonic
+
+now = _monotonic_clock()
+
+
+class Histogram(object):
+    '''Durations in bins that double in width, from 1 microsecond to over an hour'''
+
+    BINS = 32
+
+    def __init__(self):
+        self.bins = [0] * self.BINS # Bin i holds durations up to 2 ** i microseconds
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        microseconds = seconds * 1e6
+        index = math.frexp(microseconds)[1] if microseconds >= 1 else 0
+        self.bins[min(index, self.BINS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        '''
+        :param fraction: 0.5 for the median
+        :return: Upper edge in seconds of the bin the percentile is in, 0 if empty
+        '''
+        if self.count == 0:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.bins):
+            seen += count
+            if seen >= rank and count:
+                return min(2 ** index * 1e-6, self.max)
+        return self.max
+
+    def summary(self):
+        '''Returns a dictionary of the count, mean, median, 95th percentile and max, times in milliseconds'''
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "max_ms": self.max * 1000,
+        }
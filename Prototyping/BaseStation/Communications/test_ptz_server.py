@@ -0,0 +1,58 @@
+import sys
+import time
+import threading
+import BaseHTTPServer
+import SocketServer
+
+"""
+Stand-in for the PTZ camera web interface, for testing camera_ptz without a camera
+
+Answers every request with an empty 200 over keep-alive connections and prints each
+request with its connection and the time since the previous one. `delay` makes it
+answer as slowly as a real camera.
+
+    python test_ptz_server.py [port] [delay]
+    python camera_ptz.py 127.0.0.1:8080 user password
+"""
+
+class StandInHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        now = time.time()
+        server = self.server
+        with server.lock:
+            elapsed = now - server.last_request
+            server.last_request = now
+            server.requests.append((now, self.client_address, self.path))
+
+        time.sleep(server.delay)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        print "%s %-40s %6.1f ms since previous" % (self.client_address, self.path, elapsed * 1000)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, delay=0.0):
+        BaseHTTPServer.HTTPServer.__init__(self, address, StandInHandler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.last_request = time.time()
+        self.requests = [] # Tuples of the format (time, client address, path)
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    server = StandInServer(("127.0.0.1", port), delay)
+    print "Stand-in camera on port %d" % port
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -1,7 +1,14 @@
 # http://stackoverflow.com/questions/12507274/how-to-get-bounds-of-a-google-static-map
+# The projection math now lives in the base station map widget, this module only keeps the old interface
 from __future__ import division
 import math
-MERCATOR_RANGE = 256
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "ui", "ui_components", "map"))
+import Projection
+
+MERCATOR_RANGE = Projection.WORLD_SIZE
 
 def  bound(value, opt_min, opt_max):
   if (opt_min != None): 
@@ -43,35 +50,18 @@ class MercatorProjection :
 
     def fromLatLngToPoint(self, latLng, opt_point=None) :
       point = opt_point if opt_point is not None else G_Point(0,0)
-      origin = self.pixelOrigin_
-      point.x = origin.x + latLng.lng * self.pixelsPerLonDegree_
-      # NOTE(appleton): Truncating to 0.9999 effectively limits latitude to
-      # 89.189.  This is about a third of a tile past the edge of the world tile.
-      siny = bound(math.sin(degreesToRadians(latLng.lat)), -0.9999, 0.9999)
-      point.y = origin.y + 0.5 * math.log((1 + siny) / (1 - siny)) * - self.pixelsPerLonRadian_
+      # World coordinates are the pixel coordinates at zoom level 0
+      x, y = Projection.degrees_to_pixels(0, latLng.lat, latLng.lng)
+      point.x = float(x)
+      point.y = float(y)
       return point
 
 
     def fromPointToLatLng(self,point) :
-          origin = self.pixelOrigin_
-          lng = (point.x - origin.x) / self.pixelsPerLonDegree_
-          latRadians = (point.y - origin.y) / -self.pixelsPerLonRadian_
-          lat = radiansToDegrees(2 * math.atan(math.exp(latRadians)) - math.pi / 2)
-          return G_LatLng(lat, lng)
+          lat, lng = Projection.pixels_to_degrees(0, point.x, point.y)
+          return G_LatLng(float(lat), float(lng))
 
 #pixelCoordinate = worldCoordinate * pow(2,zoomLevel)
 
 def getCorners(center, zoom, mapWidth, mapHeight):
-    scale = 2**zoom
-    proj = MercatorProjection()
-    centerPx = proj.fromLatLngToPoint(center)
-    SWPoint = G_Point(centerPx.x-(mapWidth/2)/scale, centerPx.y+(mapHeight/2)/scale)
-    SWLatLon = proj.fromPointToLatLng(SWPoint)
-    NEPoint = G_Point(centerPx.x+(mapWidth/2)/scale, centerPx.y-(mapHeight/2)/scale)
-    NELatLon = proj.fromPointToLatLng(NEPoint)
-    return {
-        'N' : NELatLon.lat,
-        'E' : NELatLon.lng,
-        'S' : SWLatLon.lat,
-        'W' : SWLatLon.lng,
-    }
+    return Projection.get_corners(zoom, center.lat, center.lng, mapWidth, mapHeight)
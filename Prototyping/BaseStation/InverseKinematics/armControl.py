@@ -16,13 +16,17 @@ ser2.close()
 ser1.open()
 ser2.open()
 
+# The motors on a port share one bus so their packets are batched and rate limited
+bus1 = SabertoothBus(ser1)
+bus2 = SabertoothBus(ser2)
+
 motors = {}
-motors["mot1"] = Sabertooth(ser2, 128, 0)
-motors["mot4"] = Sabertooth(ser2, 128, 4)
-motors["wrist_angle"] = Sabertooth(ser2, 129, 0)
-motors["base_rot"] = Sabertooth(ser2, 129, 4)
-motors["test"] = Sabertooth(ser1, 128, 0)
-motors["test_1"] = Sabertooth(ser1, 128, 4)
+motors["mot1"] = Sabertooth(bus2, 128, 0)
+motors["mot4"] = Sabertooth(bus2, 128, 4)
+motors["wrist_angle"] = Sabertooth(bus2, 129, 0)
+motors["base_rot"] = Sabertooth(bus2, 129, 4)
+motors["test"] = Sabertooth(bus1, 128, 0)
+motors["test_1"] = Sabertooth(bus1, 128, 4)
 
 def float_range(min, max):
     def float_test(x):
@@ -41,3 +45,9 @@ args = parser.parse_args()
 
 print "Running %s at %.3f for %.3fs"%(args.joint, args.strength, args.duration.total_seconds())
 motors[args.joint].write(args.strength)
+sleep(args.duration.total_seconds())
+motors[args.joint].write(0)
+
+# Sends the stop before closing the ports
+bus1.close()
+bus2.close()
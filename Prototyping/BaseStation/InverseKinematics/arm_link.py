@@ -0,0 +1,186 @@
+#!/usr/bin/env python2
+"""
+Arm side of the arm channel
+
+Receives joint setpoints from the base station, drives the joints towards them and streams the
+measured joint positions and motor currents back at a fixed rate. Runs against the real motors
+through SabertoothJoints or against simulated joints through LoopbackJoints.
+
+Run this file to start a loopback arm for testing the base station without hardware:
+    python arm_link.py --host 127.0.0.1
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Communications"))
+import comms
+import arm_channel
+
+ARM_PORT = 8842 # Port the arm listens on for setpoints
+
+
+class SabertoothJoints:
+    """
+    Joints driven by Sabertooth motors
+
+    The Sabertooth simplified serial protocol can't report anything back, so the joint angles come
+    from read_positions and the currents are reported as zero.
+    """
+
+    def __init__(self, motors, read_positions):
+        """
+        motors: A Sabertooth for each joint, base to wrist. Put them on a SabertoothBus so the
+            commands of every joint are sent together
+        read_positions: A function returning the angle of each joint in radians
+        """
+        self.motors = motors
+        self.read_positions = read_positions
+
+    def drive(self, powers):
+        """Sets each motor to a power from -1 to 1"""
+        for motor, power in zip(self.motors, powers):
+            motor.write(power)
+
+    def read(self):
+        """Returns a tuple of the joint angles in radians and the motor currents in amps"""
+        return list(self.read_positions()), [0.0] * len(self.motors)
+
+    def close(self):
+        for motor in self.motors:
+            motor.write(0)
+
+
+class LoopbackJoints:
+    """
+    Simulated joints for testing without the arm
+
+    Each joint turns at a speed proportional to its power and draws a current proportional to it.
+    """
+
+    def __init__(self, count=arm_channel.JOINT_COUNT, max_speed=1.0, stall_current=20.0):
+        """
+        count: Number of joints
+        max_speed: Speed of a joint at full power in radians per second
+        stall_current: Current of a motor at full power in amps
+        """
+        self.positions = [0.0] * count
+        self.powers = [0.0] * count
+        self.max_speed = max_speed
+        self.stall_current = stall_current
+        self.last_update = time.time()
+
+    def drive(self, powers):
+        self.update()
+        self.powers = list(powers)
+
+    def read(self):
+        self.update()
+        return list(self.positions), [abs(power) * self.stall_current for power in self.powers]
+
+    def update(self):
+        """Moves the joints for the time since the last update"""
+        now = time.time()
+        elapsed = now - self.last_update
+        self.last_update = now
+        for i in range(len(self.positions)):
+            self.positions[i] += self.powers[i] * self.max_speed * elapsed
+
+    def close(self):
+        self.powers = [0.0] * len(self.powers)
+
+
+class ArmServer:
+    """
+    Drives the joints to the newest setpoints and streams the joint state back to the base station
+
+    A proportional controller runs at `rate`, the state is sent after every step. The joints are
+    stopped if no setpoints arrive for `timeout` seconds.
+    """
+
+    def __init__(self, joints, host="0.0.0.0", port=ARM_PORT, rate=20, gain=2.0, timeout=1.0):
+        """
+        joints: SabertoothJoints or LoopbackJoints
+        host, port: Where to listen for setpoints
+        rate: Control steps and state packets every second
+        gain: Power per radian of error
+        timeout: Seconds without setpoints before the joints are stopped
+        """
+        self.joints = joints
+        self.host = host
+        self.port = port
+        self.period = 1.0 / rate
+        self.gain = gain
+        self.timeout = timeout
+
+        self.setpoints = None
+        self.last_sequence = None
+        self.last_received = 0
+        self.client = None
+        self.sequence = 0
+        self.running = False
+
+    def receive(self):
+        """Keeps the newest setpoints of every packet that arrived since the last call"""
+        while True:
+            packet, address = comms.receive_message(block=False)
+            if packet is None:
+                return
+            if packet["type"] != comms.Protocol.arm_setpoints:
+                continue
+
+            sequence, angles = arm_channel.read_setpoints(packet)
+            if arm_channel.is_newer(sequence, self.last_sequence):
+                self.last_sequence = sequence
+                self.setpoints = angles
+            self.last_received = time.time()
+            self.client = address
+
+    def step(self):
+        """Runs the controller once and sends the state"""
+        self.receive()
+        positions, currents = self.joints.read()
+
+        if self.setpoints is None or time.time() - self.last_received > self.timeout:
+            powers = [0.0] * len(positions)
+        else:
+            powers = [max(-1.0, min(1.0, self.gain * (setpoint - position)))
+                      for setpoint, position in zip(self.setpoints, positions)]
+        self.joints.drive(powers)
+
+        if self.client is not None:
+            comms.send_message(arm_channel.state_packet(self.sequence, positions, currents), self.client)
+            self.sequence = arm_channel.next_sequence(self.sequence)
+
+    def run(self):
+        """Runs until stop() is called"""
+        comms.setup_server(self.host, self.port)
+        self.running = True
+        next_step = time.time()
+        try:
+            while self.running:
+                self.step()
+                next_step += self.period
+                time.sleep(max(0, next_step - time.time()))
+        finally:
+            self.joints.close()
+            comms.shutdown()
+
+    def stop(self):
+        self.running = False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Loopback arm for testing the base station arm channel")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=ARM_PORT, help="Port to listen on")
+    args = parser.parse_args()
+
+    server = ArmServer(LoopbackJoints(), args.host, args.port)
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        server.stop()
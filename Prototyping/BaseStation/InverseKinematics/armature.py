@@ -1,6 +1,7 @@
 #! /usr/bin/env python2
 import numpy as np
 import transformations as tr
+from math import atan2
 
 xaxis, yaxis, zaxis = np.array([1, 0, 0]), np.array([0, 1, 0]), np.array([0, 0, 1])
 pitch = yaxis
@@ -17,6 +18,8 @@ class Parameter:
         self.min = min_angle
         self.max = max_angle
         self.axis = axis
+        # Index of the x, y or z axis for the fast rotation, None for any other axis
+        self.axis_index = tr.principal_axis(axis)
 
     def is_auto(self):
         return True
@@ -25,7 +28,14 @@ class Parameter:
         """Returns a new rotation matrix derived from the previous baseTransform
         with the given value of this parameter
         """
-        return np.dot(baseTransform, tr.rotation_matrix(value, self.axis))
+        return tr.compose_matrices(baseTransform, self.rotation(value))
+
+    def rotation(self, angle):
+        """Returns the rotation matrix around the axis of this parameter
+        """
+        if self.axis_index is not None:
+            return tr.axis_rotation_matrix(angle, self.axis_index)
+        return tr.rotation_matrix(angle, self.axis)
 
 # A parameter with only one value, a joint fixed in global space
 class StaticParameter(Parameter):
@@ -36,8 +46,10 @@ class StaticParameter(Parameter):
         return False
         
     def applyParameter(self, value, baseTransform):
-        rx, ry, rz = tr.euler_from_matrix(baseTransform)
-        return np.dot(baseTransform, tr.rotation_matrix(ry - self.min, self.axis))
+        # Undo the pitch accumulated so far so the joint ends up at self.min in global space
+        # atan2 keeps working past 90 degrees unlike tr.euler_from_matrix
+        pitch = atan2(baseTransform[0, 2], baseTransform[0, 0])
+        return tr.compose_matrices(baseTransform, self.rotation(self.min - pitch))
 
 
 # A parameter that is mechanically fixed, i.e. not used.
@@ -80,71 +92,181 @@ class Arm:
         self.after = after  # The next limb
         self.parameter = parameter
 
+        # The chain from this limb on, flattened into arrays so forward kinematics is a loop over
+        # the limbs instead of a recursion through the linked list
+        limbs = []
+        limb = self
+        while limb is not None:
+            limbs.append(limb)
+            limb = limb.after
+
+        axes = np.array([limb.parameter.axis for limb in limbs], dtype=np.float64)
+        self.axes = axes / np.linalg.norm(axes, axis=1)[:, np.newaxis]
+        self.lengths = np.array([limb.length for limb in limbs], dtype=np.float64)
+        self.mins = np.array([limb.parameter.min for limb in limbs], dtype=np.float64)
+        self.maxs = np.array([limb.parameter.max for limb in limbs], dtype=np.float64)
+        self.autos = np.array([limb.parameter.is_auto() for limb in limbs], dtype=bool)
+        self.statics = np.array([isinstance(limb.parameter, StaticParameter) for limb in limbs], dtype=bool)
+
+        # Rodrigues' rotation formula split into the parts multiplied by 1, cos and sin of the angle
+        # R = outer + cos * (I - outer) + sin * cross
+        self.outer_axes = np.einsum('ni,nj->nij', self.axes, self.axes)
+        self.cos_axes = np.identity(3) - self.outer_axes
+        self.cross_axes = np.zeros((len(limbs), 3, 3))
+        self.cross_axes[:, 0, 1] = -self.axes[:, 2]
+        self.cross_axes[:, 0, 2] = self.axes[:, 1]
+        self.cross_axes[:, 1, 0] = self.axes[:, 2]
+        self.cross_axes[:, 1, 2] = -self.axes[:, 0]
+        self.cross_axes[:, 2, 0] = -self.axes[:, 1]
+        self.cross_axes[:, 2, 1] = self.axes[:, 0]
+
+        # Scratch rotation buffers for forward_batch(), reallocated only when the batch size changes
+        self._buffers = None
+
+    def _get_buffers(self, count):
+        """
+        Returns three (count, 3, 3) scratch buffers, reusing the last ones if they are big enough
+        """
+        if self._buffers is None or self._buffers[0].shape[0] != count:
+            self._buffers = (np.empty((count, 3, 3)), np.empty((count, 3, 3)), np.empty((count, 3, 3)))
+        return self._buffers
+
+    def forward_batch(self, parameters, rotations=None):
+        """
+        Calculates the location of every joint for many arm configurations at once. Loops over the
+        limbs while every configuration is handled in the same numpy operation.
+
+        parameters: An array of shape (count, limb_count()) with one arm configuration per row
+        rotations: Optional array of shape (count, limb_count(), 3, 3) which is filled with the
+            orientation of each limb before its parameter is applied
+
+        returns: An array of shape (count, limb_count() + 1, 3) with the base of the arm followed by
+            the end of each limb for every configuration
+        """
+        parameters = np.asarray(parameters, dtype=np.float64)
+        count = parameters.shape[0]
+
+        points = np.zeros((count, len(self.lengths) + 1, 3))
+        rotation, spare, joint = self._get_buffers(count)
+        rotation[:] = np.identity(3)
+
+        for i in range(len(self.lengths)):
+            if rotations is not None:
+                rotations[:, i] = rotation
+
+            if self.statics[i]:
+                # Undo the pitch accumulated so far so the joint ends up at its value in global space
+                angles = self.mins[i] - np.arctan2(rotation[:, 0, 2], rotation[:, 0, 0])
+            else:
+                angles = parameters[:, i]
+
+            np.multiply(np.cos(angles)[:, np.newaxis, np.newaxis], self.cos_axes[i], out=joint)
+            joint += np.sin(angles)[:, np.newaxis, np.newaxis] * self.cross_axes[i]
+            joint += self.outer_axes[i]
+
+            np.matmul(rotation, joint, out=spare)
+            rotation, spare = spare, rotation
+
+            # Limbs lie along their local x axis
+            np.multiply(rotation[:, :, 0], self.lengths[i], out=points[:, i + 1])
+            points[:, i + 1] += points[:, i]
+
+        return points
+
+    def forward(self, parameters):
+        """
+        Calculates the location of every joint for a single arm configuration
+
+        parameters: The arm configuration
+
+        returns: An array of shape (limb_count() + 1, 3) with the base of the arm followed by the
+            end of each limb
+        """
+        return self.forward_batch(np.asarray(parameters, dtype=np.float64)[np.newaxis])[0]
+
     def joints(self, parameters):
         """
-	Returns the points representing the location of each joint in the arm
-	(convienant for drawing). You may have to do transformations on these points
-	to suit your graphical environment. One reccomendation is to intrepret the x
+        Returns the points representing the location of each joint in the arm
+        (convienant for drawing). You may have to do transformations on these points
+        to suit your graphical environment. One reccomendation is to intrepret the x
         and z coordinates as x and y (using something like point[::2])
         """
-        return [np.zeros(3)] + self._joints_impl(tr.identity_matrix(), parameters)
-	
-    def _joints_impl(self, baseTransform, parameters):
-        """
-	Recursive portion of joints(). 
-	"""
-	transform = self.applyTransform(parameters[0], baseTransform)
-        end = tr.translation_from_matrix(transform)
-		
-        if self.after is not None:
-            return [end] + self.after._joints_impl(transform, parameters[1:])
-        else:
-            return [end]
+        return list(self.forward(parameters))
 
     def error(self, target_pos, parameters):
-	"""
-	Calculates the difference between the target position, and the end of the arm as specified
-	by the parameters. 
+        """
+        Calculates the difference between the target position, and the end of the arm as specified
+        by the parameters. 
 
-	target_pos: The target position in 3d space. 
-	parameters: The arm configuration to calculate the error of
-	"""
-    	return _error_impl(target_pos, parameters, tr.identity_matrix())
+        target_pos: The target position in 3d space. 
+        parameters: The arm configuration to calculate the error of
+        """
+        return distance(target_pos, self.forward(parameters)[-1])
 
-    def _error_impl(self, target_pos, parameters, base_transform):
+    def error_batch(self, target_pos, parameters):
         """
-	Recursive portion of error()
-	"""
-        transform = self.applyTransform(parameters[0], baseTransform)
-        
-        if self.after is None:
-            end = tr.translation_from_matrix(transform)
-            return distance(target_pos, end)
-        else:
-            return self.after.error(target_pos, transform, parameters[1:])
+        Same as error() for many arm configurations at once
+
+        target_pos: The target position in 3d space
+        parameters: An array of shape (count, limb_count()) with one arm configuration per row
+
+        returns: An array of the distance of each configuration to the target
+        """
+        ends = self.forward_batch(parameters)[:, -1]
+        return np.linalg.norm(ends - target_pos, axis=1)
     
     #@cython.locals(armLength=np.ndarray, rPitch=np.ndarray, rYaw=np.ndarray, transform=np.ndarray)        
     def applyTransform(self, parameterValue, baseTransform):
         """
-	Gives the translation matrix associated with this arm with the given pitch
+        Gives the translation matrix associated with this arm with the given pitch
         and yaw.
         """
         baseTransform = self.parameter.applyParameter(parameterValue, baseTransform)
-        tLength = tr.translation_matrix(np.array([self.length, 0, 0]))
         
-        return np.dot(baseTransform, tLength)        
+        return tr.translate_matrix(baseTransform, np.array([self.length, 0, 0]), baseTransform)        
+
+    def jacobian(self, parameters):
+        """
+        Calculates the end position of the arm and how it moves with each parameter in a single
+        pass down the arm, using the axis each joint rotates around.
+
+        parameters: The arm configuration to calculate the jacobian of
+
+        returns: A tuple of the end position and a 3 x limb_count() array whose columns are the
+            derivatives of the end position with respect to each parameter
+        """
+        count = len(self.lengths)
+        rotations = np.empty((1, count, 3, 3))
+        points = self.forward_batch(np.asarray(parameters, dtype=np.float64)[np.newaxis], rotations)[0]
+
+        # Rotating around the axis does not move the axis, so the axis before the joint is used
+        axes = np.einsum('nij,nj->ni', rotations[0], self.axes)
+
+        end = points[-1]
+        jacobian = np.zeros((3, count))
+
+        # A joint fixed in global space undoes the rotation of every joint before it, so those joints
+        # only move what comes after it as a rigid whole around the fixed joint
+        anchor = end
+        for j in reversed(range(count)):
+            if self.autos[j]:
+                jacobian[:, j] = np.cross(axes[j], anchor - points[j])
+            if self.statics[j]:
+                anchor = points[j]
+
+        return end, jacobian
 
     def min_parameters(self):
-        return [self.parameter.min] + ([] if self.after is None else self.after.min_parameters())
+        return self.mins.tolist()
 
     def max_parameters(self):
-        return [self.parameter.max] + ([] if self.after is None else self.after.max_parameters())
+        return self.maxs.tolist()
 
     def limb_count(self):
-        return 1 if self.after is None else self.after.limb_count() + 1
+        return len(self.lengths)
 
     def auto_parameters(self):
-        return [self.parameter.is_auto()] + ([] if self.after is None else self.after.auto_parameters())
+        return self.autos.tolist()
 
 
 # Needs to be fixed. For testing purposes mostly.
@@ -0,0 +1,61 @@
+#! /usr/bin/env python2
+"""
+Times the inverse kinematics solvers on the arm of demo.py.
+
+    python benchmark_ik.py [--repeat 5]
+
+Run by benchmark.py at the root of the repository as well. Every solve starts from the minimum parameters
+and goes to the next of TARGETS reachable targets, picked from random parameters so every run solves the
+same ones. Skipped without numpy.
+"""
+
+import os
+import sys
+from math import pi
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+import benchmark
+
+# Reachable targets the solvers cycle through
+TARGETS = 64
+
+CASES = ["forward kinematics", "jacobian", "damped_least_squares 10 iterations", "gradient_descent 10 iterations"]
+
+
+def cases(repeat):
+    try:
+        import numpy as np
+        from armature import Arm, Parameter, StaticParameter
+        from damped_least_squares import damped_least_squares
+        from gradient_descent import gradient_descent
+    except ImportError as error:
+        return [benchmark.skipped(name, error) for name in CASES]
+
+    arm = Arm(50, Parameter(0, pi),
+              Arm(50, Parameter(0, pi / 4),
+              Arm(30, Parameter(0, pi / 4),
+              Arm(10, StaticParameter(0)))))
+    start = np.array(arm.min_parameters(), dtype=np.float64)
+    end = np.array(arm.max_parameters(), dtype=np.float64)
+    random = np.random.RandomState(0)
+    targets = [arm.forward(random.uniform(start, end))[-1] for i in range(TARGETS)]
+    parameters = (start + end) / 2
+
+    def solver(solve):
+        state = {"next": 0}
+
+        def run():
+            solve(arm, start, targets[state["next"]], 10)
+            state["next"] = (state["next"] + 1) % TARGETS
+        return run
+
+    return [
+        benchmark.measure(CASES[0], lambda: arm.forward(parameters), repeat=repeat),
+        benchmark.measure(CASES[1], lambda: arm.jacobian(parameters), repeat=repeat),
+        benchmark.measure(CASES[2], solver(damped_least_squares), repeat=repeat),
+        benchmark.measure(CASES[3], solver(gradient_descent), repeat=repeat),
+    ]
+
+
+if __name__ == "__main__":
+    benchmark.main(cases, "Times the inverse kinematics solvers")
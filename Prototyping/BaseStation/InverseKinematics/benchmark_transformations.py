@@ -0,0 +1,42 @@
+#! /usr/bin/env python2
+"""
+Times the fixed axis transformation functions against the general ones they replace.
+
+    python benchmark_transformations.py [repeat]
+"""
+
+import sys
+import timeit
+import numpy as np
+import transformations as tr
+
+yaxis = np.array([0, 1, 0])
+angles = np.random.random(1000) * np.pi
+M0 = tr.random_rotation_matrix()
+M1 = tr.translation_matrix([1, 2, 3])
+v = np.array([50.0, 0, 0])
+out = np.empty((4, 4))
+batch_out = np.empty((len(angles), 4, 4))
+
+# (name, current function, fast function, calls per run)
+cases = [
+    ("rotation about y", lambda: tr.rotation_matrix(.3, yaxis), lambda: tr.axis_rotation_matrix(.3, 'y', out), 1),
+    ("1000 rotations about y", lambda: [tr.rotation_matrix(a, yaxis) for a in angles],
+     lambda: tr.axis_rotation_matrices(angles, 'y', batch_out), len(angles)),
+    ("compose two matrices", lambda: tr.concatenate_matrices(M0, M1), lambda: tr.compose_matrices(M0, M1, out), 1),
+    ("translate along x", lambda: np.dot(M0, tr.translation_matrix(v)), lambda: tr.translate_matrix(M0, v, out), 1),
+]
+
+
+def run(repeat=5, number=2000):
+    """Prints the best time per call of every case in microseconds"""
+    print "%-24s %12s %12s %8s" % ("case", "current us", "fast us", "speedup")
+    for name, current, fast, calls in cases:
+        runs = max(1, number // calls)
+        current_time = min(timeit.repeat(current, repeat=repeat, number=runs)) / (runs * calls) * 1e6
+        fast_time = min(timeit.repeat(fast, repeat=repeat, number=runs)) / (runs * calls) * 1e6
+        print "%-24s %12.2f %12.2f %7.1fx" % (name, current_time, fast_time, current_time / fast_time)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -12,7 +12,7 @@ import numpy as np
 import transformations as tr
 from armature import *
 from math import pi
-from gradient_descent import *
+from damped_least_squares import *
 
 pygame.init()
 screen = pygame.display.set_mode((640, 480))
@@ -55,7 +55,7 @@ while running:
         target = np.array([pos[0], 0, pos[1]]) - draw_origin
 
     #time_start = time.time()
-    params = gradient_descent(test_armature, params, target, 10)
+    params = damped_least_squares(test_armature, params, target, 10)
     #time_end = time.time()
     #print(time_end - time_start)
 
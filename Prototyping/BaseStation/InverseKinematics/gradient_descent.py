@@ -23,7 +23,7 @@ def gradient_descent(armature, initial_parameters, target_pos, iterations):
     delta = .0001 # For calculating the derivative
 
     for iter in range(iterations):
-        base_error = armature.error(target_pos, tBase, parameters)
+        base_error = armature.error(target_pos, parameters)
 
         # Calculate derivative for each axis
         derivative = np.empty(len(parameters))
@@ -1,10 +1,161 @@
 import serial
+import threading
+import time
+
+
+def make_packet(address, channel_start, value):
+	"""
+	Builds the simplified packetized serial command for a motor.
+	value is from -1 to 1 for reverse and forward.
+	"""
+	channel = channel_start + 1 if (value < 0) else channel_start
+	power = int(min(abs(value), 1) * 127) # 127 is the max value to send
+	checksum = (address + channel + power) & 127
+	return bytearray([address, channel, power, checksum])
+
+
+class SabertoothBus:
+	"""
+	Owns a serial port shared by several Sabertooth motors.
+
+	Writes only store the latest value of each motor (address and starting channel).
+	A thread sends every value that changed since the last flush in a single write,
+	at a fixed rate that is slowed down when the packets would not fit in the baud rate.
+	Anything the controllers send back is kept in last_status.
+	"""
+
+	# Bytes in one packet and bits on the wire per byte (start, 8 data, stop)
+	PACKET_SIZE = 4
+	BITS_PER_BYTE = 10
+
+	def __init__(self, serialPort, rate=50, utilization=.8):
+		"""
+		serialPort is a serial object that the sabertooth controllers are connected to.
+		rate is the number of flushes every second.
+		utilization is the part of the baud rate the flushes are allowed to use.
+		"""
+		self.ser = serialPort
+		self.period = 1.0 / rate
+		self.utilization = utilization
+
+		self.pending = {}
+		self.lock = threading.Lock()
+		self.wake = threading.Event()
+		self.running = True
+
+		# Counters
+		self.updates = 0 # Values written by the motors
+		self.dropped = 0 # Values replaced by a newer one before they were sent
+		self.flushes = 0 # Writes to the serial port
+		self.packets_sent = 0
+		self.bytes_sent = 0
+		self.bytes_received = 0
+		self.errors = 0 # Failed serial reads and writes
+		self.last_status = bytearray()
+
+		self.thread = threading.Thread(target=self.run)
+		self.thread.daemon = True
+		self.thread.start()
+
+	# Resource management
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def command(self, address, channel_start, value):
+		"""
+		Sets the value a motor gets on the next flush, replacing any value that wasn't sent yet
+		"""
+		with self.lock:
+			key = (address, channel_start)
+			if key in self.pending:
+				self.dropped += 1
+			self.pending[key] = value
+			self.updates += 1
+
+	def queue_depth(self):
+		"""
+		Returns the number of motors with a value waiting to be sent
+		"""
+		with self.lock:
+			return len(self.pending)
+
+	def min_period(self, packets):
+		"""
+		Returns the shortest time in seconds between flushes of the given number of packets
+		that stays within the baud rate budget
+		"""
+		return packets * self.PACKET_SIZE * self.BITS_PER_BYTE / (self.ser.baudrate * self.utilization)
+
+	def flush(self):
+		"""
+		Sends every pending value in a single write and reads back any status bytes.
+		Returns the number of packets sent.
+		"""
+		with self.lock:
+			pending = self.pending
+			self.pending = {}
+
+		if pending:
+			data = bytearray()
+			for (address, channel_start), value in sorted(pending.items()):
+				data += make_packet(address, channel_start, value)
+
+			try:
+				self.ser.write(data)
+			except (serial.SerialException, OSError):
+				self.errors += 1
+			else:
+				self.flushes += 1
+				self.packets_sent += len(pending)
+				self.bytes_sent += len(data)
+
+		try:
+			waiting = self.ser.inWaiting()
+			if waiting:
+				self.last_status = bytearray(self.ser.read(waiting))
+				self.bytes_received += waiting
+		except (serial.SerialException, OSError, ValueError):
+			self.errors += 1
+
+		return len(pending)
+
+	def run(self):
+		"""
+		Flushes at the fixed rate until close() is called
+		"""
+		while self.running:
+			packets = self.flush()
+			self.wake.wait(max(self.period, self.min_period(packets)))
+			self.wake.clear()
+
+	def stats(self):
+		"""
+		Returns a dictionary of the counters
+		"""
+		return {"queue_depth": self.queue_depth(), "updates": self.updates, "dropped": self.dropped,
+				"flushes": self.flushes, "packets_sent": self.packets_sent, "bytes_sent": self.bytes_sent,
+				"bytes_received": self.bytes_received, "errors": self.errors}
+
+	def close(self):
+		"""
+		Stops the flushing thread, sends what is pending and closes the serial port
+		"""
+		self.running = False
+		self.wake.set()
+		self.thread.join()
+		self.flush()
+		self.ser.close()
+
 
 class Sabertooth:
 	def __init__(self, serialPort, address, channel):
 		"""
 		serialPort is a serial object that the sabertooth is connected to. 
-			Baud rate and output file are specified here
+			Baud rate and output file are specified here. It can also be a SabertoothBus
+			shared with other motors, then values are sent by the bus at its rate.
 		Address as the device address the sabertooth controller lives on. This
 			can be 128, 129 or 130. Each address can have two motors attached to it.
 		Channel is the starting channel on the controller that the specific motor
@@ -12,6 +163,12 @@ class Sabertooth:
 
 		Passing in values that don't meet this specification may or may not work. 
 		"""
+		if isinstance(serialPort, SabertoothBus):
+			self.bus = serialPort
+			serialPort = serialPort.ser
+		else:
+			self.bus = None
+
 		# Adresses should be 128, 129 or 130 for each pair of motors
 		self.ser = serialPort 
 		self.address = address
@@ -27,15 +184,15 @@ class Sabertooth:
 
 	def close(self):
 		self.write(0)
-		self.ser.close()
+		# The bus owns a shared port and closes it itself
+		if self.bus is None:
+			self.ser.close()
 
 	def write(self, value):
 		"""
 		Writes a value from -1 to 1 for reverse and forward
 		"""
-
-		channel = self.channel_start + 1 if (value < 0) else self.channel_start
-		power = int(abs(value) * 127) # 127 is the max value to send
-		checksum = (self.address + channel + power) & 127
-		data = bytearray([self.address, channel, power, checksum])
-		self.ser.write(data)
+		if self.bus is not None:
+			self.bus.command(self.address, self.channel_start, value)
+		else:
+			self.ser.write(make_packet(self.address, self.channel_start, value))
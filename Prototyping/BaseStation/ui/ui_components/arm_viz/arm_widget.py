@@ -2,15 +2,19 @@ from PyQt4 import QtGui, QtCore
 import numpy as np
 from armature import *
 from math import pi
-from gradient_descent import *
+from damped_least_squares import *
+import workspace
 
 
 class arm_widget(QtGui.QWidget):
     """
     Visualizes the arm using computations in 3d space mapped to a 2d surface
-    Currently follows a target that is moved by mouse input but eventually will use real arm data
+    The arm follows a target that is moved by mouse input, the pose the arm reports is drawn behind it
     """
 
+    # Emits the joint angles in radians from the base to the wrist whenever the commanded pose changes
+    setpointsChanged = QtCore.pyqtSignal(object)
+
     def __init__(self):
         super(arm_widget, self).__init__()
 
@@ -18,14 +22,20 @@ class arm_widget(QtGui.QWidget):
         self.draw_origin = np.array([0, 0, 0])
 
         # Make a new 3d armature with lengths proportional to real arm
-        self.test_armature = Arm(50, Parameter(0, pi), FixedParameter(0),
-                        Arm(50, Parameter(0, pi), FixedParameter(0),
-                        Arm(30, Parameter(0, pi / 4), FixedParameter(0),
-                        Arm(10, Parameter(0, pi / 4), FixedParameter(0)))))
+        self.test_armature = make_rover_arm()
+
+        # Precomputed map of where the arm can reach, built and saved on the first run
+        self.workspace = workspace.load_or_build(self.test_armature)
+
+        # Unreachable targets are moved to the closest reachable position if true, ignored if false
+        self.clamp_targets = True
 
         # Make the starting params for the arm
         self.params = self.test_armature.min_parameters()
 
+        # The params of the pose the arm reported, None until the arm streams its state
+        self.actual_params = None
+
         # Where the arm will be pointing at
         self.target = np.array([0, 0, 0])
 
@@ -72,13 +82,34 @@ class arm_widget(QtGui.QWidget):
 
         # If we are within 40 pixels of the target we can move it
         if distance(arr, self.target) < 40:
+            seed = self.workspace.seed(arr)
+            if seed is None:
+                if not self.clamp_targets:
+                    return
+                arr, seed = self.workspace.nearest(arr)
+
             # Make the target the mouse draw position
             self.target = arr
+            # Start from whichever of the last pose and the precomputed pose is closer to the target
+            starts = np.array([self.params, seed])
+            self.params = starts[np.argmin(self.test_armature.error_batch(self.target, starts))]
             # Recalculate the arm positioning
-            self.params = gradient_descent(self.test_armature, self.params, self.target, 10)
+            self.params = damped_least_squares(self.test_armature, self.params, self.target, 10)
+            # Every limb is moved by its pitch, the yaws are fixed
+            self.setpointsChanged.emit(list(self.params[0::2]))
             # Redraw the window since we updated
             self.repaint()
 
+    def update_arm_state(self, changed):
+        """
+        Called by the telemetry bus when the arm reports new joint angles
+        :param changed: Dictionary with the "Arm Position" tuple of joint angles in radians from the base to the wrist
+        :return: None
+        """
+        self.actual_params = np.array(self.test_armature.min_parameters())
+        self.actual_params[0::2] = changed["Arm Position"]
+        self.update()
+
     def paintEvent(self, QPaintEvent):
         """
         Redraws the widget every time the user updates it. Forces all points (calculated around the origin)
@@ -100,26 +131,37 @@ class arm_widget(QtGui.QWidget):
         # Draw the target at the target x, y position offset by drawing origin
         painter.drawEllipse(QtCore.QPointF(self.target[::2][0] + self.draw_origin[::2][1],
                                            self.target[::2][1] + self.draw_origin[::2][0]), 10, 10)
+        # Draw the pose the arm reported underneath the commanded pose
+        if self.actual_params is not None:
+            self.pen.setColor(QtCore.Qt.blue)
+            self.pen.setWidth(4)
+            painter.setPen(self.pen)
+            painter.drawPolyline(QtGui.QPolygonF(self.get_points(self.actual_params)))
+
         # Se pen color to gray
         self.pen.setColor(QtCore.Qt.gray)
         self.pen.setWidth(8)
         painter.setPen(self.pen)
 
         # Get the points where the arm joints are located
-        unf_points = [point[::2] for point in self.test_armature.joints(self.params)]
-        points = []
-
-        # Make all numerical points QPointF objects offset by draw origin
-        for i in range(0, len(unf_points)):
-            points.append(QtCore.QPointF(unf_points[i][0], unf_points[i][1]))
-            points[i].setX(points[i].x() + self.draw_origin[::2][1])
-            points[i].setY(points[i].y() + self.draw_origin[::2][0])
+        points = self.get_points(self.params)
 
         # Make every segment a different color, draw lines with the points
         for i in range(1, len(points)):
             self.flip_color(painter)
             painter.drawLine(points[i-1], points[i])
 
+    def get_points(self, params):
+        """
+        Calculates where the arm joints are drawn
+        :param params: The arm configuration
+        :return: List of QPointF for the base and the end of each limb, offset by the draw origin
+        """
+        points = []
+        for point in self.test_armature.forward(params):
+            points.append(QtCore.QPointF(point[0] + self.draw_origin[2], point[2] + self.draw_origin[0]))
+        return points
+
     def flip_color(self, painter):
         """
         Toggles the pen color between two options so the arm joints are differentiated
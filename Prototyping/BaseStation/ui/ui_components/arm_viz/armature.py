@@ -1,6 +1,7 @@
 #! /usr/bin/env python2
 import numpy as np
 import transformations as tr
+from math import pi
 
 xaxis, yaxis, zaxis = np.array([1, 0, 0]), np.array([0, 1, 0]), np.array([0, 0, 1])
 
@@ -73,7 +74,82 @@ class Arm:
         self.length = length
         self.after = after  # The next limb
         self.pitch = pitch
-        self.yaw = yaw		
+        self.yaw = yaw
+
+        # The chain from this limb on, flattened into arrays so forward kinematics is a loop over
+        # the limbs instead of a recursion through the linked list. Parameters alternate pitch, yaw.
+        limbs = []
+        limb = self
+        while limb is not None:
+            limbs.append(limb)
+            limb = limb.after
+
+        self.lengths = np.array([limb.length for limb in limbs], dtype=np.float64)
+        self.mins = np.array([[limb.pitch.min, limb.yaw.min] for limb in limbs], dtype=np.float64).ravel()
+        self.maxs = np.array([[limb.pitch.max, limb.yaw.max] for limb in limbs], dtype=np.float64).ravel()
+        self.autos = np.array([[limb.pitch.is_auto(), limb.yaw.is_auto()] for limb in limbs], dtype=bool).ravel()
+
+        # Scratch rotation buffers for forward_batch(), reallocated only when the batch size changes
+        self._buffers = None
+
+    def _get_buffers(self, count):
+        """Returns three (count, 3, 3) scratch buffers, reusing the last ones if the
+        batch size did not change.
+
+        """
+        if self._buffers is None or self._buffers[0].shape[0] != count:
+            self._buffers = (np.empty((count, 3, 3)), np.empty((count, 3, 3)), np.zeros((count, 3, 3)))
+        return self._buffers
+
+    def forward_batch(self, parameters, rotations=None):
+        """Calculates the location of every joint for many arm configurations at once.
+        parameters has one configuration per row. If given, rotations of shape
+        (count, limb_count(), 3, 3) is filled with the orientation of each limb before
+        its pitch and yaw are applied. Returns an array of shape (count, limb_count() + 1, 3)
+        with the base of the arm followed by the end of each limb.
+
+        """
+        parameters = np.asarray(parameters, dtype=np.float64)
+        count = parameters.shape[0]
+
+        points = np.zeros((count, len(self.lengths) + 1, 3))
+        rotation, spare, joint = self._get_buffers(count)
+        rotation[:] = np.identity(3)
+
+        for i in range(len(self.lengths)):
+            if rotations is not None:
+                rotations[:, i] = rotation
+
+            cos_pitch = np.cos(parameters[:, 2 * i])
+            sin_pitch = np.sin(parameters[:, 2 * i])
+            cos_yaw = np.cos(parameters[:, 2 * i + 1])
+            sin_yaw = np.sin(parameters[:, 2 * i + 1])
+
+            # rotation_matrix(yaw, zaxis) * rotation_matrix(pitch, yaxis) written out
+            joint[:, 0, 0] = cos_yaw * cos_pitch
+            joint[:, 0, 1] = -sin_yaw
+            joint[:, 0, 2] = cos_yaw * sin_pitch
+            joint[:, 1, 0] = sin_yaw * cos_pitch
+            joint[:, 1, 1] = cos_yaw
+            joint[:, 1, 2] = sin_yaw * sin_pitch
+            joint[:, 2, 0] = -sin_pitch
+            joint[:, 2, 2] = cos_pitch
+
+            np.matmul(rotation, joint, out=spare)
+            rotation, spare = spare, rotation
+
+            # Limbs lie along their local x axis
+            np.multiply(rotation[:, :, 0], self.lengths[i], out=points[:, i + 1])
+            points[:, i + 1] += points[:, i]
+
+        return points
+
+    def forward(self, parameters):
+        """Calculates the location of every joint for a single arm configuration.
+        Returns an array of shape (limb_count() + 1, 3).
+
+        """
+        return self.forward_batch(np.asarray(parameters, dtype=np.float64)[np.newaxis])[0]
 
     def joints(self, parameters):
         """Returns the points representing the location of each joint in the arm
@@ -82,50 +158,78 @@ class Arm:
         and z coordinates as x and y (using something like point[::2])
         
         """
-        return [np.zeros(3)] + self._joints_impl(tr.identity_matrix(), parameters)
-	
-    #@cython.locals(armLength=np.ndarray, rPitch=np.ndarray, rYaw=np.ndarray, transform=np.ndarray)
-    def _joints_impl(self, baseTransform, parameters):
-        transform = np.dot(baseTransform, self.transform(parameters[0], parameters[1]))
-        end = tr.translation_from_matrix(transform)
-		
-        if self.after is not None:
-            return [end] + self.after._joints_impl(transform, parameters[2:])
-        else:
-            return [end]
+        return list(self.forward(parameters))
 
     def error(self, target_pos, baseTransform, parameters):
-        transform = np.dot(baseTransform, self.transform(parameters[0], parameters[1]))
-        
-        if self.after is None:
-            end = tr.translation_from_matrix(transform)
-            return distance(target_pos, end)
-        else:
-            return self.after.error(target_pos, transform, parameters[2:])
+        end = np.dot(baseTransform, np.append(self.forward(parameters)[-1], 1))[:3]
+        return distance(target_pos, end)
+
+    def error_batch(self, target_pos, parameters):
+        """Distance of the end of the arm to the target for many arm configurations
+        at once.
+
+        """
+        ends = self.forward_batch(parameters)[:, -1]
+        return np.linalg.norm(ends - target_pos, axis=1)
             
     def transform(self, pitch, yaw):
         """Gives the translation matrix associated with this arm with the given pitch
         and yaw.
         
         """
-        tLength = tr.translation_matrix(np.array([self.length, 0, 0]))
-        rPitch = tr.rotation_matrix(pitch, yaxis)
-        rYaw = tr.rotation_matrix(yaw, zaxis)
+        rPitch = tr.axis_rotation_matrix(pitch, 'y')
+        rYaw = tr.axis_rotation_matrix(yaw, 'z')
         
         #return armLength * rPitch * rYaw
-        return tr.concatenate_matrices(rYaw, rPitch, tLength)        
+        return tr.translate_matrix(tr.compose_matrices(rYaw, rPitch), np.array([self.length, 0, 0]))        
+
+    def jacobian(self, parameters):
+        """Calculates the end position of the arm and how it moves with each parameter
+        in a single pass down the arm. Returns a tuple of the end position and a
+        3 x len(parameters) array whose columns are the derivatives of the end
+        position with respect to each parameter.
+
+        """
+        parameters = np.asarray(parameters, dtype=np.float64)
+        count = len(self.lengths)
+        rotations = np.empty((1, count, 3, 3))
+        points = self.forward_batch(parameters[np.newaxis], rotations)[0]
+        end = points[-1]
+
+        jacobian = np.zeros((3, 2 * count))
+        for i in range(count):
+            yaw = parameters[2 * i + 1]
+            # Yaw turns around the z axis of the limb, pitch around its y axis after the yaw
+            pitch_axis = np.dot(rotations[0, i], [-np.sin(yaw), np.cos(yaw), 0])
+            yaw_axis = rotations[0, i, :, 2]
+            if self.autos[2 * i]:
+                jacobian[:, 2 * i] = np.cross(pitch_axis, end - points[i])
+            if self.autos[2 * i + 1]:
+                jacobian[:, 2 * i + 1] = np.cross(yaw_axis, end - points[i])
+
+        return end, jacobian
 
     def min_parameters(self):
-        return [self.pitch.min, self.yaw.min] + ([] if self.after is None else self.after.min_parameters())
+        return self.mins.tolist()
 
     def max_parameters(self):
-        return [self.pitch.max, self.yaw.max] + ([] if self.after is None else self.after.max_parameters())
+        return self.maxs.tolist()
 
     def limb_count(self):
-        return 1 if self.after is None else self.after.limb_count() + 1
+        return len(self.lengths)
 
     def auto_parameters(self):
-        return [self.pitch.is_auto(), self.yaw.is_auto()] + ([] if self.after is None else self.after.auto_parameters())
+        return self.autos.tolist()
+
+
+def make_rover_arm():
+    """Returns the armature of the rover arm, with lengths proportional to the real arm
+
+    """
+    return Arm(50, Parameter(0, pi), FixedParameter(0),
+           Arm(50, Parameter(0, pi), FixedParameter(0),
+           Arm(30, Parameter(0, pi / 4), FixedParameter(0),
+           Arm(10, Parameter(0, pi / 4), FixedParameter(0)))))
 
 
 # def make_tentacle(segment_length, segment_count):
@@ -0,0 +1,55 @@
+#! /usr/bin/env python2
+import numpy as np
+import transformations as tr
+from armature import *
+
+def damped_least_squares(armature, initial_parameters, target_pos, iterations=10, damping=10.0, tolerance=.5):
+    """
+    Returns an optimized version of initial_parameters with armature. Uses the damped least
+    squares (Levenberg-Marquardt) method with the analytic jacobian of the armature, which needs
+    far fewer iterations than gradient descent and does not need a tuned step size.
+
+    armature: The armature which the parameters are from
+    initial_parameters: The parameters to begin optimization from
+    target_pos: The target positon to optimize the parameters to
+    iterations: The most iterations to run this call. Stops early once the end of the arm
+        is within tolerance of the target
+    damping: Starting damping factor, in the same units as the limb lengths. Larger values take
+        smaller, safer steps near singular configurations, it is adjusted every iteration
+    tolerance: Distance from the target that is close enough
+
+    returns: The optimized set of parameters
+    """
+    parameters = np.array(initial_parameters, copy=True, dtype=np.float64)
+    parameters_min = armature.min_parameters()
+    parameters_max = armature.max_parameters()
+    target_pos = np.asarray(target_pos, dtype=np.float64)
+
+    end, jacobian = armature.jacobian(parameters)
+    error = target_pos - end
+    base_error = np.linalg.norm(error)
+
+    for iter in range(iterations):
+        if base_error <= tolerance:
+            break
+
+        # Solve (J J^T + damping^2 I) y = error, the step is J^T y
+        # Only a 3x3 system no matter how many limbs the arm has
+        system = np.dot(jacobian, jacobian.T) + damping ** 2 * np.identity(3)
+        step = np.dot(jacobian.T, np.linalg.solve(system, error))
+
+        trial = np.clip(parameters + step, parameters_min, parameters_max)
+        trial_end, trial_jacobian = armature.jacobian(trial)
+        trial_error = target_pos - trial_end
+        trial_distance = np.linalg.norm(trial_error)
+
+        if trial_distance < base_error:
+            # Good step, trust the linear model more
+            parameters = trial
+            end, jacobian, error, base_error = trial_end, trial_jacobian, trial_error, trial_distance
+            damping *= .5
+        else:
+            # Overshot or hit a limit, take smaller steps
+            damping *= 4
+
+    return parameters
@@ -354,6 +354,129 @@ def rotation_matrix(angle, direction, point=None):
     return M
 
 
+_IDENTITY = numpy.identity(4)
+_AXES = {'x': 0, 'y': 1, 'z': 2, 0: 0, 1: 1, 2: 2}
+
+def principal_axis(direction):
+    """Return index of the x, y or z axis direction points along, else None.
+
+    >>> principal_axis([0, 1, 0]), principal_axis([0, 0, 2])
+    (1, 2)
+    >>> principal_axis([1, 1, 0]) is None
+    True
+
+    """
+    direction = numpy.asarray(direction[:3], dtype=numpy.float64)
+    index = int(numpy.argmax(numpy.abs(direction)))
+    if direction[index] > 0 and numpy.count_nonzero(direction) == 1:
+        return index
+    return None
+
+def axis_rotation_matrix(angle, axis, out=None):
+    """Return matrix to rotate about the x, y or z axis through the origin.
+
+    Faster than rotation_matrix for the principal axes, the axis is not
+    normalized and no temporary arrays are made. axis is 'x', 'y', 'z' or
+    0, 1, 2. The matrix is written to out if it is given.
+
+    >>> angle = (random.random() - 0.5) * (2*math.pi)
+    >>> for axis, direc in (('x', [1, 0, 0]), ('y', [0, 1, 0]), (2, [0, 0, 1])):
+    ...     R0 = axis_rotation_matrix(angle, axis)
+    ...     R1 = rotation_matrix(angle, direc)
+    ...     if not numpy.allclose(R0, R1): print(axis)
+    >>> M = numpy.empty((4, 4))
+    >>> axis_rotation_matrix(angle, 'y', M) is M
+    True
+
+    """
+    i = _AXES[axis]
+    j = (i + 1) % 3
+    k = (i + 2) % 3
+    sina = math.sin(angle)
+    cosa = math.cos(angle)
+    if out is None:
+        out = _IDENTITY.copy()
+    else:
+        out[...] = _IDENTITY
+    out[j, j] = cosa
+    out[j, k] = -sina
+    out[k, j] = sina
+    out[k, k] = cosa
+    return out
+
+def axis_rotation_matrices(angles, axis, out=None):
+    """Return array of matrices to rotate about the x, y or z axis by each angle.
+
+    Batch version of axis_rotation_matrix. The result has the shape of
+    angles followed by (4, 4) and is written to out if it is given.
+
+    >>> angles = numpy.random.random(5) * math.pi
+    >>> R = axis_rotation_matrices(angles, 'z')
+    >>> R.shape
+    (5, 4, 4)
+    >>> numpy.allclose(R[3], axis_rotation_matrix(angles[3], 'z'))
+    True
+
+    """
+    angles = numpy.asarray(angles, dtype=numpy.float64)
+    i = _AXES[axis]
+    j = (i + 1) % 3
+    k = (i + 2) % 3
+    if out is None:
+        out = numpy.empty(angles.shape + (4, 4))
+    out[...] = _IDENTITY
+    numpy.cos(angles, out=out[..., j, j])
+    numpy.sin(angles, out=out[..., k, j])
+    numpy.negative(out[..., k, j], out=out[..., j, k])
+    out[..., k, k] = out[..., j, j]
+    return out
+
+def translate_matrix(matrix, direction, out=None):
+    """Return matrix followed by a translation by direction vector.
+
+    Same as numpy.dot(matrix, translation_matrix(direction)) without the
+    full matrix product. matrix can be a single 4x4 matrix or an array of
+    them. The result is written to out if it is given, out may be matrix.
+
+    >>> M = random_rotation_matrix()
+    >>> v = numpy.random.random(3) - 0.5
+    >>> numpy.allclose(translate_matrix(M, v),
+    ...                numpy.dot(M, translation_matrix(v)))
+    True
+    >>> M = numpy.array([random_rotation_matrix() for i in range(3)])
+    >>> numpy.allclose(translate_matrix(M, v)[1],
+    ...                numpy.dot(M[1], translation_matrix(v)))
+    True
+
+    """
+    matrix = numpy.asarray(matrix)
+    if out is None:
+        out = matrix.copy()
+    elif out is not matrix:
+        out[...] = matrix
+    out[..., :3, 3] += numpy.dot(matrix[..., :3, :3], direction[:3])
+    return out
+
+def compose_matrices(matrix0, matrix1, out=None):
+    """Return matrix0 followed by matrix1, written to out if it is given.
+
+    Works on single 4x4 matrices and on arrays of them. out must not be
+    one of the inputs.
+
+    >>> M0 = random_rotation_matrix()
+    >>> M1 = translation_matrix([1, 2, 3])
+    >>> numpy.allclose(compose_matrices(M0, M1), concatenate_matrices(M0, M1))
+    True
+    >>> M = numpy.empty((2, 4, 4))
+    >>> R = compose_matrices(numpy.array([M0, M1]), M1, M)
+    >>> R is M and numpy.allclose(M[0], numpy.dot(M0, M1))
+    True
+
+    """
+    if out is None:
+        return numpy.matmul(matrix0, matrix1)
+    return numpy.matmul(matrix0, matrix1, out=out)
+
 def rotation_from_matrix(matrix):
     """Return rotation angle and axis from rotation matrix.
 
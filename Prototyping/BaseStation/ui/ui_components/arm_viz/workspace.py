@@ -0,0 +1,188 @@
+#! /usr/bin/env python2
+"""
+Precomputed map of where the end of an arm can reach
+
+Building samples the joint limits of the arm, runs forward kinematics on all of the samples in batches and
+keeps, for every cell of a grid over the end positions, the sample that ended closest to the middle of the cell.
+Queries are then a grid lookup: whether a target is reachable, a warm start for the IK solver, and the nearest
+reachable position for targets outside of the workspace.
+
+Run this file to build the map of the rover arm ahead of time:
+    python workspace.py
+"""
+
+import os
+import numpy as np
+from armature import *
+
+# Where the map of the rover arm is kept
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "workspace.npz")
+
+
+class Workspace:
+    """
+    Discretized workspace of an arm with a seed configuration for every reachable cell
+    """
+
+    def __init__(self, signature, origin, cell_size, index, seeds, ends):
+        """
+        :param signature: Array describing the arm the map was built for, see arm_signature()
+        :param origin: Position of the corner of the first cell
+        :param cell_size: Width of a cell, in the same units as the limb lengths
+        :param index: 3d grid of indices into seeds and ends, -1 for unreachable cells
+        :param seeds: Array with one arm configuration per reachable cell
+        :param ends: The end position of each seed
+        """
+        self.signature = signature
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.cell_size = float(cell_size)
+        self.index = index
+        self.seeds = seeds
+        self.ends = ends
+
+    @staticmethod
+    def build(armature, cell_size=5.0, samples=200000, batch_size=20000, seed=0):
+        """
+        Samples the joint limits of the armature to find the cells it can reach
+        :param armature: The Arm to build the map for
+        :param cell_size: Width of a cell, in the same units as the limb lengths
+        :param samples: Number of random arm configurations to evaluate
+        :param batch_size: Number of configurations evaluated at once
+        :param seed: Seed of the random configurations so builds can be repeated
+        :return: A new Workspace
+        """
+        random = np.random.RandomState(seed)
+        parameters_min = np.array(armature.min_parameters())
+        parameters_max = np.array(armature.max_parameters())
+
+        configurations = []
+        ends = []
+        for start in range(0, samples, batch_size):
+            batch = random.uniform(parameters_min, parameters_max, (min(batch_size, samples - start), len(parameters_min)))
+            configurations.append(batch)
+            ends.append(armature.forward_batch(batch)[:, -1])
+        configurations = np.concatenate(configurations)
+        ends = np.concatenate(ends)
+
+        # Fit the grid around every position that was reached, a planar arm only gets one layer
+        origin = np.floor(ends.min(axis=0) / cell_size) * cell_size
+        cells = np.floor((ends - origin) / cell_size).astype(np.int64)
+        shape = tuple(cells.max(axis=0) + 1)
+        flat = np.ravel_multi_index(cells.T, shape)
+
+        # Keep the sample closest to the middle of each cell
+        offset = np.linalg.norm(ends - (origin + (cells + .5) * cell_size), axis=1)
+        order = np.lexsort((offset, flat))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = flat[order][1:] != flat[order][:-1]
+        best = order[first]
+
+        index = np.full(shape, -1, dtype=np.int32)
+        index.ravel()[flat[best]] = np.arange(len(best), dtype=np.int32)
+
+        return Workspace(arm_signature(armature), origin, cell_size, index, configurations[best], ends[best])
+
+    @staticmethod
+    def load(path, armature=None):
+        """
+        Loads a map saved with save()
+        :param path: File to load
+        :param armature: If given, the map is only returned when it was built for an arm with the same limbs and limits
+        :return: The Workspace, or None if the file is missing or was built for a different arm
+        """
+        if not os.path.exists(path):
+            return None
+
+        data = np.load(path)
+        workspace = Workspace(data["signature"], data["origin"], float(data["cell_size"]), data["index"],
+                              data["seeds"], data["ends"])
+
+        if armature is not None and not workspace.matches(armature):
+            return None
+        return workspace
+
+    def save(self, path):
+        """
+        Saves the map so it doesn't have to be built every time the UI starts
+        :param path: File to save to, numpy adds .npz if it is missing
+        :return: None
+        """
+        np.savez_compressed(path, signature=self.signature, origin=self.origin, cell_size=self.cell_size,
+                            index=self.index, seeds=self.seeds, ends=self.ends)
+
+    def matches(self, armature):
+        """
+        :param armature: An Arm
+        :return: True if the map was built for an arm with the same limbs and limits
+        """
+        signature = arm_signature(armature)
+        return signature.shape == self.signature.shape and np.allclose(signature, self.signature)
+
+    def cell(self, position):
+        """
+        :param position: A position in 3d space
+        :return: Index into seeds and ends of the cell the position is in, -1 if it is unreachable or off the grid
+        """
+        cell = np.floor((np.asarray(position, dtype=np.float64) - self.origin) / self.cell_size).astype(np.int64)
+        if np.any(cell < 0) or np.any(cell >= self.index.shape):
+            return -1
+        return int(self.index[tuple(cell)])
+
+    def contains(self, position):
+        """
+        :param position: A position in 3d space
+        :return: True if the end of the arm can reach the cell the position is in
+        """
+        return self.cell(position) >= 0
+
+    def seed(self, position):
+        """
+        :param position: A position in 3d space
+        :return: A configuration of the arm that ends close to the position, None if the position is unreachable
+        """
+        cell = self.cell(position)
+        if cell < 0:
+            return None
+        return self.seeds[cell].copy()
+
+    def nearest(self, position):
+        """
+        Finds the closest position the arm is known to reach
+        :param position: A position in 3d space
+        :return: Tuple of the reachable position and the configuration of the arm that reaches it
+        """
+        cell = self.cell(position)
+        if cell < 0:
+            cell = int(np.argmin(np.sum((self.ends - position) ** 2, axis=1)))
+        return self.ends[cell].copy(), self.seeds[cell].copy()
+
+
+def arm_signature(armature):
+    """
+    :param armature: An Arm
+    :return: Array of the limb lengths followed by the limits of every parameter
+    """
+    return np.concatenate((armature.lengths, armature.mins, armature.maxs))
+
+
+def load_or_build(armature, path=DEFAULT_PATH):
+    """
+    Loads the map of the armature, building and saving it first if it is missing or out of date
+    :param armature: The Arm to get the map of
+    :param path: Where the map is kept
+    :return: The Workspace
+    """
+    workspace = Workspace.load(path, armature)
+    if workspace is None:
+        workspace = Workspace.build(armature)
+        try:
+            workspace.save(path)
+        except (IOError, OSError):
+            print "Can't save the arm workspace to " + path
+    return workspace
+
+
+if __name__ == '__main__':
+    workspace = Workspace.build(make_rover_arm())
+    workspace.save(DEFAULT_PATH)
+    print "Saved %d reachable cells to %s" % (len(workspace.seeds), DEFAULT_PATH)
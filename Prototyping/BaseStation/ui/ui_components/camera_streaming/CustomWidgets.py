@@ -4,24 +4,20 @@ from PyQt4 import QtGui, QtCore
 
 
 class VLCWidget(QtGui.QFrame):
-    def __init__(self, url, options, instance):
+    def __init__(self, feed):
         QtGui.QFrame.__init__(self)
 
-        self.instance = instance
-
-        # Creates the VLC Player Object
-        self.player = self.instance.media_player_new()
-        self.id = ""
-        self.url = url
+        # The player belongs to the feed of the camera pipeline
+        self.feed = feed
+        self.player = feed.player
+        self.id = feed.id
+        self.url = feed.url
 
         self.pal = self.palette()
         self.pal.setColor(QtGui.QPalette.Window, QtGui.QColor(0, 0, 0))
         self.setPalette(self.pal)
         self.setAutoFillBackground(True)
 
-        # Set Media that will play
-        self.player.set_media(self.instance.media_new(url, options))
-
     # Need to figure out how events work in PyQT so we can call this function
     # after the widget has been assigned to a layout
     def assignWindowId(self):
@@ -35,10 +31,10 @@ class VLCWidget(QtGui.QFrame):
         elif sys.platform == "win32":  # for Windows
             self.player.set_hwnd(self.winId())
         elif sys.platform == "darwin":  # for MacOS
-            self.mediaplayer.set_nsobject(self.winId())
+            self.player.set_nsobject(self.winId())
 
     def play(self):
-        self.player.play()
+        self.feed.play()
 
 
 class Button(QtGui.QPushButton):
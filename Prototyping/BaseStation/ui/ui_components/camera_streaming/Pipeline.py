@@ -0,0 +1,195 @@
+import os
+import time
+import vlc
+
+"""
+Camera pipeline, every stream is opened and decoded once
+
+All feeds share one VLC instance. Recording doesn't open the stream again: the feed is restarted with a
+duplicate stream output that sends the same packets to the display and to a file, remuxed without
+transcoding unless a transcode chain is given.
+"""
+
+# Where recordings are saved
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "video_output")
+
+# Options of every stream, keep as little buffered as possible
+STREAM_OPTIONS = (":network-caching=0",)
+
+_instance = None
+
+
+def get_instance():
+    """
+    :return: The VLC instance shared by every feed, created on first use
+    """
+    global _instance
+    if _instance is None:
+        _instance = vlc.Instance('--quiet', '--no-video-on-top')
+    return _instance
+
+
+class Feed:
+    """
+    A stream played by one media player, optionally recorded at the same time
+    """
+
+    def __init__(self, url, id, options=STREAM_OPTIONS):
+        """
+        :param url: Url of the stream or a video file
+        :param id: Index of the feed
+        :param options: VLC media options of the stream
+        """
+        self.url = url
+        self.id = id
+        self.options = list(options)
+        self.player = get_instance().media_player_new()
+        self.media = None
+        self.recording = None
+
+        self.metrics = {"fps": 0.0, "bitrate": 0.0, "dropped": 0, "latency": 0.0}
+        self._reset_metrics()
+
+    def play(self, sout=None):
+        """
+        Starts the stream, restarting it if it is playing
+        :param sout: VLC stream output chain, only the display if None
+        :return: None
+        """
+        options = list(self.options)
+        if sout is not None:
+            options += [":sout=" + sout, ":sout-keep"]
+        self.media = get_instance().media_new(self.url, *options)
+        self.player.set_media(self.media)
+        self.player.play()
+        self._reset_metrics()
+
+    def start_recording(self, path, transcode=None):
+        """
+        Restarts the stream with its packets also going to a file
+        :param path: File to record to, MPEG-TS so the recording is readable even if the UI is killed
+        :param transcode: VLC transcode options such as "vcodec=h264,vb=800", the packets are copied if None
+        :return: None
+        """
+        record = "std{access=file,mux=ts,dst=" + path + "}"
+        if transcode is not None:
+            record = "transcode{" + transcode + "}:" + record
+        self.recording = path
+        self.play("#duplicate{dst=display,dst=" + record + "}")
+
+    def stop_recording(self):
+        """
+        Restarts the stream without recording, closing the file
+        :return: None
+        """
+        self.recording = None
+        self.play()
+
+    def stop(self):
+        """
+        Stops the stream
+        :return: None
+        """
+        self.player.stop()
+
+    def _reset_metrics(self):
+        """
+        Forgets the counters of the previous media, VLC starts them from zero for a new one
+        :return: None
+        """
+        self._last_update = time.time()
+        self._last_displayed = 0
+        self._last_read = 0
+        self._clock_start = None
+
+    def update_metrics(self):
+        """
+        Reads the counters of the stream and updates self.metrics:
+            fps: Pictures displayed every second
+            bitrate: Bits of the stream received every second
+            dropped: Pictures lost since the stream was started
+            latency: Milliseconds the playback has fallen behind real time since the first picture,
+                     grows when the stream stalls or buffers
+        :return: self.metrics
+        """
+        stats = vlc.MediaStats()
+        if self.media is None or not self.media.get_stats(stats):
+            return self.metrics
+
+        now = time.time()
+        elapsed = now - self._last_update
+        if elapsed > 0:
+            self.metrics["fps"] = (stats.displayed_pictures - self._last_displayed) / elapsed
+            self.metrics["bitrate"] = (stats.read_bytes - self._last_read) * 8 / elapsed
+        self.metrics["dropped"] = stats.lost_pictures
+        self._last_update = now
+        self._last_displayed = stats.displayed_pictures
+        self._last_read = stats.read_bytes
+
+        position = self.player.get_time()
+        if position > 0:
+            if self._clock_start is None:
+                self._clock_start = (now, position)
+            start, start_position = self._clock_start
+            self.metrics["latency"] = max(0.0, (now - start) * 1000 - (position - start_position))
+        return self.metrics
+
+
+class CameraPipeline:
+    """
+    Every camera feed of the UI, used as the recorder of the record buttons
+    """
+
+    def __init__(self, urls, output_dir=OUTPUT_DIR, transcode=None):
+        """
+        :param urls: Url of each feed
+        :param output_dir: Where recordings are saved
+        :param transcode: VLC transcode options for recordings, the stream is copied if None
+        """
+        self.feeds = [Feed(url, i) for i, url in enumerate(urls)]
+        self.output_dir = output_dir
+        self.transcode = transcode
+
+        # Number recordings after the ones that are already saved
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        self.count = len([f for f in os.listdir(output_dir) if os.path.isfile(os.path.join(output_dir, f))])
+
+    def play(self):
+        """
+        Starts every feed, give the players their windows first
+        :return: None
+        """
+        for feed in self.feeds:
+            feed.play()
+
+    def start_recording(self, cameraId):
+        """
+        Records the feed without opening its stream again
+        :param cameraId: Index of the feed
+        :return: None
+        """
+        self.count += 1
+        path = os.path.join(self.output_dir, "cam" + str(cameraId + 1) + "_" + str(self.count) + ".ts")
+        self.feeds[cameraId].start_recording(path, self.transcode)
+
+    def stop_recording(self, cameraId):
+        """
+        :param cameraId: Index of the feed
+        :return: None
+        """
+        self.feeds[cameraId].stop_recording()
+
+    def stop(self):
+        """
+        Stops every feed, finishing any recordings
+        :return: None
+        """
+        for feed in self.feeds:
+            feed.stop()
+
+    def metrics(self):
+        """
+        :return: List with the metrics of each feed, see Feed.update_metrics
+        """
+        return [feed.update_metrics() for feed in self.feeds]
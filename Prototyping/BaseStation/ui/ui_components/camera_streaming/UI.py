@@ -1,7 +1,6 @@
 import CustomWidgets
-import Recorder
-from PyQt4 import QtGui
-import vlc
+import Pipeline
+from PyQt4 import QtGui, QtCore
 
 
 class Player(QtGui.QWidget):
@@ -22,10 +21,12 @@ class Player(QtGui.QWidget):
         self.hbox = QtGui.QHBoxLayout()
         self.hbox.setContentsMargins(0, 0, 0, 0)
 
-        # Create the VLC video widgets
-        self.videos = self.createVLCWidgets(urls)
+        # Every stream is opened once, recordings are split off the displayed stream
+        self.pipeline = Pipeline.CameraPipeline(urls)
 
-        self.recorder = Recorder.VLCRecorder(urls)
+        # Create the VLC video widgets
+        self.videos = self.createVLCWidgets(self.pipeline)
+        self.labels = []
 
         for i in range(0, len(urls)):
             # Vertical box will hold the video and its corresponding record button
@@ -38,12 +39,13 @@ class Player(QtGui.QWidget):
             label.setText("URL: " + urls[i])
 
             vbox.addWidget(label)
+            self.labels.append(label)
 
             # Add video widget to layout container
             vbox.addWidget(self.videos[i])
 
             # Create record button then add to layout container
-            recordButton = CustomWidgets.Button("Record Feed " + str(self.videos[i].id + 1), self.videos[i].id, self.recorder)
+            recordButton = CustomWidgets.Button("Record Feed " + str(self.videos[i].id + 1), self.videos[i].id, self.pipeline)
             vbox.addWidget(recordButton)
 
             # Add all vertical layout containers to a horizontal container
@@ -57,15 +59,21 @@ class Player(QtGui.QWidget):
             self.videos[i].assignWindowId()
             self.videos[i].play()
 
-    def createVLCWidgets(self, urls):
-        # Empty list to hold vlc widgets
-        widgets = []
+        # Show the health of each feed under its url
+        self.metrics_timer = QtCore.QTimer()
+        self.metrics_timer.timeout.connect(self.update_metrics)
+        self.metrics_timer.start(1000)
 
-        instance = vlc.Instance('--quiet', '--no-video-on-top')
-        for i in range(0, len(urls)):
-            print urls[i]
-            vlc_widget = CustomWidgets.VLCWidget(urls[i], ":network-caching=0", instance)
-            vlc_widget.id = i
-            widgets.append(vlc_widget)
+    def createVLCWidgets(self, pipeline):
+        # One vlc widget for the player of each feed
+        return [CustomWidgets.VLCWidget(feed) for feed in pipeline.feeds]
+
+    def update_metrics(self):
+        for label, url, metrics in zip(self.labels, self.urls, self.pipeline.metrics()):
+            label.setText("URL: %s  %.1f fps  %.2f Mb/s  %d dropped  %d ms behind" % (
+                url, metrics["fps"], metrics["bitrate"] / 1e6, metrics["dropped"], metrics["latency"]))
 
-        return widgets
+    def stop(self):
+        # Stops the streams so recordings are finished
+        self.metrics_timer.stop()
+        self.pipeline.stop()
@@ -1,12 +1,26 @@
 from PyQt4 import QtCore, QtGui
 import socket, struct
+import select
+import threading
+import time
+import os
+import sys
+import traceback
 import joystick_rewrite
+import telemetry
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Communications"))
+import comms
+import arm_channel
+import latency
+import teleop
 
 
 class CommsUpdate(QtGui.QWidget):
 
     """
     Operates UDP and TCP connection between itself and the rover systems
+    The UDP drive and telemetry traffic runs on its own thread so a busy UI never delays drive commands
     """
 
     # In order, rover ip, this computer, rover udp listening port
@@ -17,8 +31,18 @@ class CommsUpdate(QtGui.QWidget):
     # Rover tcp listening port
     ROVER_TCP_PORT = 8841
 
-    signalStatus = QtCore.pyqtSignal([dict])
-    signalUpdate = QtCore.pyqtSignal([tuple])
+    # Number of drive packets sent to the rover every second
+    SEND_RATE = 100
+
+    # Number of times the stop packet is repeated in case some are lost
+    STOP_REPEAT = 3
+
+    # Arm controller ip and udp listening port, use LOCAL_HOST with InverseKinematics/arm_link.py for a loopback arm
+    ARM_HOST = ROVER_HOST
+    ARM_PORT = 8842
+
+    # Number of arm setpoint packets sent every second
+    ARM_RATE = 20
 
     def __init__(self):
         super(self.__class__,self).__init__()
@@ -30,7 +54,16 @@ class CommsUpdate(QtGui.QWidget):
         # Reset the UI if emergency stopped
         self.stop = False
 
-        joystick_rewrite.joystick_manager.start()
+        # Joint angles in radians the arm is told to go to, None until the arm is moved
+        self.arm_setpoints = None
+
+        # Latest throttle, steering and latency.now() when they were read from the joystick,
+        # replaced as one tuple by the joystick thread
+        self.drive = (0, 0, None)
+
+        # Only the first joystick drives, its profile in joystick_profiles.json maps the throttle and steering axes
+        joystick_rewrite.joystick_manager.subscribe(self.update_drive, joystick=0, functions=["throttle", "steering"])
+        joystick_rewrite.joystick_manager.start(deadzone=.08)
 
         try:
             # UDP connection to the rover
@@ -42,19 +75,56 @@ class CommsUpdate(QtGui.QWidget):
 
         # Do this code if there was no exception in connecting
         else:
-            self.timer = QtCore.QTimer()
-            self.timer.timeout.connect(self.send_message)
-            self.timer.timeout.connect(self.receive_message)
-            self.timer.start(10)
+            # Send and receive on a separate thread so we don't block the UI thread
+            self.worker = NetworkWorker(self, self.rover_sock, self.SEND_RATE, self.ARM_RATE)
+            self.worker_thread = QtCore.QThread()
+            self.worker.moveToThread(self.worker_thread)
+            self.worker_thread.started.connect(self.worker.run)
+
+            # Start the thread; is stopped when the application closes
+            self.worker_thread.start()
 
     def stopping(self):
+        """
+        Emergency stops the rover
+        The stop packet is sent right away from the calling thread instead of waiting for the networking thread
+        :return: None
+        """
         self.stop = True
 
+        buff = struct.pack(teleop.DRIVE_FORMAT, False, 0, 0, 0, latency.now())
+        for i in range(self.STOP_REPEAT):
+            try:
+                self.rover_sock.sendto(buff, (self.ROVER_HOST, self.ROVER_PORT))
+            except:
+                print "Failed to send stop"
+
+    def update_drive(self, state):
+        """
+        Called by the joystick thread when the drive stick moves or the joystick is unplugged
+        :param state: JoystickState of the first joystick, its functions go from -1 to 1
+        :return: None
+        """
+        self.drive = (int(state.functions.get("throttle", 0.0) * 255), int(state.functions.get("steering", 0.0) * 100),
+                      latency.now())
+
+    def set_arm_setpoints(self, angles):
+        """
+        Sets the joint angles the networking thread sends to the arm
+        :param angles: Joint angles in radians from the base to the wrist
+        :return: None
+        """
+        self.arm_setpoints = list(angles)
+
     def shutdown(self):
         """
         Called when the UI is being closed by the user, closes the UDP connection for anymore data
         :return: None
         """
+        joystick_rewrite.joystick_manager.stop()
+        self.worker.shutdown()
+        self.worker_thread.quit()
+        self.worker_thread.wait()
         self.rover_sock.close()
 
     def open_tcp(self):
@@ -73,99 +143,188 @@ class CommsUpdate(QtGui.QWidget):
         """
         self.auto_sock.close()
 
-    def send_message(self):
-        """
-        Sends the rover throttle and steering information from joystick axises
-        :return: None
-        """
+    def send_auto_mode(self, more, lat, lng):
 
-        throttle = 0
-        steering = 0
+        # Put the first boolean value in the buffer
+        buff = struct.pack(teleop.GPS_FORMAT, more, lat, lng)
 
-        try:
-            throttle = joystick_rewrite.joystick_manager.joysticks[0].axis[1]
-            steering = joystick_rewrite.joystick_manager.joysticks[0].axis[0]
-            # steering = self.joy.joystick_axis[0][0]
-        except:
-            pass
-        else:
-            throttle = translateValue(throttle, -32768, 32768, 255, -255)
-            steering = translateValue(steering, -32768, 32768, -100, 100)
-            if abs(throttle) < 20:
-                throttle = 0
-            if abs(steering) < 20:
-                steering = 0
+        self.auto_sock.send(buff)
 
-        # Put the first 2 boolean values in the buffer
-        buff = struct.pack("<?hh", self.auto, int(throttle), int(steering))
 
-        try:
-            self.rover_sock.sendto(buff, (self.ROVER_HOST, self.ROVER_PORT))
-        except:
-            print "Failed to send"
+class NetworkWorker(QtCore.QObject):
 
-        # TODO: Add sending code for the arm
+    """
+    Sends drive and arm packets at fixed rates and drains every telemetry packet that has arrived in between
+    Telemetry is published to the thread safe telemetry bus which hands it to the UI thread
+    """
 
-    def send_auto_mode(self, more, lat, lng):
+    def __init__(self, comms, sock, rate, arm_rate):
+        super(NetworkWorker, self).__init__()
+        self.comms = comms
+        self.sock = sock
+        self.period = 1.0 / rate
+        self.arm_period = 1.0 / arm_rate
 
-        # Put the first boolean value in the buffer
-        buff = struct.pack("<?ff", more, lat, lng)
+        self.arm_sequence = 0
+        self.last_arm_sequence = None
 
-        self.auto_sock.send(buff)
+        # Traces every drive packet to the motors of the rover
+        self.latency = latency.TeleopLatency()
 
-    def receive_message(self):
+        self._stopping = threading.Event()
+
+    def shutdown(self):
+        """Stops the loop, returns before the loop has exited"""
+        self._stopping.set()
+
+    def run(self):
         """
-        Receive the incoming UDP packets, unpack them and emit them so other UI components can use them
-        :return: Emit a dictionary of sensor values
-        :return: Emit a tuple of lat lng coordinates
+        Runs until shutdown() is called
+        Waits on the socket until the next drive packet is due so telemetry is read as soon as it arrives
+        :return: None
+        """
+        next_send = time.time()
+        next_arm_send = next_send
+        while not self._stopping.is_set():
+            timeout = max(0, min(next_send, next_arm_send) - time.time())
+            try:
+                readable, writable, error = select.select([self.sock], [], [], timeout)
+            except (select.error, socket.error, ValueError):
+                # Socket was closed while waiting
+                break
+
+            if readable:
+                self.guarded(self.receive_message)
+
+            now = time.time()
+            if now >= next_send:
+                self.guarded(self.send_message)
+                next_send += self.period
+
+                # Don't try to catch up on sends that were missed, only the latest values matter
+                if next_send < now:
+                    next_send = now + self.period
+
+            if now >= next_arm_send:
+                self.guarded(self.send_arm_message)
+                next_arm_send += self.arm_period
+                if next_arm_send < now:
+                    next_arm_send = now + self.arm_period
+
+    @staticmethod
+    def guarded(step):
+        """
+        Runs one step of the loop, printing what it raises so one bad packet can't stop the drive packets
+        :param step: Method of the loop to run
+        :return: None
         """
-
         try:
-            rover_data = self.rover_sock.recv(1024)
-        except:
-            # Do nothing
-            pass
-        else:
-            # Unpack the first six floats of the packet
-            tup = struct.unpack_from("<ffffffff", rover_data, 0)
-            pot = tup[0]
-            mag = tup[1]
-            enc_1 = tup[2]
-            enc_2 = tup[3]
-            enc_3 = tup[4]
-            enc_4 = tup[5]
-            lat = tup[6]
-            lng = tup[7]
+            step()
+        except Exception:
+            traceback.print_exc()
+
+    def send_message(self):
+        """
+        Sends the rover throttle and steering information from joystick axises
+        The joystick thread keeps the latest values up to date, sending only reads them
+        :return: None
+        """
 
-            dictionary = {"Potentiometer": str(pot), "Magnetometer": str(mag),
-                      "Encoder 1": str(enc_1), "Encoder 2": str(enc_2), "Encoder 3": str(enc_3), "Encoder 4": str(enc_4)}
+        throttle, steering, input_time = self.comms.drive
 
-            self.signalStatus.emit(dictionary)
+        # Keep the rover stopped once emergency stop has been pressed
+        if self.comms.stop:
+            throttle = 0
+            steering = 0
+            input_time = None
 
-            print lat, lng
+        trace_id, sent = self.latency.sent(input_time)
+        buff = struct.pack(teleop.DRIVE_FORMAT, self.comms.auto and not self.comms.stop, int(throttle), int(steering),
+                           trace_id, sent)
 
-            self.signalUpdate.emit((lat, lng))
+        try:
+            self.sock.sendto(buff, (self.comms.ROVER_HOST, self.comms.ROVER_PORT))
+        except:
+            print "Failed to send"
 
-            # TODO: add arm packets structure
+    def send_arm_message(self):
+        """
+        Sends the latest arm joint setpoints
+        Nothing is sent after emergency stop so the arm stops itself once its setpoints time out
+        :return: None
+        """
+        setpoints = self.comms.arm_setpoints
+        if setpoints is None or self.comms.stop:
+            return
 
+        buff = comms.pack_message(arm_channel.setpoints_packet(self.arm_sequence, setpoints))
+        self.arm_sequence = arm_channel.next_sequence(self.arm_sequence)
 
-# translate values from one range to another
-def translateValue(value, inMin, inMax, outMin, outMax):
-    """
-    Linearly maps from one range to another range
-    :param value: Input value to convert
-    :param inMin: Bottom of the input range
-    :param inMax: Top of the input range
-    :param outMin: Bottom of the output range
-    :param outMax: Top of the output range
-    :return: Value scaled to the new range dimensions
-    """
-    # Figure out how 'wide' each range is
-    inSpan = inMax - inMin
-    outSpan = outMax - outMin
+        try:
+            self.sock.sendto(buff, (self.comms.ARM_HOST, self.comms.ARM_PORT))
+        except:
+            print "Failed to send arm setpoints"
 
-    # Convert the left range into a 0-1 range (float)
-    valueScaled = float(value - inMin) / float(inSpan)
+    def receive_message(self):
+        """
+        Receive every incoming UDP packet, unpack the latest one and publish it so other UI components can use it
+        The telemetry bus hands the values to the widgets at the UI frame rate
+        :return: None
+        """
 
-    # Convert the 0-1 range into a value in the right range.
-    return outMin + (valueScaled * outSpan)
+        rover_data = None
+        arm_state = None
+
+        # Drain the socket, older packets are out of date anyway
+        while True:
+            try:
+                data, address = self.sock.recvfrom(1024)
+            except socket.error:
+                break
+
+            if address[1] == self.comms.ARM_PORT:
+                try:
+                    packet = comms.unpack_message(data)
+                except (KeyError, struct.error):
+                    continue
+                if packet["type"] != comms.Protocol.arm_state:
+                    continue
+
+                state = arm_channel.read_state(packet)
+                if arm_channel.is_newer(state[0], self.last_arm_sequence):
+                    self.last_arm_sequence = state[0]
+                    arm_state = state
+            elif len(data) >= struct.calcsize(teleop.SENSOR_FORMAT):
+                # Packets too short to be telemetry of the rover are dropped
+                rover_data = data
+
+        if arm_state is not None:
+            sequence, positions, currents = arm_state
+            telemetry.telemetry_bus.publish_many({"Arm Position": tuple(positions), "Arm Current": tuple(currents)})
+
+        if rover_data is None:
+            return
+
+        # Unpack the first eight floats of the packet
+        tup = struct.unpack_from(teleop.SENSOR_FORMAT, rover_data, 0)
+        pot = tup[0]
+        mag = tup[1]
+        enc_1 = tup[2]
+        enc_2 = tup[3]
+        enc_3 = tup[4]
+        enc_4 = tup[5]
+        lat = tup[6]
+        lng = tup[7]
+
+        telemetry.telemetry_bus.publish_many({"Potentiometer": pot, "Magnetometer": mag,
+                                              "Encoder 1": enc_1, "Encoder 2": enc_2, "Encoder 3": enc_3,
+                                              "Encoder 4": enc_4, "Position": (lat, lng)})
+
+        # Latency trace of the latest drive packet the rover got, older rover code doesn't send it
+        if len(rover_data) >= struct.calcsize(teleop.TELEMETRY_FORMAT):
+            trace = struct.unpack_from(teleop.TELEMETRY_FORMAT, rover_data, 0)[8:]
+            end_to_end = self.latency.replied(*trace)
+            if end_to_end is not None:
+                telemetry.telemetry_bus.publish_many({
+                    "Teleop Latency": round(end_to_end * 1000, 1),
+                    "Teleop Latency p95": round(self.latency.histograms["end_to_end"].percentile(0.95) * 1000, 1)})
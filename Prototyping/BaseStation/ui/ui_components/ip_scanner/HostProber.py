@@ -0,0 +1,153 @@
+import errno
+import select
+import socket
+import time
+from collections import deque
+
+# Errors from connect() that still prove the host answered
+_ANSWERED = (0, errno.ECONNREFUSED, getattr(errno, "WSAECONNREFUSED", errno.ECONNREFUSED))
+
+# Errors from a non-blocking connect() that mean the attempt is under way
+_IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY,
+                getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK))
+
+
+class HostStatus:
+    """
+    Round trip history of a single host
+    """
+
+    def __init__(self, ip, port, history):
+        """
+        :param ip: IP address of the host as a string
+        :param port: TCP port that is probed
+        :param history: Number of probes remembered for the statistics
+        """
+        self.ip = ip
+        self.port = port
+
+        # Round trip time in milliseconds of every remembered probe, None if it was lost
+        self.rtts = deque(maxlen=history)
+
+        # The last state given to the UI, None before the first probe
+        self.reported = None
+
+    def add(self, rtt):
+        """
+        :param rtt: Round trip time of the probe in milliseconds or None if the probe was lost
+        :return: None
+        """
+        self.rtts.append(rtt)
+
+    def is_active(self):
+        """
+        :return: True if the last probe was answered
+        """
+        return len(self.rtts) > 0 and self.rtts[-1] is not None
+
+    def average_rtt(self):
+        """
+        :return: The average round trip time in milliseconds of the answered probes or None if all were lost
+        """
+        answered = [rtt for rtt in self.rtts if rtt is not None]
+        if not answered:
+            return None
+        return sum(answered) / len(answered)
+
+    def loss(self):
+        """
+        :return: Percentage of the remembered probes that were lost
+        """
+        if not self.rtts:
+            return 0.0
+        return 100.0 * sum(1 for rtt in self.rtts if rtt is None) / len(self.rtts)
+
+    def state(self):
+        """
+        :return: What the UI shows for this host, loss is rounded to tens so small changes aren't reported
+        """
+        return self.is_active(), int(round(self.loss() / 10)) * 10
+
+
+class HostProber:
+    """
+    Checks whether hosts are reachable by starting a non-blocking TCP connection to every host at once
+    A host counts as reachable if it accepts or refuses the connection, only a timeout means it is down
+    No processes are started and no privileges are needed unlike ICMP ping
+    """
+
+    def __init__(self, ips, port=80, timeout=0.4, history=20):
+        """
+        :param ips: Iterable of IP address strings, or a dictionary of IP address strings to TCP ports
+        :param port: TCP port probed on hosts without their own port
+        :param timeout: Seconds to wait for answers, keep it below the probing interval
+        :param history: Number of probes remembered per host
+        """
+        self.timeout = timeout
+        self.hosts = {}
+        for ip in ips:
+            host_port = ips[ip] if isinstance(ips, dict) and isinstance(ips[ip], int) else port
+            self.hosts[ip] = HostStatus(ip, host_port, history)
+
+    def probe_all(self):
+        """
+        Probes every host concurrently and waits at most timeout seconds for all of them
+        :return: None
+        """
+        pending = {}
+        start = time.time()
+
+        for ip, host in self.hosts.iteritems():
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            try:
+                code = sock.connect_ex((ip, host.port))
+            except socket.error:
+                # Bad address or no route, counts as lost
+                sock.close()
+                host.add(None)
+                continue
+
+            if code in _ANSWERED:
+                host.add((time.time() - start) * 1000)
+                sock.close()
+            elif code in _IN_PROGRESS:
+                pending[sock] = host
+            else:
+                host.add(None)
+                sock.close()
+
+        try:
+            while pending:
+                remaining = self.timeout - (time.time() - start)
+                if remaining <= 0:
+                    break
+
+                # Windows reports failed connections as exceptional instead of writable
+                sockets = list(pending.keys())
+                _, writable, exceptional = select.select([], sockets, sockets, remaining)
+
+                now = time.time()
+                for sock in set(writable) | set(exceptional):
+                    host = pending.pop(sock)
+                    code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    host.add((now - start) * 1000 if code in _ANSWERED else None)
+                    sock.close()
+        finally:
+            # Everything left timed out
+            for sock, host in pending.iteritems():
+                host.add(None)
+                sock.close()
+
+    def changed(self):
+        """
+        Finds the hosts whose state changed since the last call
+        :return: List of tuples (ip, active, average rtt in ms, loss percentage) for the changed hosts
+        """
+        results = []
+        for ip, host in self.hosts.iteritems():
+            state = host.state()
+            if state != host.reported:
+                host.reported = state
+                results.append((ip, host.is_active(), host.average_rtt(), host.loss()))
+        return results
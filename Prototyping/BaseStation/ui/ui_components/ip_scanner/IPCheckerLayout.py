@@ -1,6 +1,6 @@
 import NetworkChecker
+import HostProber
 from PyQt4 import QtGui, QtCore
-import subprocess, os
 
 
 class IPList(QtGui.QWidget):
@@ -41,7 +41,7 @@ class IPList(QtGui.QWidget):
     def update_ui(self, results):
         """
         Iterates through the results and updates the corresponding ip's "light" to the correct green or red state
-        :param results: A dictionary with the ip address mapped to a boolean of active state
+        :param results: A list of tuples (ip, active, average rtt in ms, loss percentage) of the hosts that changed
         True if active, False if cannot reach ip
         :return: None
         """
@@ -66,6 +66,11 @@ class IPList(QtGui.QWidget):
                 p.setColor(indicator.foregroundRole(), color)
                 indicator.setPalette(p)
 
+            if results[i][2] is None:
+                indicator.setToolTip("No reply, %d%% loss" % results[i][3])
+            else:
+                indicator.setToolTip("%.1f ms, %d%% loss" % (results[i][2], results[i][3]))
+
     def build_list(self):
         """
         Builds the initial list of indicators and maps the ip address to the indicator object
@@ -113,7 +118,7 @@ class IPList(QtGui.QWidget):
 class MyThread(QtCore.QObject):
 
     """
-    Pings all ips in a given list and creates a dictionary mapping the ip to the active status as a boolean
+    Probes all ips in a given list at once and emits the ones whose active status changed
     """
 
     # A new signal that transmits a list object
@@ -124,35 +129,17 @@ class MyThread(QtCore.QObject):
     def __init__(self, paths):
         super(MyThread, self).__init__()
         self.paths = paths
+        self.prober = HostProber.HostProber(paths)
 
     def start_work(self):
         """
-        Pings through all ips in the list, making the ip to boolean map and emitting it
-        :return: Emits a dictionary
+        Probes all ips in the list, emitting the ones that changed since the last time
+        :return: Emits a list
         """
-        results = []
-
-        # Ping all ips in the list
-        for key, value in self.paths.iteritems():
-            results.append((key, self.ping(key)))
+        self.prober.probe_all()
+        results = self.prober.changed()
 
         # Tell PyQt the work is done and send the results to listeners
-        # Results list is contains tuples of (ip, isActive boolean)
-        self.signalStatus.emit(results)
-
-    # Ping the remote host
-    def ping(self, hostname):
-
-        """ 
-        Use the ping utility to attempt to reach the host. We send 5 packets
-        ('-c 5') and wait 3 milliseconds ('-W 3') for a response. The function
-        returns the return code from the ping utility.
-        Works on all operating systems.
-        :param hostname: IP address to ping as a string
-        :return: Boolean - true if pinging was successful
-        """
-
-        ret_code = subprocess.call("ping -w 200 " + hostname,
-                                   stdout=open(os.devnull, 'w'),
-                                   stderr=open(os.devnull, 'w'))
-        return ret_code == 0
+        # Results list contains tuples of (ip, isActive boolean, average rtt, loss percentage)
+        if results:
+            self.signalStatus.emit(results)
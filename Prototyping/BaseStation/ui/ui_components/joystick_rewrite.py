@@ -1,128 +1,553 @@
-from PyQt4 import QtCore, QtGui
+import argparse
+import ctypes
+import json
+import os
+import threading
+import time
 
 import sdl2
-import sdl2.ext
 
 """
-Joystick interface implemented with PySDL2
+Joystick interface implemented with PySDL2, the one input library of the base station
 
-Should only be used only with other PyQt code so Qt's internal event loop will prevent
-any race conditions.
+SDL events are read on their own thread which sleeps in SDL_WaitEventTimeout until the
+joystick changes, so nothing runs on the Qt GUI thread. Axes are scaled to -1 to 1 and the
+deadzone is applied once here. Every change produces a new immutable, timestamped
+JoystickState and the subscribers whose axes, buttons, hats or functions changed are called with it.
+
+Each joystick gets a mapping profile from joystick_profiles.json by its name. A profile names
+functions such as "throttle" after an axis or button, with the inversion, deadzone and expo curve
+of the axis, so code reads state.functions["throttle"] instead of knowing the layout of every
+joystick. Plugging and unplugging only touches that joystick, the others keep their state, and a
+joystick plugged back in takes the lowest free slot so it usually gets its old slot back.
+
+Published states can be recorded to a file and replayed through the same subscribers without any
+joystick, so driving sessions can be reproduced:
+    python joystick_rewrite.py --record drive.jsonl
+    python joystick_rewrite.py --replay drive.jsonl --speed 0
+
+Callbacks run on the joystick thread. They should only store the values they need, Qt widgets
+should hand the state to the GUI thread through a signal.
 """
 
-sdl2.SDL_Init(sdl2.SDL_INIT_JOYSTICK)
+# Largest magnitude of a raw SDL axis value
+_AXIS_MAX = 32767.0
 
+# Mapping profiles of the joysticks, by joystick name
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "joystick_profiles.json")
 
-class _Joystick:
-    """Instance of a joystick"""
+# Profile of joysticks that don't have one of their own
+DEFAULT_PROFILE = "default"
+
+
+def scale_axis(value, deadzone):
+    """
+    Scales a raw SDL axis value to -1 to 1, values inside the deadzone become 0
+    The range outside of the deadzone is stretched so the output still starts at 0
+    :param value: Raw axis value from -32768 to 32767
+    :param deadzone: Fraction of the range around the center that is ignored
+    :return: The scaled value
+    """
+    scaled = max(-1.0, min(1.0, value / _AXIS_MAX))
+    if abs(scaled) <= deadzone:
+        return 0.0
+    if scaled > 0:
+        return (scaled - deadzone) / (1 - deadzone)
+    return (scaled + deadzone) / (1 - deadzone)
+
+
+def expo(value, amount):
+    """
+    Applies an expo curve, small stick movements become finer while full deflection stays full
+    :param value: Axis value from -1 to 1
+    :param amount: 0 is linear and 1 is fully cubic
+    :return: The curved value
+    """
+    return (1 - amount) * value + amount * value ** 3
+
+
+class AxisMapping(object):
+    """How the value of a function is read from an axis"""
+
+    __slots__ = ("axis", "invert", "deadzone", "expo")
+
+    def __init__(self, axis, invert=False, deadzone=None, expo=0.0):
+        """
+        :param axis: Index of the axis
+        :param invert: True to flip the sign, SDL gives negative values for pushing a stick forward
+        :param deadzone: Deadzone of this function, the deadzone of the manager if None
+        :param expo: Amount of expo curve from 0 to 1
+        """
+        self.axis = axis
+        self.invert = invert
+        self.deadzone = deadzone
+        self.expo = expo
+
+    def apply(self, raw_axis, deadzone):
+        """
+        :param raw_axis: Raw SDL values of every axis of the joystick
+        :param deadzone: Deadzone to use if the mapping doesn't have one
+        :return: Value of the function from -1 to 1, 0 if the joystick doesn't have the axis
+        """
+        if self.axis >= len(raw_axis):
+            return 0.0
+        value = scale_axis(raw_axis[self.axis], deadzone if self.deadzone is None else self.deadzone)
+        if self.invert:
+            value = -value
+        return expo(value, self.expo)
+
+
+class Profile(object):
+    """Functions of a joystick layout, mapped to axes and buttons"""
+
+    def __init__(self, name, axes=None, buttons=None):
+        """
+        :param name: Joystick name the profile is for
+        :param axes: Dictionary of function name to AxisMapping
+        :param buttons: Dictionary of function name to button index
+        """
+        self.name = name
+        self.axes = axes or dict()
+        self.buttons = buttons or dict()
+
+    @staticmethod
+    def from_config(name, config):
+        """
+        Makes a profile from its entry in the profiles file
+        :param name: Joystick name the profile is for
+        :param config: Dictionary with "axes", function name to the AxisMapping arguments,
+                       and "buttons", function name to button index
+        :return: The Profile
+        """
+        axes = dict((function, AxisMapping(**mapping)) for function, mapping in config.get("axes", {}).items())
+        return Profile(name, axes, dict(config.get("buttons", {})))
+
+    def map(self, raw_axis, button, deadzone):
+        """
+        :param raw_axis: Raw SDL values of every axis of the joystick
+        :param button: Button states of the joystick
+        :param deadzone: Deadzone of axes that don't have their own
+        :return: Dictionary of function name to value
+        """
+        functions = dict((function, mapping.apply(raw_axis, deadzone)) for function, mapping in self.axes.items())
+        for function, index in self.buttons.items():
+            functions[function] = button[index] if index < len(button) else 0
+        return functions
 
-    def __init__(self, index):
-        """Initializes a Joystick object and opens the SDL2 joystick"""
 
-        self.id = index
+def load_profiles(path=PROFILES_PATH):
+    """
+    Reads mapping profiles from a JSON file of joystick name to profile entry, see Profile.from_config
+    :param path: File to read
+    :return: Dictionary of joystick name to Profile, empty if the file is missing
+    """
+    if not os.path.exists(path):
+        return dict()
+    with open(path) as profiles_file:
+        config = json.load(profiles_file)
+    return dict((name, Profile.from_config(name, entry)) for name, entry in config.items())
 
-        self._sdl_joystick_obj = sdl2.SDL_JoystickOpen(index)
 
-        self.axis_count = sdl2.SDL_JoystickNumAxes(self._sdl_joystick_obj)
-        self.ball_count = sdl2.SDL_JoystickNumBalls(self._sdl_joystick_obj)
-        self.hat_count = sdl2.SDL_JoystickNumHats(self._sdl_joystick_obj)
-        self.button_count = sdl2.SDL_JoystickNumButtons(self._sdl_joystick_obj)
+def find_profile(profiles, name):
+    """
+    Picks the profile of a joystick, profile names only have to be part of the joystick name
+    :param profiles: Dictionary of joystick name to Profile
+    :param name: Name SDL gives the joystick
+    :return: The exact match, else the longest profile name in the joystick name, else the default profile
+    """
+    if name in profiles:
+        return profiles[name]
+    matches = [key for key in profiles if key != DEFAULT_PROFILE and key in name]
+    if matches:
+        return profiles[max(matches, key=len)]
+    return profiles.get(DEFAULT_PROFILE, Profile(DEFAULT_PROFILE))
 
-        self.axis = list()
-        for i in range(self.axis_count):
-            self.axis.append(0)
 
-        self.ball = list()
-        for i in range(self.ball_count):
-            self.ball.append(0)
+class JoystickState(object):
+    """Immutable snapshot of a joystick"""
 
-        self.hat = list()
-        for i in range(self.hat_count):
-            self.hat.append(0)
+    __slots__ = ("id", "name", "connected", "timestamp", "axis", "ball", "hat", "button", "functions")
 
-        self.button = list()
-        for i in range(self.button_count):
-            self.button.append(0)
+    def __init__(self, id, name, connected, timestamp, axis, ball, hat, button, functions):
+        """
+        :param id: Slot of the joystick, the first joystick plugged in is 0
+        :param name: Name SDL gives the joystick
+        :param connected: False once the joystick has been unplugged, every value is zero then
+        :param timestamp: time.time() when the state was read
+        :param axis: Tuple of scaled axis values from -1 to 1
+        :param ball: Tuple of (x, y) relative ball motions
+        :param hat: Tuple of SDL hat positions
+        :param button: Tuple of button states, 1 if pressed
+        :param functions: Dictionary of function name to value from the profile of the joystick
+        """
+        self.id = id
+        self.name = name
+        self.connected = connected
+        self.timestamp = timestamp
+        self.axis = axis
+        self.ball = ball
+        self.hat = hat
+        self.button = button
+        self.functions = functions
 
     def __repr__(self):
-        return "<index: {}, axis: {}, ball: {}, hat: {}, button: {}>".format(
+        return "<id: {}, axis: {}, ball: {}, hat: {}, button: {}, functions: {}>".format(
             self.id,
             self.axis,
             self.ball,
             self.hat,
-            self.button
+            self.button,
+            self.functions
         )
 
+
+class _Joystick:
+    """Instance of a joystick, only used on the joystick thread"""
+
+    def __init__(self, slot, name, axes, balls, hats, buttons, profile, sdl_joystick=None):
+        """
+        Holds the values of a joystick, open() makes one for a SDL2 joystick
+        Axes are kept as raw SDL values so every function can apply its own deadzone
+        """
+        self.id = slot
+        self.name = name
+        self.profile = profile
+
+        self._sdl_joystick_obj = sdl_joystick
+        self.instance_id = None
+
+        self.raw_axis = [0] * axes
+        self.ball = [(0, 0)] * balls
+        self.hat = [0] * hats
+        self.button = [0] * buttons
+
+    @staticmethod
+    def open(index, slot, profiles):
+        """Opens the SDL2 joystick at the device index and gives it a slot and the profile of its name"""
+        sdl_joystick = sdl2.SDL_JoystickOpen(index)
+        name = sdl2.SDL_JoystickName(sdl_joystick)
+        joystick = _Joystick(slot, name, sdl2.SDL_JoystickNumAxes(sdl_joystick),
+                             sdl2.SDL_JoystickNumBalls(sdl_joystick), sdl2.SDL_JoystickNumHats(sdl_joystick),
+                             sdl2.SDL_JoystickNumButtons(sdl_joystick), find_profile(profiles, name), sdl_joystick)
+        joystick.instance_id = sdl2.SDL_JoystickInstanceID(sdl_joystick)
+        return joystick
+
+    def snapshot(self, deadzone, connected=True):
+        """Returns a JoystickState of the current values, axes use the deadzone"""
+        if not connected:
+            functions = dict.fromkeys(self.profile.axes, 0.0)
+            functions.update(dict.fromkeys(self.profile.buttons, 0))
+            return JoystickState(self.id, self.name, False, time.time(), (0.0,) * len(self.raw_axis),
+                                 ((0, 0),) * len(self.ball), (0,) * len(self.hat), (0,) * len(self.button), functions)
+        return JoystickState(self.id, self.name, True, time.time(),
+                             tuple(scale_axis(value, deadzone) for value in self.raw_axis), tuple(self.ball),
+                             tuple(self.hat), tuple(self.button), self.profile.map(self.raw_axis, self.button, deadzone))
+
     def close(self):
         """Closes the joystick in SDL2"""
-        sdl2.SDL_JoystickClose(self._sdl_joystick_obj)
+        if self._sdl_joystick_obj is not None:
+            sdl2.SDL_JoystickClose(self._sdl_joystick_obj)
 
 
-class _SDLUpdateLoop(QtGui.QWidget):
-    """Continuously invokes a method via a QTimer"""
+class _Subscription:
+    """A callback and the inputs it cares about, None means all of them"""
 
-    def start_loop(self, *args):
-        """Starts the loop with the callback methods given"""
-        self._timer = QtCore.QTimer()
-        for callback in args:
-            self._timer.timeout.connect(callback)
-        self._timer.start(1000 / 120) # Update at 120 Hz
+    def __init__(self, callback, joystick, axes, buttons, hats, functions):
+        self.callback = callback
+        self.joystick = joystick
+        self.axes = None
+        self.buttons = None
+        self.hats = None
+        self.functions = None
+
+        # Naming some inputs leaves out the kinds that weren't named
+        if axes is not None or buttons is not None or hats is not None or functions is not None:
+            self.axes = frozenset(axes or ())
+            self.buttons = frozenset(buttons or ())
+            self.hats = frozenset(hats or ())
+            self.functions = frozenset(functions or ())
+
+    def wants(self, old, new):
+        """Returns True if something this subscription cares about differs between the states"""
+        if self.joystick is not None and new.id != self.joystick:
+            return False
+        if old is None or old.connected != new.connected:
+            return True
+        return (_differs(old.axis, new.axis, self.axes) or _differs(old.button, new.button, self.buttons) or
+                _differs(old.hat, new.hat, self.hats) or _differs(old.functions, new.functions, self.functions) or
+                (self.axes is None and old.ball != new.ball))
+
+
+def _differs(old, new, indices):
+    """
+    Returns True if any of the indices differ between the tuples, all of them if indices is None
+    Dictionaries of functions are compared by name the same way
+    """
+    if indices is None:
+        return old != new
+    if isinstance(new, dict):
+        for name in indices:
+            if old.get(name) != new.get(name):
+                return True
+        return False
+    for i in indices:
+        if i < len(new) and (i >= len(old) or old[i] != new[i]):
+            return True
+    return False
 
 
 class _JoystickManager:
-    """Manages joystick instances"""
+    """Manages joystick instances on a thread of their own"""
 
     def __init__(self):
-        self.joysticks = dict()
-        self._sdl_update_loop = None
-        self._callbacks = list()
-
-        for index in range(sdl2.SDL_NumJoysticks()):
-            self.joysticks[index] = _Joystick(index)
-
-    def start(self):
-        """
-        Starts the joystick listening loop.
-        
-        Run this after the Qt application has already started
-        """
-        self._sdl_update_loop = _SDLUpdateLoop()
-        self._sdl_update_loop.start_loop(self._sdl2_update_loop)
-
-    def add_callback(self, callback):
-        """Adds a callback after a SDL2 update event is processed"""
-        self._callbacks.append(callback)
-
-    def _sdl2_update_loop(self):
-        for event in sdl2.ext.get_events():
-            if event.type == sdl2.SDL_JOYAXISMOTION:
-                self.joysticks[event.jaxis.which].axis[event.jaxis.axis] = event.jaxis.value
-            elif event.type == sdl2.SDL_JOYBALLMOTION:
-                self.joysticks[event.jball.which].ball[event.jball.ball] = (event.jball.xrel, event.jball.yrel)
-            elif event.type == sdl2.SDL_JOYHATMOTION:
-                self.joysticks[event.jhat.which].hat[event.jhat.hat] = event.jhat.value
-            elif event.type == sdl2.SDL_JOYBUTTONUP or event.type == sdl2.SDL_JOYBUTTONDOWN:
-                self.joysticks[event.jbutton.which].button[event.jbutton.button] = event.jbutton.state
-            elif event.type == sdl2.SDL_JOYDEVICEADDED:
-                self.joysticks[event.jdevice.which] = _Joystick(event.jdevice.which)
-            elif event.type == sdl2.SDL_JOYDEVICEREMOVED:
-                self.joysticks[event.jdevice.which].close()
-                del self.joysticks[event.jdevice.which]
-        for callback in self._callbacks:
-            callback()
+        self.deadzone = 0.08
+        self.profiles = dict()
+        self.timeout = 100
+
+        # Latest JoystickState by slot, replaced on every change so readers never see a half update
+        self.states = dict()
+
+        self._joysticks = dict() # By SDL instance id, only used on the joystick thread
+        self._subscriptions = list()
+        self._recording = None # Tuple of (file, start time) while recording
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self, deadzone=None, profiles=PROFILES_PATH, replay=None, speed=1.0):
+        """
+        Starts reading joystick events on a thread
+        :param deadzone: Fraction of every axis range around the center that is ignored, unless a profile sets its own
+        :param profiles: Path of a profiles file or a dictionary of joystick name to Profile
+        :param replay: Path of a recording to play back instead of reading the joysticks
+        :param speed: Speed of the replay, 0 plays it back as fast as the subscribers allow
+        :return: None
+        """
+        if deadzone is not None:
+            self.deadzone = deadzone
+        self.profiles = load_profiles(profiles) if isinstance(profiles, basestring) else dict(profiles)
+
+        if self._thread is None:
+            self._stopping.clear()
+            if replay is None:
+                self._thread = threading.Thread(target=self._run)
+            else:
+                self._thread = threading.Thread(target=self._replay, args=(replay, speed))
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stops the joystick thread and closes every joystick"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+        self.stop_recording()
+
+    def wait(self, timeout=None):
+        """
+        Waits for a replay to reach the end of the recording
+        :param timeout: Seconds to wait, forever if None
+        :return: True if the joystick thread has finished
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+    def record(self, path):
+        """
+        Records every published state to a file until stop_recording() is called
+        Raw axis values are recorded so a replay goes through the profiles again
+        :param path: File to write, one JSON object per line
+        :return: None
+        """
+        recording = (open(path, "w"), time.time())
+        with self._lock:
+            previous, self._recording = self._recording, recording
+        if previous is not None:
+            previous[0].close()
+
+    def stop_recording(self):
+        """Stops recording and closes the file"""
+        with self._lock:
+            recording, self._recording = self._recording, None
+        if recording is not None:
+            recording[0].close()
+
+    def subscribe(self, callback, joystick=None, axes=None, buttons=None, hats=None, functions=None):
+        """
+        Registers a callback for joystick changes, called on the joystick thread with the new JoystickState
+        Only changes to the given inputs call it, plugging or unplugging the joystick always does
+        :param callback: Called with the JoystickState
+        :param joystick: Slot of the joystick, all joysticks if omitted
+        :param axes: Axis indices the callback cares about
+        :param buttons: Button indices the callback cares about
+        :param hats: Hat indices the callback cares about
+        :param functions: Profile function names the callback cares about, every input is watched if none of the
+                          four are given
+        :return: None
+        """
+        with self._lock:
+            self._subscriptions.append(_Subscription(callback, joystick, axes, buttons, hats, functions))
+
+    def unsubscribe(self, callback):
+        """Removes every subscription of the callback"""
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s.callback != callback]
+
+    def get_state(self, joystick=0):
+        """Returns the latest JoystickState of the joystick slot or None if it isn't plugged in"""
+        return self.states.get(joystick)
+
+    def _run(self):
+        """Waits for SDL events and publishes the joysticks they changed"""
+        # Existing joysticks are reported as added events once the subsystem starts
+        sdl2.SDL_Init(sdl2.SDL_INIT_JOYSTICK)
+        event = sdl2.SDL_Event()
+        try:
+            while not self._stopping.is_set():
+                if not sdl2.SDL_WaitEventTimeout(ctypes.byref(event), self.timeout):
+                    continue
+
+                # Handle everything that is queued before publishing
+                changed = dict()
+                self._handle_event(event, changed)
+                while sdl2.SDL_PollEvent(ctypes.byref(event)):
+                    self._handle_event(event, changed)
+                self._publish(changed)
+        finally:
+            for joystick in self._joysticks.values():
+                joystick.close()
+            self._joysticks = dict()
+            self.states = dict()
+            sdl2.SDL_QuitSubSystem(sdl2.SDL_INIT_JOYSTICK)
+
+    def _replay(self, path, speed):
+        """Publishes the states of a recording at the times they were recorded"""
+        joysticks = dict() # By slot
+        start = time.time()
+        try:
+            with open(path) as recording:
+                for line in recording:
+                    record = json.loads(line)
+                    if speed:
+                        self._stopping.wait(max(0, start + record["time"] / speed - time.time()))
+                    if self._stopping.is_set():
+                        break
+
+                    joystick = joysticks.get(record["id"])
+                    if joystick is None or joystick.name != record["name"]:
+                        joystick = _Joystick(record["id"], record["name"], len(record["axis"]), len(record["ball"]),
+                                             len(record["hat"]), len(record["button"]),
+                                             find_profile(self.profiles, record["name"]))
+                        joysticks[joystick.id] = joystick
+                    joystick.raw_axis = list(record["axis"])
+                    joystick.ball = [tuple(ball) for ball in record["ball"]]
+                    joystick.hat = list(record["hat"])
+                    joystick.button = list(record["button"])
+
+                    if not record["connected"]:
+                        del joysticks[joystick.id]
+                    self._publish({joystick.id: (joystick, record["connected"])})
+        finally:
+            # The recording may end with joysticks still plugged in
+            self._publish(dict((slot, (joystick, False)) for slot, joystick in joysticks.items()))
+            self.states = dict()
+
+    def _handle_event(self, event, changed):
+        """
+        Applies a SDL event to its joystick
+        :param changed: Dictionary of slot to the changed joystick and whether it is still connected, filled in here
+        """
+        if event.type == sdl2.SDL_JOYDEVICEADDED:
+            # Unlike the other events, which is the device index here
+            slot = 0
+            used = set(joystick.id for joystick in self._joysticks.values())
+            while slot in used:
+                slot += 1
+            joystick = _Joystick.open(event.jdevice.which, slot, self.profiles)
+            self._joysticks[joystick.instance_id] = joystick
+            changed[slot] = (joystick, True)
+            return
+
+        if event.type == sdl2.SDL_JOYAXISMOTION:
+            joystick = self._joysticks.get(event.jaxis.which)
+            if joystick is not None:
+                joystick.raw_axis[event.jaxis.axis] = event.jaxis.value
+        elif event.type == sdl2.SDL_JOYBALLMOTION:
+            joystick = self._joysticks.get(event.jball.which)
+            if joystick is not None:
+                joystick.ball[event.jball.ball] = (event.jball.xrel, event.jball.yrel)
+        elif event.type == sdl2.SDL_JOYHATMOTION:
+            joystick = self._joysticks.get(event.jhat.which)
+            if joystick is not None:
+                joystick.hat[event.jhat.hat] = event.jhat.value
+        elif event.type == sdl2.SDL_JOYBUTTONUP or event.type == sdl2.SDL_JOYBUTTONDOWN:
+            joystick = self._joysticks.get(event.jbutton.which)
+            if joystick is not None:
+                joystick.button[event.jbutton.button] = event.jbutton.state
+        elif event.type == sdl2.SDL_JOYDEVICEREMOVED:
+            joystick = self._joysticks.pop(event.jdevice.which, None)
+            if joystick is not None:
+                joystick.close()
+                changed[joystick.id] = (joystick, False)
+            return
+        else:
+            return
+
+        if joystick is not None and joystick.id not in changed:
+            changed[joystick.id] = (joystick, True)
+
+    def _publish(self, changed):
+        """Stores new snapshots of the changed joysticks, records them and calls the subscribers that care"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+
+        for slot, (joystick, connected) in changed.items():
+            old = self.states.get(slot)
+            new = joystick.snapshot(self.deadzone, connected)
+
+            states = dict(self.states)
+            if connected:
+                states[slot] = new
+            else:
+                states.pop(slot, None)
+            self.states = states
+
+            with self._lock:
+                if self._recording is not None:
+                    recording, start = self._recording
+                    recording.write(json.dumps({"time": new.timestamp - start, "id": slot, "name": joystick.name,
+                                                "connected": connected, "axis": joystick.raw_axis,
+                                                "ball": joystick.ball, "hat": joystick.hat,
+                                                "button": joystick.button}) + "\n")
+
+            for subscription in subscriptions:
+                if subscription.wants(old, new):
+                    subscription.callback(new)
 
 joystick_manager = _JoystickManager()
 
 if __name__ == "__main__":
     # Code that runs when the script is invoked directly
     def _main():
-        import sys
-        app = QtGui.QApplication(sys.argv)
-        def print_callback():
-            print(joystick_manager.joysticks)
-        joystick_manager.add_callback(print_callback)
-        joystick_manager.start()
-        window = QtGui.QDialog()
-        window.show()
-        sys.exit(app.exec_())
+        parser = argparse.ArgumentParser(description="Prints the state of every joystick as it changes")
+        parser.add_argument("--record", help="File to record the session to")
+        parser.add_argument("--replay", help="Recording to play back instead of reading the joysticks")
+        parser.add_argument("--speed", type=float, default=1.0, help="Replay speed, 0 for as fast as possible")
+        args = parser.parse_args()
+
+        def print_callback(state):
+            print(state)
+        joystick_manager.subscribe(print_callback)
+        if args.record:
+            joystick_manager.record(args.record)
+        joystick_manager.start(replay=args.replay, speed=args.speed)
+        try:
+            while not joystick_manager.wait(1):
+                pass
+        except KeyboardInterrupt:
+            pass
+        joystick_manager.stop()
     _main()
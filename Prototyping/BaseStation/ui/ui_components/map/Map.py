@@ -1,8 +1,10 @@
 import math
 import MapTile
 import Utility
+import Projection
 import sys
 import Marker
+import Track
 from PyQt4 import QtGui, QtCore
 
 
@@ -19,6 +21,9 @@ class Map(QtGui.QWidget):
         self.zoom_level = 15
         self.center = (None, None)
 
+        # Pixel position of the center tile's top left corner for each zoom level
+        self.center_pixels = {}
+
         # Directory where map tiles are located
         self.folderName = None
 
@@ -54,6 +59,11 @@ class Map(QtGui.QWidget):
 
         self.rover = None
 
+        # Breadcrumb trail of every position the rover has reported
+        self.track = Track.Track()
+        # Pixels the mouse may be from a trail point to show where the rover was there
+        self.TRACK_HIT_RADIUS = 8
+
         self.open_map(map_name)
 
     def enterEvent(self, QEvent):
@@ -98,6 +108,7 @@ class Map(QtGui.QWidget):
         # Clear all map tiles
         for i in range(15, 20):
             self.image_tiles[i]["tilesImages"] = []
+        self.center_pixels = {}
 
         self.parse_data_file(map_name)
         self.build_tiles()
@@ -214,6 +225,20 @@ class Map(QtGui.QWidget):
         else:
             self.x = e.x()
             self.y = e.y()
+            self.show_track_point(e.globalPos())
+
+    def show_track_point(self, global_pos):
+        """
+        :param global_pos (QPoint): Position of the mouse on the screen
+
+        Shows the position of the trail point under the mouse in a tool tip, hides it when there is none
+        """
+        x, y = self.get_mouse_pos_projection((self.x, self.y))
+        point = self.track.nearest(self.zoom_level, x, y, self.TRACK_HIT_RADIUS)
+        if point is None:
+            QtGui.QToolTip.hideText()
+        else:
+            QtGui.QToolTip.showText(global_pos, "Rover track: %.6f, %.6f" % point, self)
 
     # Requires the screen to display on
     # Displays all tiles of the current zoom_level with visibility set to true
@@ -228,8 +253,18 @@ class Map(QtGui.QWidget):
                 x = self.image_tiles[self.zoom_level]["tilesImages"][i - 1].screen_location[0]
                 y = self.image_tiles[self.zoom_level]["tilesImages"][i - 1].screen_location[1]
                 painter.drawImage(x, y, self.image_tiles[self.zoom_level]["tilesImages"][i - 1].image)
+        self.track.draw(painter, self.zoom_level, self.get_origin(), self.width(), self.height())
         self.draw_marker(painter)
 
+    def get_origin(self):
+        """
+        :return: The position in the Bing Coordinate System that is drawn at the top left corner of the widget
+        """
+        center_x, center_y = self.get_center_pixel(self.zoom_level)
+        center = self.image_tiles[self.zoom_level]["tilesImages"][((self.image_tiles[self.zoom_level]["tiles"] + 1) / 2) - 1]
+
+        return center_x - center.screen_location[0], center_y - center.screen_location[1]
+
     def get_real_mouse_screen_pos(self, mouse):
 
         # The position of the mouse in the screen coordinate system
@@ -251,12 +286,8 @@ class Map(QtGui.QWidget):
         # Get mouse position adjusted for map movements
         x, y = self.get_real_mouse_screen_pos(mouse)
 
-        # Get the center of the map in the Bing Coordinate System
-        center_bing_x, center_bing_y = Utility.convert_degrees_to_pixels(self.zoom_level, self.center[0], self.center[1])
-
         # Get the pixel position of the top left corner of the center tile on the Bing Coordinate System
-        center_bing_x -= self.TILE_SIZE[0] / 2
-        center_bing_y -= self.TILE_SIZE[1] / 2
+        center_bing_x, center_bing_y = self.get_center_pixel(self.zoom_level)
 
         # Get the position in the Bing Coordinate System of the mouse
         current_bing_x = center_bing_x + x
@@ -282,12 +313,8 @@ class Map(QtGui.QWidget):
         # Get the mouse click position on the Bing Coordinate System
         pixelX, pixelY = Utility.convert_degrees_to_pixels(zoom, lat, lng)
 
-        # Get the center of the map in the Bing Coordinate System
-        centerX, centerY = Utility.convert_degrees_to_pixels(zoom, self.center[0], self.center[1])
-
         # Get the pixel position of the top left corner of the center tile on the Bing Coordinate System
-        centerX -= self.TILE_SIZE[0] / 2
-        centerY -= self.TILE_SIZE[1] / 2
+        centerX, centerY = self.get_center_pixel(zoom)
 
         # Get the vector from the top left of center tile (know position of) to the point we want to move
         dx = pixelX - centerX
@@ -318,7 +345,8 @@ class Map(QtGui.QWidget):
         Adds position of rover to map
         """
         self.rover = self.make_marker(x, y, QtCore.Qt.blue)
-        self.repaint()
+        # Let Qt merge the repaints of packets that arrive faster than the screen refreshes
+        self.update()
 
     # add a new marker given the specified coordinates x and y, assuming that this isn't a rover
     def add_marker(self, x, y):
@@ -351,11 +379,21 @@ class Map(QtGui.QWidget):
         """
         Re-adds markers to map to adjust for zoom level
         """
-        new_marker = []
-        for marker in self.markers:
-            new_marker.append(self.make_marker(marker.coordX, marker.coordY, marker.color))
+        self.markers = self.make_markers([marker.coordX for marker in self.markers],
+                                         [marker.coordY for marker in self.markers],
+                                         [marker.color for marker in self.markers])
+
+    def get_center_pixel(self, zoom):
+        """
+        :param zoom (int): Zoom level of the map
+
+        :return: The top left corner of the center tile in the Bing Coordinate System, computed once per zoom level
+        """
+        if zoom not in self.center_pixels:
+            x, y = Projection.degrees_to_pixels(zoom, float(self.center[0]), float(self.center[1]))
+            self.center_pixels[zoom] = (int(x + 0.5) - self.TILE_SIZE[0] / 2, int(y + 0.5) - self.TILE_SIZE[1] / 2)
 
-        self.markers = new_marker
+        return self.center_pixels[zoom]
 
     # creates a new marker object with the given coordinate x and y
     def make_marker(self, x, y, color):
@@ -366,18 +404,33 @@ class Map(QtGui.QWidget):
 
         :return: A marker made using the above parameters
         """
-        pixelCoord = Utility.convert_degrees_to_pixels(self.zoom_level, x, y)
-        self.centerX2, self.centerY2 = Utility.convert_degrees_to_pixels(self.zoom_level, self.center[0],
-                                                                         self.center[1])
+        return self.make_markers([x], [y], [color])[0]
+
+    def make_markers(self, lats, lngs, colors):
+        """
+        :param lats (list of floats): Latitude of each marker
+        :param lngs (list of floats): Longitude of each marker
+        :param colors (list of QtCore colors): Color of each marker
+
+        Projects every coordinate in one pass
+        :return: A list of markers made using the above parameters
+        """
+        if len(lats) == 0:
+            return []
+
+        pixel_x, pixel_y = Projection.degrees_to_pixels(self.zoom_level, [float(lat) for lat in lats],
+                                                        [float(lng) for lng in lngs])
+        self.centerX2, self.centerY2 = self.get_center_pixel(self.zoom_level)
         center = self.image_tiles[self.zoom_level]["tilesImages"][
             ((self.image_tiles[self.zoom_level]["tiles"] + 1) / 2) - 1]
         self.center_location = center.screen_location
 
-        self.centerX2 -= self.TILE_SIZE[0] / 2
-        self.centerY2 -= self.TILE_SIZE[1] / 2
+        markers = []
+        for i in range(0, len(lats)):
+            markers.append(Marker.Marker(pixel_x[i] + self.center_location[0], pixel_y[i] + self.center_location[1],
+                                         self.centerX2, self.centerY2, self.zoom_level, lats[i], lngs[i], colors[i]))
 
-        return Marker.Marker(pixelCoord[0] + self.center_location[0], pixelCoord[1] + self.center_location[1],
-                             self.centerX2, self.centerY2, self.zoom_level, x, y, color)
+        return markers
 
     def remove_marker(self, index):
         """
@@ -407,8 +460,9 @@ class Map(QtGui.QWidget):
         """
         :param (lat, lng) (tuple): Current position of rover (float, float)
 
-        Update position of rover on map
+        Update position of rover on map and record it in the trail
         """
+        self.track.append(lat, lng)
         self.add_rover(lat, lng)
 
     def highlight_marker(self, index):
@@ -23,6 +23,7 @@ class Marker:
         self.zoom_level = zoom_level
         self.coordX = lat
         self.coordY = long
+        self.color = color
         self.pen = QtGui.QPen(color)
 
     def draw(self, painter):
@@ -34,9 +35,8 @@ class Marker:
         """
         self.pen.setWidth(5)
         painter.setPen(self.pen)
-        painter.drawEllipse(int(self.x) - self.centerX - 10, int(self.y) - self.centerY - 10, 20, 20)
-        print("draw")
+        painter.drawEllipse(int(round(self.x)) - self.centerX - 10, int(round(self.y)) - self.centerY - 10, 20, 20)
 
     def set_color(self, color):
-        self.pen = QtGui.QPen(color)
-        print("set_color")
\ No newline at end of file
+        self.color = color
+        self.pen = QtGui.QPen(color)
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Vectorized Mercator projection used by the map widget
+See https://msdn.microsoft.com/en-us/library/bb259689.aspx for details on the coordinate system
+"""
+from __future__ import division
+
+import math
+
+import numpy as np
+
+# Width and height in pixels of the whole world at zoom level 0
+WORLD_SIZE = 256
+
+# Latitudes beyond these values are not representable by the square Mercator world
+MIN_LATITUDE = -85.05112878
+MAX_LATITUDE = 85.05112878
+
+# Maps a zoom level to the width / height of the whole world in pixels at that zoom level
+_map_sizes = {}
+
+
+def map_size(zoom):
+    """
+    Size of the whole world in pixels at a zoom level, computed once per zoom level
+    :param zoom: The zoom level of the map
+    :return: The width (and height) of the world in pixels as a float
+    """
+
+    try:
+        return _map_sizes[zoom]
+    except KeyError:
+        size = float(WORLD_SIZE * math.pow(2, zoom))
+        _map_sizes[zoom] = size
+        return size
+
+
+def degrees_to_pixels(zoom, lat, lng):
+    """
+    Projects latitudes and longitudes onto the pixel coordinate system of a zoom level
+    :param zoom: The zoom level of the map
+    :param lat: A number or array of latitudes in decimal degrees
+    :param lng: A number or array of longitudes in decimal degrees (same shape as lat)
+    :return: Two float arrays x and y in the Mercator projection coordinate system
+    """
+
+    size = map_size(zoom)
+    lat = np.clip(np.asarray(lat, dtype=np.float64), MIN_LATITUDE, MAX_LATITUDE)
+    lng = np.asarray(lng, dtype=np.float64)
+
+    sin_lat = np.sin(np.radians(lat))
+
+    x = (lng + 180.0) * (size / 360.0)
+    y = (0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * size
+
+    return x, y
+
+
+def pixels_to_degrees(zoom, x, y):
+    """
+    Converts pixel coordinates of a zoom level back to latitudes and longitudes
+    :param zoom: The zoom level of the map
+    :param x: A number or array of x coordinates in the Mercator projection coordinate system
+    :param y: A number or array of y coordinates in the Mercator projection coordinate system
+    :return: Two float arrays of latitudes and longitudes in decimal degrees
+    """
+
+    size = map_size(zoom)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    lat = 90 - 360 * np.arctan(np.exp((y / size - 0.5) * 2 * math.pi)) / math.pi
+    lng = 360 * (x / size - 0.5)
+
+    return lat, lng
+
+
+def rescale_pixels(from_zoom, to_zoom, x, y):
+    """
+    Moves pixel coordinates from one zoom level to another without going through latitude and longitude
+    :param from_zoom: The zoom level the coordinates are in
+    :param to_zoom: The zoom level to convert the coordinates to
+    :param x: A number or array of x coordinates
+    :param y: A number or array of y coordinates
+    :return: Two float arrays of x and y coordinates at the new zoom level
+    """
+
+    factor = map_size(to_zoom) / map_size(from_zoom)
+    return np.asarray(x, dtype=np.float64) * factor, np.asarray(y, dtype=np.float64) * factor
+
+
+def degrees_to_screen(zoom, lat, lng, origin):
+    """
+    Projects latitudes and longitudes straight onto the screen
+    :param zoom: The zoom level of the map
+    :param lat: A number or array of latitudes in decimal degrees
+    :param lng: A number or array of longitudes in decimal degrees
+    :param origin: Tuple of the (x, y) Mercator pixel that is drawn at the top left corner of the screen
+    :return: Two float arrays of x and y screen coordinates
+    """
+
+    x, y = degrees_to_pixels(zoom, lat, lng)
+    return x - origin[0], y - origin[1]
+
+
+def screen_to_degrees(zoom, x, y, origin):
+    """
+    Converts screen coordinates to latitudes and longitudes
+    :param zoom: The zoom level of the map
+    :param x: A number or array of x screen coordinates
+    :param y: A number or array of y screen coordinates
+    :param origin: Tuple of the (x, y) Mercator pixel that is drawn at the top left corner of the screen
+    :return: Two float arrays of latitudes and longitudes in decimal degrees
+    """
+
+    return pixels_to_degrees(zoom, np.asarray(x, dtype=np.float64) + origin[0],
+                             np.asarray(y, dtype=np.float64) + origin[1])
+
+
+def get_corners(zoom, lat, lng, width, height):
+    """
+    Finds the edges of an image of a given size centered on a latitude and longitude
+    :param zoom: The zoom level of the map
+    :param lat: The latitude of the image's center
+    :param lng: The longitude of the image's center
+    :param width: The width of the image in pixels
+    :param height: The height of the image in pixels
+    :return: Dictionary of the 'N', 'E', 'S' and 'W' edges in decimal degrees
+    """
+
+    x, y = degrees_to_pixels(zoom, lat, lng)
+    lats, lngs = pixels_to_degrees(zoom, [x + width / 2, x - width / 2], [y - height / 2, y + height / 2])
+
+    return {
+        'N': float(lats[0]),
+        'E': float(lngs[0]),
+        'S': float(lats[1]),
+        'W': float(lngs[1]),
+    }
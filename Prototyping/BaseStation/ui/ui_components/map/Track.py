@@ -0,0 +1,294 @@
+import numpy as np
+from PyQt4 import QtGui, QtCore
+
+import Projection
+
+
+def douglas_peucker(x, y, tolerance):
+    """
+    Simplifies a polyline with the Douglas-Peucker algorithm
+    :param x: Array of x coordinates of the line
+    :param y: Array of y coordinates of the line
+    :param tolerance: Points closer than this to the simplified line are removed
+    :return: Boolean array that is true for every point that is kept
+    """
+
+    keep = np.zeros(len(x), dtype=bool)
+    if len(x) == 0:
+        return keep
+
+    keep[0] = True
+    keep[-1] = True
+
+    # Iterative to avoid recursion limits on long straight runs
+    stack = [(0, len(x) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        dx = x[end] - x[start]
+        dy = y[end] - y[start]
+        length = np.hypot(dx, dy)
+
+        px = x[start + 1:end] - x[start]
+        py = y[start + 1:end] - y[start]
+
+        # Distance of every point in between to the segment from start to end
+        if length == 0:
+            distances = np.hypot(px, py)
+        else:
+            distances = np.abs(px * dy - py * dx) / length
+
+        furthest = int(np.argmax(distances))
+        if distances[furthest] > tolerance:
+            index = start + 1 + furthest
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+
+    return keep
+
+
+class Track:
+
+    """
+    The breadcrumb trail of the rover
+
+    Positions are stored in Mercator pixels of REFERENCE_ZOOM so they can be drawn at any zoom level
+    without projecting again. Points closer than min_distance to the last one are dropped, the newest points
+    are collected in a tail that is simplified with Douglas-Peucker once it is full, and the simplified
+    points go into a fixed size ring so memory does not grow over a long run.
+    """
+
+    # Highest zoom level of the map, one pixel here is well under a meter
+    REFERENCE_ZOOM = 19
+
+    def __init__(self, capacity=50000, min_distance=2.0, tolerance=1.0, tail_size=64, cell_size=64,
+                 color=QtCore.Qt.cyan):
+        """
+        :param capacity (int): Number of simplified points kept before the oldest are overwritten
+        :param min_distance (float): Reference zoom pixels the rover must move before a position is recorded
+        :param tolerance (float): Reference zoom pixels a point may be off the simplified line
+        :param tail_size (int): Number of recorded points collected before they are simplified
+        :param cell_size (float): Width of a spatial index cell in reference zoom pixels
+        :param color (QtCore color): Color of the trail
+        """
+
+        self.capacity = capacity
+        self.min_distance = min_distance
+        self.tolerance = tolerance
+        self.tail_size = tail_size
+        self.cell_size = float(cell_size)
+
+        # Ring of simplified points, self.start is the oldest point and self.count the number of valid points
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.start = 0
+        self.count = 0
+
+        # Recorded points that have not been simplified yet, the first one is already in the ring
+        self.tail_x = []
+        self.tail_y = []
+
+        # Maps a (column, row) cell to the ring slots inside of it, each slot remembers its cell for removal
+        self.grid = {}
+        self.cells = [None] * capacity
+
+        # Bumped on every change so the points of the zoom level and the painter path are only rebuilt when needed
+        self.version = 0
+        self.points_key = None
+        self.points = (np.zeros(0), np.zeros(0))
+        self.path_key = None
+        self.path = QtGui.QPainterPath()
+
+        self.pen = QtGui.QPen(color)
+        self.pen.setWidth(3)
+
+    def clear(self):
+        """
+        Removes every point from the trail
+        """
+        self.start = 0
+        self.count = 0
+        self.tail_x = []
+        self.tail_y = []
+        self.grid = {}
+        self.cells = [None] * self.capacity
+        self.version += 1
+
+    def append(self, lat, lng):
+        """
+        :param lat (float): Latitude of the rover
+        :param lng (float): Longitude of the rover
+
+        Records a new rover position
+        :return: True if the position was far enough from the last one to be recorded
+        """
+        x, y = Projection.degrees_to_pixels(self.REFERENCE_ZOOM, lat, lng)
+        x = float(x)
+        y = float(y)
+
+        if self.tail_x:
+            if np.hypot(x - self.tail_x[-1], y - self.tail_y[-1]) < self.min_distance:
+                return False
+        else:
+            self.push(x, y)
+
+        self.tail_x.append(x)
+        self.tail_y.append(y)
+        self.version += 1
+
+        if len(self.tail_x) >= self.tail_size:
+            self.flush_tail()
+
+        return True
+
+    def flush_tail(self):
+        """
+        Simplifies the tail and moves the points that are kept into the ring
+        The last point stays behind as the start of the next tail
+        """
+        tail_x = np.array(self.tail_x)
+        tail_y = np.array(self.tail_y)
+        keep = douglas_peucker(tail_x, tail_y, self.tolerance)
+
+        # The first point of the tail was pushed when the previous tail was flushed
+        for i in np.flatnonzero(keep[1:]) + 1:
+            self.push(tail_x[i], tail_y[i])
+
+        self.tail_x = [self.tail_x[-1]]
+        self.tail_y = [self.tail_y[-1]]
+
+    def push(self, x, y):
+        """
+        Adds a point to the ring and the spatial index, overwriting the oldest point once full
+        """
+        if self.count < self.capacity:
+            slot = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+            self.grid[self.cells[slot]].discard(slot)
+
+        self.x[slot] = x
+        self.y[slot] = y
+
+        cell = (int(x // self.cell_size), int(y // self.cell_size))
+        self.cells[slot] = cell
+        self.grid.setdefault(cell, set()).add(slot)
+
+    def get_points(self, zoom):
+        """
+        :param zoom (int): Zoom level of the map
+
+        :return: Ordered x and y arrays of the whole trail, oldest first, in Mercator pixels of the zoom level
+        """
+        # Panning repaints with the same zoom level, only appends and zooming need the ring again
+        key = (zoom, self.version)
+        if key == self.points_key:
+            return self.points
+
+        end = self.start + self.count
+        if end <= self.capacity:
+            x = self.x[self.start:end]
+            y = self.y[self.start:end]
+        else:
+            x = np.concatenate((self.x[self.start:], self.x[:end - self.capacity]))
+            y = np.concatenate((self.y[self.start:], self.y[:end - self.capacity]))
+
+        # The first tail point is already in the ring
+        if len(self.tail_x) > 1:
+            x = np.concatenate((x, self.tail_x[1:]))
+            y = np.concatenate((y, self.tail_y[1:]))
+
+        self.points_key = key
+        self.points = Projection.rescale_pixels(self.REFERENCE_ZOOM, zoom, x, y)
+        return self.points
+
+    def nearest(self, zoom, x, y, radius):
+        """
+        :param zoom (int): Zoom level of the map
+        :param x (float): Mercator x coordinate at the zoom level
+        :param y (float): Mercator y coordinate at the zoom level
+        :param radius (float): Search radius in pixels of the zoom level
+
+        Finds the trail point closest to a position, the simplified points with the spatial index
+        and the few points of the tail that are not simplified yet one by one
+        :return: The (lat, lng) of the point, or None if no point is within the radius
+        """
+        x, y = Projection.rescale_pixels(zoom, self.REFERENCE_ZOOM, x, y)
+        radius = float(Projection.rescale_pixels(zoom, self.REFERENCE_ZOOM, radius, 0)[0])
+
+        best = None
+        best_distance = radius
+        for column in range(int((x - radius) // self.cell_size), int((x + radius) // self.cell_size) + 1):
+            for row in range(int((y - radius) // self.cell_size), int((y + radius) // self.cell_size) + 1):
+                for slot in self.grid.get((column, row), ()):
+                    distance = np.hypot(self.x[slot] - x, self.y[slot] - y)
+                    if distance <= best_distance:
+                        best = (self.x[slot], self.y[slot])
+                        best_distance = distance
+
+        # The first tail point is already in the ring
+        for tail_x, tail_y in zip(self.tail_x[1:], self.tail_y[1:]):
+            distance = np.hypot(tail_x - x, tail_y - y)
+            if distance <= best_distance:
+                best = (tail_x, tail_y)
+                best_distance = distance
+
+        if best is None:
+            return None
+
+        lat, lng = Projection.pixels_to_degrees(self.REFERENCE_ZOOM, best[0], best[1])
+        return float(lat), float(lng)
+
+    def get_path(self, zoom, origin, width, height):
+        """
+        :param zoom (int): Zoom level of the map
+        :param origin (tuple): The Mercator pixel drawn at the top left corner of the screen
+        :param width (int): Width of the screen
+        :param height (int): Height of the screen
+
+        Builds a single path of the part of the trail that is on screen, reused until the trail or view changes
+        :return: A QPainterPath in screen coordinates
+        """
+        key = (zoom, origin, width, height, self.version)
+        if key == self.path_key:
+            return self.path
+
+        x, y = self.get_points(zoom)
+        x = x - origin[0]
+        y = y - origin[1]
+
+        path = QtGui.QPainterPath()
+        if len(x) > 1:
+            # Segment i goes from point i to point i + 1, it is drawn if its bounding box overlaps the screen
+            # so segments crossing the screen with both ends off of it are kept
+            visible = ((np.minimum(x[:-1], x[1:]) <= width) & (np.maximum(x[:-1], x[1:]) >= 0) &
+                       (np.minimum(y[:-1], y[1:]) <= height) & (np.maximum(y[:-1], y[1:]) >= 0))
+
+            previous = -2
+            for i in np.flatnonzero(visible):
+                if i != previous + 1:
+                    path.moveTo(x[i], y[i])
+                path.lineTo(x[i + 1], y[i + 1])
+                previous = i
+
+        self.path_key = key
+        self.path = path
+        return path
+
+    def draw(self, painter, zoom, origin, width, height):
+        """
+        :param painter (PyQt4): Painter object from PyQt4
+        :param zoom (int): Zoom level of the map
+        :param origin (tuple): The Mercator pixel drawn at the top left corner of the screen
+        :param width (int): Width of the screen
+        :param height (int): Height of the screen
+
+        Draws the visible part of the trail onto the map
+        """
+        painter.setPen(self.pen)
+        painter.drawPath(self.get_path(zoom, origin, width, height))
@@ -1,4 +1,5 @@
 import math
+import Projection
 import Utility
 
 
@@ -33,13 +34,10 @@ def convert_pixels_to_degrees(zoom, pixelX, pixelY):
     :return: Latitude and longitude separately as numbers
     """
 
-    x = (pixelX / (256 * math.pow(2, zoom))) - 0.5
-    y = 0.5 - (pixelY / (256 * math.pow(2, zoom)))
+    # Single point wrapper, use Projection directly to convert many points at once
+    lat, lng = Projection.pixels_to_degrees(zoom, pixelX, pixelY)
 
-    lat = 90 - 360 * math.atan(math.exp(-y * 2 * math.pi)) / math.pi
-    lng = 360 * x
-
-    return lat, lng
+    return float(lat), float(lng)
 
 
 def convert_degrees_to_pixels(zoom, lat, lng):
@@ -54,16 +52,11 @@ def convert_degrees_to_pixels(zoom, lat, lng):
     """
 
 
-    lat = float(lat)
-    lng = float(lng)
-
-    sinLatitude = math.sin(lat * math.pi / 180)
-
-    x = (lng + 180) / 360
-    y = (0.5 - math.log((1 + sinLatitude) / (1 - sinLatitude)) / (4 * math.pi))
+    # Single point wrapper, use Projection directly to convert many points at once
+    x, y = Projection.degrees_to_pixels(zoom, float(lat), float(lng))
 
-    pixelX = int((x * 256 * math.pow(2, zoom)) + 0.5)
-    pixelY = int((y * 256 * math.pow(2, zoom)) + 0.5)
+    pixelX = int(x + 0.5)
+    pixelY = int(y + 0.5)
 
     return pixelX, pixelY
 
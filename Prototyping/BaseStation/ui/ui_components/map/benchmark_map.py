@@ -0,0 +1,60 @@
+"""
+Benchmarks of the map projection, run by benchmark.py at the root of the repository or on its own:
+
+    python benchmark_map.py [--repeat 5]
+
+The batch cases project a track of TRACK_POINTS points, like the ones the map draws, and are timed per point.
+Skipped without numpy.
+"""
+from __future__ import division
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", ".."))
+import benchmark
+
+# Points in the track of the batch cases
+TRACK_POINTS = 10000
+
+# Zoom level and center of the map, the Mars Desert Research Station
+ZOOM = 18
+CENTER = (38.406426, -110.791919)
+
+CASES = ["degrees to pixels, one point", "pixels to degrees, one point",
+         "degrees to screen, track", "screen to degrees, track"]
+
+
+def cases(repeat):
+    """
+    :param repeat: Timed runs of every case
+    :return: List of the results
+    """
+    try:
+        import numpy as np
+        import Projection
+        import Utility
+    except ImportError as error:
+        return [benchmark.skipped(name, error) for name in CASES]
+
+    x, y = Utility.convert_degrees_to_pixels(ZOOM, *CENTER)
+    origin = (x - 400, y - 300)
+
+    # A track wandering a few hundred meters around the center
+    random = np.random.RandomState(0)
+    lats = CENTER[0] + np.cumsum(random.normal(0, 1e-5, TRACK_POINTS))
+    lngs = CENTER[1] + np.cumsum(random.normal(0, 1e-5, TRACK_POINTS))
+    screen_x, screen_y = Projection.degrees_to_screen(ZOOM, lats, lngs, origin)
+
+    return [
+        benchmark.measure(CASES[0], lambda: Utility.convert_degrees_to_pixels(ZOOM, *CENTER), repeat=repeat),
+        benchmark.measure(CASES[1], lambda: Utility.convert_pixels_to_degrees(ZOOM, x, y), repeat=repeat),
+        benchmark.measure(CASES[2], lambda: Projection.degrees_to_screen(ZOOM, lats, lngs, origin),
+                          TRACK_POINTS, repeat),
+        benchmark.measure(CASES[3], lambda: Projection.screen_to_degrees(ZOOM, screen_x, screen_y, origin),
+                          TRACK_POINTS, repeat),
+    ]
+
+
+if __name__ == "__main__":
+    benchmark.main(cases, "Benchmarks the map projection")
@@ -2,6 +2,11 @@ from PyQt4 import QtGui, QtCore
 
 
 class SensorData(QtGui.QWidget):
+
+    # Friendly names of the telemetry values shown by this widget
+    SENSORS = ["Potentiometer", "Magnetometer", "Encoder 1", "Encoder 2", "Encoder 3", "Encoder 4",
+               "Teleop Latency", "Teleop Latency p95"]
+
     def __init__(self, parent=None):
         super(self.__class__, self).__init__(parent)
 
@@ -12,12 +17,13 @@ class SensorData(QtGui.QWidget):
 
     def update_ui(self, dictionary):
         """
-        Update all sensor values with the ones from the dictionary
+        Update the sensor values that changed with the ones from the dictionary
         :param dictionary: A map of the friendly names to the sensor value
         :return: None
         """
         for key in dictionary:
-            self.ui_map[key].setText(dictionary[key])
+            if key in self.ui_map:
+                self.ui_map[key].setText(str(dictionary[key]))
 
     def build_list(self):
         """
@@ -25,7 +31,7 @@ class SensorData(QtGui.QWidget):
         Maps the friendly name to the label we update with the sensor value
         :return: The QVBoxLayout to add to the widget window
         """
-        dictionary = ["Potentiometer", "Magnetometer", "Encoder 1", "Encoder 2", "Encoder 3", "Encoder 4"]
+        dictionary = self.SENSORS
         vbox = QtGui.QVBoxLayout()
 
         for key in dictionary:
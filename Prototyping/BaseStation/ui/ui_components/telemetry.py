@@ -0,0 +1,111 @@
+from PyQt4 import QtCore
+import threading
+
+"""
+Central store for the latest telemetry values from the rover
+
+Producers publish values as often as they arrive, the values are only handed to the widgets
+at the UI frame rate and only when they have changed since the last frame.
+"""
+
+
+class _TelemetryBus:
+    """Keeps the latest value of every telemetry key and flushes changed ones to subscribers"""
+
+    def __init__(self, frame_rate=60):
+        self.values = dict()
+        self.frame_rate = frame_rate
+        self._dirty = set()
+        self._subscribers = list()
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def start(self, frame_rate=None):
+        """
+        Starts flushing changed values to the subscribers
+
+        Run this after the Qt application has already started
+        :param frame_rate: Number of flushes per second, keeps the current rate if omitted
+        :return: None
+        """
+        if frame_rate is not None:
+            self.frame_rate = frame_rate
+
+        if self._timer is None:
+            self._timer = QtCore.QTimer()
+            self._timer.timeout.connect(self.flush)
+        self._timer.start(1000 / self.frame_rate)
+
+    def stop(self):
+        """Stops flushing values to the subscribers"""
+        if self._timer is not None:
+            self._timer.stop()
+
+    def subscribe(self, callback, keys=None):
+        """
+        Registers a callback for changed values
+        :param callback: Called with a dictionary of the changed keys to their latest values
+        :param keys: The keys the callback cares about, all keys if omitted
+        :return: None
+        """
+        if keys is not None:
+            keys = frozenset(keys)
+        self._subscribers.append((keys, callback))
+
+    def publish(self, key, value):
+        """
+        Stores the latest value of a key, marking it dirty if it changed
+        Safe to call from any thread
+        :param key: Friendly name of the value
+        :param value: The typed value (number, tuple, ...)
+        :return: None
+        """
+        with self._lock:
+            if key not in self.values or self.values[key] != value:
+                self.values[key] = value
+                self._dirty.add(key)
+
+    def publish_many(self, dictionary):
+        """
+        Stores the latest value of every key in the dictionary
+        :param dictionary: A map of friendly names to typed values
+        :return: None
+        """
+        with self._lock:
+            for key in dictionary:
+                value = dictionary[key]
+                if key not in self.values or self.values[key] != value:
+                    self.values[key] = value
+                    self._dirty.add(key)
+
+    def get(self, key, default=None):
+        """Returns the latest value of a key"""
+        with self._lock:
+            return self.values.get(key, default)
+
+    def flush(self):
+        """
+        Hands every value changed since the last flush to the subscribers that care about it
+        Must run on the Qt GUI thread
+        :return: None
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            changed = dict()
+            for key in self._dirty:
+                changed[key] = self.values[key]
+            self._dirty = set()
+
+        for keys, callback in self._subscribers:
+            if keys is None:
+                callback(changed)
+            else:
+                wanted = dict()
+                for key in keys:
+                    if key in changed:
+                        wanted[key] = changed[key]
+                if wanted:
+                    callback(wanted)
+
+telemetry_bus = _TelemetryBus()
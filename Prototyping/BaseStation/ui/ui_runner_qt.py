@@ -5,7 +5,7 @@ from ui_components.ip_scanner import IPCheckerLayout
 from ui_components.camera_streaming import UI
 from ui_components.emergency_stop import stop
 from ui_components.settings import settings
-from ui_components import Command, comms_update
+from ui_components import Command, comms_update, telemetry
 from ui_components.arm_viz import arm_widget
 from ui_components.sensors import SensorChecker
 from ui_components.list_widget import list_widget
@@ -15,6 +15,8 @@ from ui_components.auto_indicator import auto
 def quitting():
     # Close all open sockets
     sock.shutdown()
+    # Stop the camera streams and finish any recordings
+    vlc_widget.stop()
     # Shutdown the networking thread
     iplist.worker_thread.quit()
     # Save the changes to the settings by the user
@@ -70,8 +72,10 @@ main.list_container.addWidget(auto_lab)
 '''Connect all events for each of the components to talk to one another'''
 command_line.signalStatus.connect(sock.send_auto_mode)
 list_wid.signalStatus.connect(command_line.update)
-sock.signalStatus.connect(sensors.update_ui)
-sock.signalUpdate.connect(map.update_rover_pos)
+telemetry.telemetry_bus.subscribe(sensors.update_ui, SensorChecker.SensorData.SENSORS)
+telemetry.telemetry_bus.subscribe(lambda changed: map.update_rover_pos(changed["Position"]), ["Position"])
+telemetry.telemetry_bus.subscribe(arm.update_arm_state, ["Arm Position"])
+arm.setpointsChanged.connect(sock.set_arm_setpoints)
 command_line.autoTrigger.connect(auto_lab.toggle_ui)
 map.signal.connect(list_wid.add_to_ui)
 stop_widget.stopEvent.connect(sock.stopping)
@@ -79,6 +83,9 @@ list_wid.callToDelete.connect(map.remove_marker)
 list_wid.highlightMarker.connect(map.highlight_marker)
 
 
+# Hand changed telemetry to the widgets 60 times per second
+telemetry.telemetry_bus.start(60)
+
 # Show window and execute the app
 win.show()
 
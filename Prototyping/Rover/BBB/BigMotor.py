@@ -1,5 +1,5 @@
 import Motor
-import Adafruit_BBIO.PWM as PWM
+import hal
 import Utils
 
 class BigMotor(Motor.Motor):
@@ -8,7 +8,7 @@ class BigMotor(Motor.Motor):
         super(BigMotor, self).__init__(motor_id)
         try:
             self.pin = pin
-            PWM.start(self.pin, 150/17.6, 60)
+            hal.pwm().start(self.pin, 150/17.6, 60)
             self.set_motor_exactly(0)
         except:
             print("motor: " + str(motor_id) + " disconnected")
@@ -21,7 +21,7 @@ class BigMotor(Motor.Motor):
             motor_val = int(motor_val)
             if abs(motor_val) > 255:
                 print "bad value for motor_val in set_motor_exatly: " + str(motor_val)
-            PWM.set_duty_cycle(self.pin, Utils.translateValue(motor_val, -255, 255, 100/17.6, 200/17.6))
+            hal.pwm().set_duty_cycle(self.pin, Utils.translateValue(motor_val, -255, 255, 100/17.6, 200/17.6))
             self.prev_motor_val = motor_val
         except:
             print("motor: " + str(self.motor_id) + " disconnected")
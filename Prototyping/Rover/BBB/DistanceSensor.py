@@ -28,13 +28,15 @@ NOTE: getDistance() takes an average of 30ms according to the documentation, so
 
 NOTE: If you do not call startRanging() BEFORE getDistance(), it will take at least 10x as long to receive the result.
 
+NOTE: Ranging is continuous, so getValue() only waits for the measurement in progress. For several sensors
+      use RangingManager, which reads them all on one thread.
+
 NOTE: It is recommended to call stopRanging() at the end of getting distances, but not required. See VL53L0X
       documentation for more details on ranging.
 
 """
 
 import VL53L0X
-import time
 
 
 class DistanceSensor:
@@ -51,17 +53,13 @@ class DistanceSensor:
         self._ranging = True
 
     def stop(self):
-        if not self.critical_status:
+        if self._ranging:
             self._sensor.stop_ranging()
             self._ranging = False
 
     def getValue(self):
         if not self._ranging:
             self.start()
-        time.sleep(0.3)
-        timing = self._sensor.get_timing()
-        if timing < 20000:
-            timing = 20000
+        # Waits for the next measurement, at most one timing budget
         self._distance = self._sensor.get_distance()
-        time.sleep(timing / 1000000.00)
         return self._distance
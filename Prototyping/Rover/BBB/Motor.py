@@ -1,3 +1,7 @@
+import flight_recorder
+import latency
+
+
 class Motor(object):
     """ Controls a single motor. """
 
@@ -24,9 +28,9 @@ class Motor(object):
         diff = motor_val - self.prev_motor_val
         diff = max(-self.MAX_MOTOR_VAL_DIFF, min(self.MAX_MOTOR_VAL_DIFF, diff))  # clamp value into range
         actual_motor_val = self.prev_motor_val + diff
-        print "trying to drive motor: " + str(self.motor_id) + " with value: " + str(motor_val) \
-              + ", actual value: " + str(actual_motor_val)
+        flight_recorder.record(flight_recorder.MOTOR, self.motor_id, motor_val, actual_motor_val)
         self.set_motor_exactly(actual_motor_val)
+        latency.mark(latency.MOTORS)
 
     def set_motor_exactly(self, motor_val):
         """
@@ -2,7 +2,9 @@ import math
 import Utils
 import mag as MAG
 import gps as GPS
-import Adafruit_BBIO.ADC as ADC
+import hal
+import flight_recorder
+import profiler
 
 class Navigation:
     """
@@ -25,8 +27,14 @@ class Navigation:
             Maybe we should remove this?
         avoidingObs (bool), checkingDistance (int): Someone who knows what
             these are for please document them.
+        ranging (RangingManager.RangingManager): Distance sensors covering the
+            front of the rover, None if there are none.
+        obstacleDistance (int): Anything closer than this many millimeters is an
+            obstacle.
+        obstacleArc (float): Degrees either side of the front that isObstacle()
+            looks in.
     """
-    def __init__(self, pot_left, pot_middle, pot_right, pot_tol, pot_pin):
+    def __init__(self, pot_left, pot_middle, pot_right, pot_tol, pot_pin, ranging=None):
         """
         Args:
             pot_left, pot_middle, pot_right (float): The potentiometer readings
@@ -35,6 +43,8 @@ class Navigation:
             pot_tol (float): Currently unused. Maybe some kind of tolerance
                 value. Maybe we should remove this?
             pot_pin (str): The name of the pin the potentiometer is connected to.
+            ranging (RangingManager.RangingManager): Started distance sensors
+                covering the front of the rover, or None.
         """
         # autopilot
         self.auto = True
@@ -51,25 +61,30 @@ class Navigation:
         self.POT_TOL = float(pot_tol)
         self.avoidingObs = False
         self.checkingDistance = 2
+        self.ranging = ranging
+        self.obstacleDistance = 1000
+        self.obstacleArc = 30.0
 
 
     # returns a float of how far from straight the potentiomer is. > 0 for Right, < 0 for left
     # returns -1 if error
+    @profiler.timed("nav.read_pot")
     def readPot(self):
-        result = self.POT_MIDDLE - ADC.read(self.POT_PIN)
+        reading = hal.adc().read(self.POT_PIN)
+        flight_recorder.record(flight_recorder.POT, reading)
+        result = self.POT_MIDDLE - reading
         if result > self.POT_MIDDLE - self.POT_RIGHT or result < self.POT_MIDDLE - self.POT_LEFT:
-            print result
             return -1
         return result
 
     # returns heading of front body or -1 if error
     # TODO: Use code from Orientation.py and test it.
+    @profiler.timed("nav.mag")
     def getMag(self):
         rawMag = self.mag.read()
-        print "back: " + str(rawMag)
         pot = self.readPot()
-        angle = Utils.translateValue(pot, self.POT_LEFT - self.POT_MIDDLE, self.POT_RIGHT - self.POT_MIDDLE, -40, 40)
-        print "front: " + str((rawMag + angle) % 360)
+        angle = Utils.translateValue(pot, self.POT_MIDDLE - self.POT_LEFT, self.POT_MIDDLE - self.POT_RIGHT, -40, 40)
+        flight_recorder.record(flight_recorder.HEADING, rawMag, angle, (rawMag + angle) % 360)
         return (rawMag + angle) % 360
 
     # returns gps data
@@ -91,8 +106,7 @@ class Navigation:
 
     # find distance between two points using the haversine formula
     def distance(self, desLong, desLat):
-        gps = GPS.GPS()
-        cord = gps.getCoords()
+        cord = self.gps.getCoords()
         lat1 = math.radians(cord[0])
         long1 = math.radians(cord[1])
         lat2 = math.radians(desLat)
@@ -126,14 +140,30 @@ class Navigation:
             #turn left
             return -1 * Utils.translateValue(difHeading % 180, 0, 180, 0, 10)
 
-    # TODO Return a bool determining if there is something in way
-    #      If false, there is no obstacle within checkingDistance of rover sensor
+    # Returns True if a distance sensor within obstacleArc of the front sees
+    # something closer than obstacleDistance, always False without sensors
     def isObstacle(self):
-        return False
-
-    # Adds a (heading, isObsticalVal) pair to scannedHeadings
+        if self.ranging is None:
+            return False
+        scan = self.ranging.get_scan()
+        if scan is None:
+            return False
+        closest = scan.closest(-self.obstacleArc, self.obstacleArc)
+        return closest is not None and closest < self.obstacleDistance
+
+    # Adds a (heading, isObsticalVal) pair to scannedHeadings for every
+    # distance sensor, from left to right
     def appendScannedHeadings(self):
-        self.scannedHeadings.append(self.getMag(), self.isObstacle())
+        heading = self.getMag()
+        scan = None
+        if self.ranging is not None:
+            scan = self.ranging.get_scan()
+        if scan is None:
+            self.scannedHeadings.append((heading, self.isObstacle()))
+            return
+        for distance, offset in sorted(zip(scan.distances, scan.headings), key=lambda reading: reading[1]):
+            obstacle = distance is not None and distance < self.obstacleDistance
+            self.scannedHeadings.append(((heading + offset) % 360, obstacle))
 
     # Checks to see if first value in scannedHeadings is a "temp" value
     # If so then just replace it
@@ -189,5 +219,5 @@ class Navigation:
         return self.POT_MIDDLE
 
     # appends a destination to the list of destinations
-    def append_destiniation(self, dest):
+    def append_destination(self, dest):
         self.destinations.append(dest)
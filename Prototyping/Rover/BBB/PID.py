@@ -1,4 +1,4 @@
-import time
+import hal
 
 
 class PID(object):
@@ -11,7 +11,7 @@ class PID(object):
             Can be fine-tuned.
         _target (float): The desired value for the value controlled. (The setpoint.)
         _lastError (float): The previous error (The value of `_target - actual value).
-        _lastTime (float): The time as returned by `time.time()` when `run()`
+        _lastTime (float): The time as returned by `hal.time()` when `run()`
             was last called.
         _output (float): How the controlled value should be adjusted. Positive
             means that it should be increased.
@@ -55,7 +55,7 @@ class PID(object):
         Args:
             input (float): The observed value. (The process variable.)
         """
-        curTime = time.time()
+        curTime = hal.time()
         dT = curTime - self._lastTime
         error = self._target - input
         self._pVal = self._p * error
@@ -1,5 +1,4 @@
-import Adafruit_BBIO.ADC as ADC
-import Adafruit_PCA9685
+import hal
 import PID
 import math
 import threading
@@ -7,7 +6,11 @@ import MiniMotor
 import BigMotor
 import Robot_comms
 import Navigation
+import RangingManager
 import Utils
+import flight_recorder
+import latency
+import profiler
 import sys
 
 
@@ -18,7 +21,10 @@ class Robot(object):
     Attributes:
         pot_pid (PID.PID): PID controller for the potentiometer.
         nav (Navigation.Navigation): Object for managing navigation.
+        ranging (RangingManager.RangingManager): Distance sensors scanning the
+            arc in front of the rover.
         motors (list of Motor.Motor): The list (of length 4, 0-based) of motors.
+            Motor IDs are 1-based, motor 1 is motors[0].
         r_comms (Robot_comms.Robot_comms): Object for managing communicationg
             with the base station.
         automode (int): Code for what mode the rover is in in regards to
@@ -37,16 +43,21 @@ class Robot(object):
     Back
     """
 
-    def __init__(self, is_using_big_motor):
+    def __init__(self, is_using_big_motor, comms_ip="192.168.0.50"):
         """
         Args:
             is_using_big_motor (bool): True if using BigMotor for controller motors.
+            comms_ip (str): Address the base station connects to.
         """
-        ADC.setup()
+        hal.adc().setup()
 
         self.pot_pid = PID.PID(-0.1, 0, 0)
 
-        self.nav = Navigation.Navigation(0.55000, (0.55000 + 0.11111) / 2, 0.11111, 0.01, "AIN2")
+        # Distance sensors on TCA9548A channels 0 to 2, pointing left, ahead and right
+        self.ranging = RangingManager.RangingManager(RangingManager.make_mux_sensors([0, 1, 2]), [-20, 0, 20])
+        self.ranging.start()
+
+        self.nav = Navigation.Navigation(0.55000, (0.55000 + 0.11111) / 2, 0.11111, 0.01, "AIN2", self.ranging)
         # setup motors
         # motor: throttle, F, B
         # 1: 8,  9,  10
@@ -56,11 +67,9 @@ class Robot(object):
 
         if not is_using_big_motor:
             # setup i2c to motorshield
-            pwm = Adafruit_PCA9685.PCA9685(address=0x60, busnum=1)
+            pwm = hal.pca9685(0x60, 1)
             pwm.set_pwm_freq(60)
             self.motors = [
-
-                None,  # motor IDs are 1-based, so placeholder for index 0
                 MiniMotor.MiniMotor(1, 8, 9, 10, pwm),
                 MiniMotor.MiniMotor(2, 13, 12, 11, pwm),
                 MiniMotor.MiniMotor(3, 2, 4, 3, pwm),
@@ -73,7 +82,7 @@ class Robot(object):
                 BigMotor.BigMotor(3, "P9_14"),
                 BigMotor.BigMotor(4, "P9_22")
                 ]
-        self.r_comms = Robot_comms.Robot_comms("192.168.0.50", 8840, 8841, "<?hh", "<?ff", "<ffffffff")
+        self.r_comms = Robot_comms.Robot_comms(comms_ip, 8840, 8841)
         self.automode = 0
 
     def driveMotor(self, motor_id, motor_val):
@@ -100,8 +109,9 @@ class Robot(object):
         if motor_id < 1 or motor_id > 4:
             print "bad motor num: " + motor_id
             return
-        self.motors[motor_id].set_motor_exactly(0)
+        self.motors[motor_id - 1].set_motor_exactly(0)
 
+    @profiler.timed("robot.drive_parms")
     def getDriveParms(self):
         """
         Gets the driving parameters of the rover.
@@ -146,6 +156,7 @@ class Robot(object):
         return 10, self.nav.calculateDesiredTurn(self.nav.getMag(), self.nav.calculateDesiredHeading())
 
     # returns a tuple of (motor1, motor2, motor3, motor4) from the driveParms modified by the pot reading
+    @profiler.timed("robot.convert")
     def convertParmsToMotorVals(self, driveParms):
         potReading = self.nav.readPot()
         if potReading != -1:
@@ -155,23 +166,25 @@ class Robot(object):
                                                     self.nav.get_pot_right() - self.nav.get_pot_middle(), 100, -100)
             self.pot_pid.run(scaledPotReading)
             finalTurn = self.pot_pid.getOutput()
-            print str(driveParms)
+            flight_recorder.record(flight_recorder.DRIVE, driveParms[0], driveParms[1], True)
             result = (self.scale_motor_val(driveParms[0] + finalTurn),
                       self.scale_motor_val(driveParms[0] - finalTurn),
                       self.scale_motor_val(driveParms[0] - finalTurn),
                       self.scale_motor_val(driveParms[0] + finalTurn))
+            flight_recorder.record(flight_recorder.MOTOR_VALS, *result)
+            latency.mark(latency.CONVERTED)
             return result
         else:
-            print "Pot Error"
             # Potentiometer error
             # reset PID:
             self.pot_pid.setTarget(0)
-            print str(driveParms)
+            flight_recorder.record(flight_recorder.DRIVE, driveParms[0], driveParms[1], False)
             result = (self.scale_motor_val(driveParms[0] + driveParms[1]),
                       self.scale_motor_val(driveParms[0] - driveParms[1]),
                       self.scale_motor_val(driveParms[0] - driveParms[1]),
                       self.scale_motor_val(driveParms[0] + driveParms[1]))
-            print str(result)
+            flight_recorder.record(flight_recorder.MOTOR_VALS, *result)
+            latency.mark(latency.CONVERTED)
             return result
 
     @staticmethod
@@ -271,6 +284,7 @@ class DriveThread(threading.Thread):
 
 
 def main():
+    flight_recorder.start(flight_recorder.default_path())
     choice = raw_input('Control robot with keyboard? (y/n) ')
     if choice[0] == 'y':
         drive_params = DriveParams()
@@ -290,14 +304,18 @@ def main():
             drive_thread.join()
     else:
         robot = Robot(sys.argv[1])
+        # kill -USR1 starts and stops profiling, see profiler.py
+        profiler.install_signal()
         try:
             while True:
-                robot.get_robot_comms().receiveData(robot.get_nav())
-                robot.get_robot_comms().sendData(robot.get_nav())
-                driveParms = robot.getDriveParms()
-                MotorParms = robot.convertParmsToMotorVals(driveParms)
-                for i in range(1, 5):
-                    robot.driveMotor(i, MotorParms[i - 1])
+                with profiler.timer("robot.loop"):
+                    robot.get_robot_comms().receiveData(robot.get_nav())
+                    robot.get_robot_comms().sendData(robot.get_nav())
+                    driveParms = robot.getDriveParms()
+                    MotorParms = robot.convertParmsToMotorVals(driveParms)
+                    with profiler.timer("robot.motors"):
+                        for i in range(1, 5):
+                            robot.driveMotor(i, MotorParms[i - 1])
 
         except KeyboardInterrupt:
             for i in range(1, 5):
@@ -306,7 +324,13 @@ def main():
                 except:
                     print("motor: " + str(i) + " disconnected")
             robot.r_comms.closeConn()
+            if profiler.enabled():
+                print "profile written to " + profiler.stop()
+            for stage, stats in sorted(latency.summary().items()):
+                print "%-10s %6d commands  p50 %.2f ms  p95 %.2f ms  max %.2f ms" % (
+                    stage, stats["count"], stats["p50_ms"], stats["p95_ms"], stats["max_ms"])
             print "exiting"
+    flight_recorder.stop()
 
 if __name__ == "__main__":
     main()
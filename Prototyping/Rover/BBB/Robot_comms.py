@@ -1,10 +1,15 @@
 import socket
 import struct
 import threading
+import flight_recorder
+import latency
+import profiler
 
 class Robot_comms():
 
-    def __init__(self, robot_ip, udp_port, tcp_port, d_format, gps_format, rtb_format):
+    # The packet formats default to the ones shared with the base station, see packet_structure.txt
+    def __init__(self, robot_ip, udp_port, tcp_port, d_format=latency.DRIVE_FORMAT, gps_format=latency.GPS_FORMAT,
+                 rtb_format=latency.TELEMETRY_FORMAT):
         self.receivedDrive = None
         self.robot_ip = robot_ip
         self.udp_port = udp_port
@@ -41,10 +46,23 @@ class Robot_comms():
                 self.longitude = float(gps[1])
         except:
             pass
-        # Currently set to 1 second
-        threading.Timer(1, self.updateGPS).start()
+        # Currently set to 1 second, doesn't keep the program running once the main thread exits
+        timer = threading.Timer(1, self.updateGPS)
+        timer.daemon = True
+        timer.start()
+
+    # unpacks a drive packet, legacy ones get trace id 0 which is never stamped,
+    # returns None for packets of any other size so the rover keeps the last drive values
+    def unpackDrive(self, data):
+        if len(data) == struct.calcsize(self.driveFormat):
+            return struct.unpack(self.driveFormat, data)
+        if len(data) == struct.calcsize(latency.LEGACY_DRIVE_FORMAT):
+            return struct.unpack(latency.LEGACY_DRIVE_FORMAT, data) + (0, 0.0)
+        profiler.count("comms.bad_packets")
+        return None
 
     # receives a packet and sets variables accordingly
+    @profiler.timed("comms.receive")
     def receiveData(self, nav):
         try:
             hasRecieved = False
@@ -52,12 +70,17 @@ class Robot_comms():
                 while True:
                     data, udp_addr = self.udp_sock.recvfrom(1024)  # buffer size is 1024 bytes
                     hasRecieved = True
+                    profiler.count("comms.drive_packets")
             except socket.error:
                 if hasRecieved:
                     self.base_station_ip = udp_addr
-                    drive_unpacked = struct.unpack(self.driveFormat, data)
-                    self.receivedDrive = drive_unpacked
                     hasRecieved = False
+                    drive_unpacked = self.unpackDrive(data)
+                    if drive_unpacked is not None:
+                        # auto, throttle, turn, then the trace id and send time of the base station
+                        self.receivedDrive = drive_unpacked[:3]
+                        latency.begin(*drive_unpacked[3:5])
+                        flight_recorder.record(flight_recorder.COMMAND, *self.receivedDrive)
         except socket.error:
             # TODO: catch exceptions from the non-blocking receive better
             pass
@@ -66,9 +89,11 @@ class Robot_comms():
                 self.conn, tcp_addr = self.tcp_sock.accept()
                 self.conn.setblocking(False)
                 self.base_station_ip = tcp_addr
+                flight_recorder.record(flight_recorder.COMMS, flight_recorder.CONNECTED, 0)
             data = self.conn.recv(1024)
             gps_unpacked = struct.unpack(self.gpsFormat, data)
             if gps_unpacked[0]:
+                flight_recorder.record(flight_recorder.DESTINATION, *gps_unpacked[1:])
                 nav.append_destination(gps_unpacked[1:])
             else:
                 self.closeConn()
@@ -77,14 +102,18 @@ class Robot_comms():
             pass
 
     # sends data in message back to the base station
+    @profiler.timed("comms.send")
     def sendData(self, nav):
         self.nav = nav
         try:
             # Only sends once it has received at least one message
             if self.base_station_ip is not None:
-                # Follows format: potentiometer, magnetometer, encoders 1-4, latitude, longitude
-                MESSAGE = struct.pack(self.rtbFormat, nav.readPot(), nav.getMag(), 0, 0, 0, 0, self.lat, self.longitude)
+                # Follows format: potentiometer, magnetometer, encoders 1-4, latitude, longitude,
+                # then the latency trace of the latest drive packet
+                MESSAGE = struct.pack(self.rtbFormat, nav.readPot(), nav.getMag(), 0, 0, 0, 0, self.lat, self.longitude,
+                                      *latency.reply())
                 self.udp_sock.sendto(MESSAGE, self.base_station_ip)
+                flight_recorder.record(flight_recorder.COMMS, flight_recorder.SENT, len(MESSAGE))
         except socket.error:
             pass
 
@@ -92,3 +121,4 @@ class Robot_comms():
         if self.conn != None:
             self.conn.close()
             self.conn = None
+            flight_recorder.record(flight_recorder.COMMS, flight_recorder.DISCONNECTED, 0)
@@ -0,0 +1,104 @@
+"""
+Benchmarks of the control loop of the rover
+
+Run by benchmark.py at the root of the repository or on its own:
+
+    python benchmark_rover.py [--repeat 5]
+
+Robot runs against the devices of sim.SimBackend, like in simulate.py, so
+the device reads cost what the simulation's do rather than the I2C and ADC
+reads of the rover. The threads of the simulation are stopped first and the
+clock is moved by one control period every call, so only the rover code
+is timed. path_finding needs shapely and pyvisgraph, its cases
+are skipped without them.
+"""
+
+import os
+import random
+import sys
+
+import hal
+import sim
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+import benchmark
+
+# Obstacle counts find_path is timed with
+OBSTACLE_COUNTS = [5, 20, 50]
+
+# Size in meters of the square field the obstacles are scattered over
+FIELD_SIZE = 100.0
+
+# Seconds the simulated clock moves every call, the PID controllers need time to pass
+PERIOD = 0.02
+
+
+def random_obstacles(count, seed=0):
+    """
+    Returns (list of tuple of (float, float)): count obstacles scattered over the field, the same ones every run.
+    """
+    generator = random.Random(seed)
+    return [(generator.uniform(0, FIELD_SIZE), generator.uniform(0, FIELD_SIZE)) for i in range(count)]
+
+
+def robot_cases(repeat):
+    """
+    Returns (list of dict): Results of the Robot cases.
+    """
+    rover = sim.SimRover([], seed=0)
+    backend = sim.SimBackend(rover)
+    hal.use(backend)
+
+    # Imported after the backend is chosen, like the rover would import them
+    import Robot
+
+    robot = Robot.Robot(True, comms_ip="127.0.0.1")
+    rover.attach_motors(robot.motors)
+    clock = backend.clock
+    clock.close()
+    robot.ranging.stop()
+
+    def convert():
+        clock.now += PERIOD
+        return robot.convertParmsToMotorVals((60, 20))
+
+    def drive():
+        motor_values = convert()
+        for i in range(1, 5):
+            robot.driveMotor(i, motor_values[i - 1])
+
+    try:
+        return [
+            benchmark.measure("convertParmsToMotorVals", convert, repeat=repeat),
+            benchmark.measure("convert and drive 4 motors", drive, repeat=repeat),
+        ]
+    finally:
+        for i in range(1, 5):
+            robot.stopMotor(i)
+        robot.r_comms.closeConn()
+
+
+def path_cases(repeat):
+    """
+    Returns (list of dict): Results of the path_finding cases, skipped if it can't be imported.
+    """
+    names = ["find_path %d obstacles" % count for count in OBSTACLE_COUNTS]
+    try:
+        from path_finding import find_path
+    except ImportError as error:
+        return [benchmark.skipped(name, error) for name in names]
+
+    results = []
+    for name, count in zip(names, OBSTACLE_COUNTS):
+        obstacles = random_obstacles(count)
+        results.append(benchmark.measure(
+            name, lambda: find_path((-5.0, -5.0), (FIELD_SIZE + 5, FIELD_SIZE + 5), obstacles, 2.5), repeat=repeat))
+    return results
+
+
+def cases(repeat):
+    return robot_cases(repeat) + path_cases(repeat)
+
+
+if __name__ == "__main__":
+    benchmark.main(cases, "Benchmarks the control loop of the rover")
@@ -0,0 +1,324 @@
+"""
+Flight recorder of the rover
+
+Sensor samples, commands, motor outputs and comms events are written as
+fixed-size binary records into a preallocated file that is memory mapped,
+so recording one is a struct.pack_into() into memory with no system call.
+The file is a ring: once it is full the oldest records are overwritten.
+The kernel writes the pages back, so the records survive the rover code
+crashing.
+
+The rover code calls record() everywhere. It does nothing until start()
+opens a log, so modules don't need to know whether one is open:
+
+    flight_recorder.start(flight_recorder.default_path())
+    flight_recorder.record(flight_recorder.GPS, latitude, longitude)
+
+default_path() deletes the oldest logs in LOG_DIR so only the KEEP_LOGS
+newest are kept, every log takes its full size on disk from the start.
+
+read() turns a log back into a NumPy array for each record type and
+records() goes through it one record at a time without NumPy:
+
+    python flight_recorder.py logs/flight-20170501-120000.bin [--npz out.npz]
+
+File layout: a FILE_HEADER of FILE_HEADER_SIZE bytes, then capacity slots
+of RECORD_SIZE bytes. Every record starts with RECORD_HEADER: a sequence
+number starting at 1 (0 is an empty slot), hal.time() and the record type,
+followed by the fields of the type.
+"""
+
+import argparse
+import datetime
+import itertools
+import mmap
+import os
+import struct
+
+import hal
+
+MAGIC = "RVFR"
+VERSION = 2
+
+# Magic, version, record size, capacity
+FILE_HEADER = struct.Struct("<4sHHI")
+FILE_HEADER_SIZE = 64
+
+# Sequence number, time, record type
+RECORD_HEADER = struct.Struct("<IdB")
+RECORD_SIZE = 48
+
+# Slots of a new log, about 50 MB
+DEFAULT_CAPACITY = 1 << 20
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+
+# Logs of default_path() kept in LOG_DIR, counting the new one, each is DEFAULT_CAPACITY * RECORD_SIZE bytes
+KEEP_LOGS = 5
+
+# Record types
+GPS = 1
+MAG = 2
+HEADING = 3
+POT = 4
+DRIVE = 5
+MOTOR_VALS = 6
+MOTOR = 7
+FOLLOW = 8
+COMMAND = 9
+DESTINATION = 10
+COMMS = 11
+RANGE = 12
+WAYPOINT = 13
+
+# Events of COMMS records
+CONNECTED = 1
+DISCONNECTED = 2
+SENT = 3
+
+# Name, struct format and field names of the payload of each record type
+RECORD_TYPES = {
+    GPS: ("gps", "dd", ("latitude", "longitude")),
+    MAG: ("mag", "f", ("heading",)),
+    HEADING: ("heading", "fff", ("back", "angle", "front")),
+    POT: ("pot", "d", ("reading",)),
+    DRIVE: ("drive", "ffB", ("throttle", "turn", "pot_ok")),
+    MOTOR_VALS: ("motor_vals", "ffff", ("motor1", "motor2", "motor3", "motor4")),
+    MOTOR: ("motor", "Bhh", ("motor_id", "requested", "actual")),
+    FOLLOW: ("follow", "ddfff", ("x", "y", "heading", "desired_heading", "turn")),
+    COMMAND: ("command", "Bhh", ("auto", "throttle", "turn")),
+    DESTINATION: ("destination", "ff", ("latitude", "longitude")),
+    COMMS: ("comms", "BH", ("event", "size")),
+    RANGE: ("range", "8H", tuple("distance%d" % i for i in range(8))),
+    WAYPOINT: ("waypoint", "dd", ("x", "y")),
+}
+
+_recorder = None
+
+
+class FlightRecorder(object):
+    """
+    Appends records to a memory mapped ring file.
+
+    Attributes:
+        path (str): The log file.
+        capacity (int): Records the file holds before the oldest are overwritten.
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        """
+        Creates the log, replacing any file at path.
+
+        Args:
+            path (str): The log file.
+            capacity (int): Records the file holds.
+        """
+        self.path = path
+        self.capacity = capacity
+        self._structs = dict((record_type, struct.Struct(RECORD_HEADER.format + fields))
+                             for record_type, (name, fields, names) in RECORD_TYPES.items())
+        for record_struct in self._structs.values():
+            if record_struct.size > RECORD_SIZE:
+                raise ValueError("Record type too big for RECORD_SIZE")
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        size = FILE_HEADER_SIZE + capacity * RECORD_SIZE
+        with open(path, "w+b") as f:
+            f.write(FILE_HEADER.pack(MAGIC, VERSION, RECORD_SIZE, capacity))
+            f.truncate(size)
+            f.flush()
+            self._map = mmap.mmap(f.fileno(), size)
+        # next() of a count is atomic, threads don't need a lock to take a slot
+        self._sequence = itertools.count(1)
+
+    def record(self, record_type, *values):
+        """
+        Args:
+            record_type (int): One of the record types, such as GPS.
+            values: The fields of the record type.
+        """
+        sequence = next(self._sequence)
+        offset = FILE_HEADER_SIZE + (sequence - 1) % self.capacity * RECORD_SIZE
+        self._structs[record_type].pack_into(self._map, offset, sequence, hal.time(), record_type, *values)
+
+    def flush(self):
+        """
+        Writes the records to the file now instead of when the kernel gets to it.
+        """
+        self._map.flush()
+
+    def close(self):
+        self._map.flush()
+        self._map.close()
+
+
+def default_path(directory=LOG_DIR, keep=KEEP_LOGS):
+    """
+    Names a new log after the current time and deletes the oldest logs of
+    the directory, so it holds at most keep logs once the new one is started.
+
+    Args:
+        directory (str): Where the logs are.
+        keep (int): Logs to keep, counting the new one.
+    Returns (str): The path of the new log.
+    """
+    if os.path.isdir(directory):
+        # The names sort by the time they were started
+        logs = sorted(name for name in os.listdir(directory) if name.startswith("flight-") and name.endswith(".bin"))
+        for name in logs[:max(len(logs) - keep + 1, 0)]:
+            os.remove(os.path.join(directory, name))
+    return os.path.join(directory, datetime.datetime.now().strftime("flight-%Y%m%d-%H%M%S.bin"))
+
+
+def start(path, capacity=DEFAULT_CAPACITY):
+    """
+    Starts recording to a new log, stopping any log that was open.
+
+    Returns (FlightRecorder): The recorder.
+    """
+    return use(FlightRecorder(path, capacity))
+
+
+def use(recorder):
+    """
+    Records to another recorder from now on, stopping any log that was open.
+
+    Args:
+        recorder: Anything with the record() and close() of FlightRecorder,
+            such as replay.Capture.
+    Returns: The recorder.
+    """
+    global _recorder
+    stop()
+    _recorder = recorder
+    return recorder
+
+
+def stop():
+    """
+    Closes the log, record() does nothing afterwards.
+    """
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.close()
+
+
+def record(record_type, *values):
+    """
+    Records to the open log, if there is one. See FlightRecorder.record().
+    """
+    recorder = _recorder
+    if recorder is not None:
+        recorder.record(record_type, *values)
+
+
+def _read_header(f, path):
+    """
+    Returns (tuple of (int, int)): Record size and capacity of the log open as f.
+    """
+    magic, version, record_size, capacity = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(path + " is not a version " + str(VERSION) + " flight log")
+    return record_size, capacity
+
+
+def records(path):
+    """
+    Reads a log without NumPy, oldest record first.
+
+    Args:
+        path (str): The log file.
+    Returns (list of tuple of (int, float, int, tuple)): The sequence number,
+        time, type and fields of every record.
+    """
+    with open(path, "rb") as f:
+        record_size, capacity = _read_header(f, path)
+        f.seek(FILE_HEADER_SIZE)
+        data = f.read(capacity * record_size)
+
+    structs = dict((record_type, struct.Struct(RECORD_HEADER.format + fields))
+                   for record_type, (name, fields, names) in RECORD_TYPES.items())
+    result = []
+    for offset in xrange(0, len(data), record_size):
+        sequence, when, record_type = RECORD_HEADER.unpack_from(data, offset)
+        if sequence == 0:
+            continue
+        values = structs[record_type].unpack_from(data, offset)[3:]
+        result.append((sequence, when, record_type, values))
+    result.sort()
+    return result
+
+
+# NumPy types of the struct format characters RECORD_TYPES uses
+_NUMPY_CODES = {"d": "<f8", "f": "<f4", "B": "u1", "h": "<i2", "H": "<u2", "I": "<u4"}
+
+
+def _dtype(fields, names, record_size):
+    """
+    Returns (numpy.dtype): NumPy type of a whole record with the payload struct
+        format fields, without the record type.
+    """
+    import numpy
+    formats = ["<u4", "<f8"]
+    count = ""
+    for char in fields:
+        if char.isdigit():
+            count += char
+        else:
+            formats += [_NUMPY_CODES[char]] * int(count or 1)
+            count = ""
+    offsets = [0, 4]
+    offset = RECORD_HEADER.size
+    for code in formats[2:]:
+        offsets.append(offset)
+        offset += numpy.dtype(code).itemsize
+    return numpy.dtype({"names": ["sequence", "time"] + list(names), "formats": formats,
+                        "offsets": offsets, "itemsize": record_size})
+
+
+def read(path):
+    """
+    Reads a log with NumPy, oldest record first.
+
+    Args:
+        path (str): The log file.
+    Returns (dict of str to numpy.ndarray): Records of each type by name, with
+        the fields "sequence" and "time" followed by the fields of the type.
+    """
+    import numpy
+
+    with open(path, "rb") as f:
+        record_size, capacity = _read_header(f, path)
+        f.seek(FILE_HEADER_SIZE)
+        data = f.read(capacity * record_size)
+
+    slots = numpy.frombuffer(data, dtype=numpy.dtype({
+        "names": ["sequence", "type"], "formats": ["<u4", "u1"],
+        "offsets": [0, RECORD_HEADER.size - 1], "itemsize": record_size}))
+    order = numpy.argsort(slots["sequence"], kind="mergesort")
+    order = order[slots["sequence"][order] != 0]
+
+    arrays = {}
+    for record_type, (name, fields, names) in RECORD_TYPES.items():
+        selected = order[slots["type"][order] == record_type]
+        arrays[name] = numpy.frombuffer(data, dtype=_dtype(fields, names, record_size))[selected]
+    return arrays
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reads a flight log of the rover")
+    parser.add_argument("log", help="The log file")
+    parser.add_argument("--npz", help="Save the records of each type to this .npz file")
+    args = parser.parse_args()
+
+    arrays = read(args.log)
+    for name in sorted(arrays):
+        times = arrays[name]["time"]
+        duration = times[-1] - times[0] if len(times) else 0.0
+        print "%-12s %8d records over %.3f s" % (name, len(times), duration)
+    if args.npz:
+        import numpy
+        numpy.savez(args.npz, **arrays)
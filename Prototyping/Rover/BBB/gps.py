@@ -1,13 +1,22 @@
 
-import serial
-import Adafruit_BBIO.UART as UART
-from time import sleep
-UART.setup("UART1")
-ser = serial.Serial('/dev/ttyO1', 9600)
+import hal
+import flight_recorder
+
+# Serial port of the GPS, opened by the first GPS object
+_serial = None
+
+
+def _open_serial():
+    global _serial
+    if _serial is None:
+        hal.uart().setup("UART1")
+        _serial = hal.serial('/dev/ttyO1', 9600)
+    return _serial
 
 
 class GPS:
     def __init__(self):
+        self.ser = _open_serial()
         #This sets up variables for useful commands.
         #This set is used to set the rate the GPS reports
         UPDATE_200_msec=  "$PMTK220,200*2C\r\n" #Update Every 200 Milliseconds
@@ -17,14 +26,14 @@ class GPS:
         GPRMC_GPGGA="$PMTK314,0,1,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0*28\r\n"#Send GPRMC AND GPGGA Sentences
         #reduces the number of senteces that are considered
         #sets the speed of the reporting so it is not too fast
-        ser.write(GPRMC_GPGGA)
-        sleep(1)
-        ser.write(MEAS_200_msec)
-        sleep(1)
-        ser.write(UPDATE_200_msec)
-        sleep(1)
-        ser.flushInput()
-        ser.flushOutput()
+        self.ser.write(GPRMC_GPGGA)
+        hal.sleep(1)
+        self.ser.write(MEAS_200_msec)
+        hal.sleep(1)
+        self.ser.write(UPDATE_200_msec)
+        hal.sleep(1)
+        self.ser.flushInput()
+        self.ser.flushOutput()
         
         # this is where you write the commands you want to give the NMEA sentences
         # to your serial object from earlier object.write(command) put sleep command after
@@ -32,11 +41,11 @@ class GPS:
     def read(self):
         try:
             # flush twice to make sure nothing is clogged
-            ser.flushInput()
-            ser.flushInput()
-            while ser.inWaiting() == 0:
+            self.ser.flushInput()
+            self.ser.flushInput()
+            while self.ser.inWaiting() == 0:
                 pass
-            NMEA = ser.readline()
+            NMEA = self.ser.readline()
             Narray = NMEA.split(",")
             if (Narray[0])[-3:] == 'GGA':
                     return Narray
@@ -50,10 +59,8 @@ class GPS:
         try:
             if info is not None:
                 lat = self.rawGPStodegGPS(info[2])
-                print lat
                 latDir = info[3]
                 lon = self.rawGPStodegGPS(info[4])
-                print lon
                 longDir = info[5]
                 coords = []
                 if (latDir == 'S'):
@@ -64,7 +71,7 @@ class GPS:
                     coords.append(lon * -1)
                 else:
                     coords.append(lon)
-                print coords
+                flight_recorder.record(flight_recorder.GPS, coords[0], coords[1])
                 return coords
         except:
             self.getCoords()
@@ -0,0 +1,127 @@
+"""
+Hardware abstraction layer of the rover
+
+Rover modules get the ADC, PWM, serial ports, I2C devices, distance sensors
+and the clock from here instead of importing the BeagleBone libraries
+themselves. The hardware backend imports those libraries on first use, so the
+rover modules can be imported anywhere, and use() swaps in another backend
+such as sim.SimBackend to run the rover code without the rover.
+
+Call use() before creating Robot, Navigation or any sensor object, they
+open their devices when they are created.
+"""
+
+import time as _time
+
+
+class HardwareBackend(object):
+    """
+    The real rover: Adafruit libraries on the BeagleBone and the system clock.
+    """
+
+    def time(self):
+        return _time.time()
+
+    def sleep(self, seconds):
+        _time.sleep(seconds)
+
+    def adc(self):
+        """
+        Returns (module): Adafruit_BBIO.ADC, with setup() and read(pin)
+        """
+        import Adafruit_BBIO.ADC as ADC
+        return ADC
+
+    def pwm(self):
+        """
+        Returns (module): Adafruit_BBIO.PWM, with start(), set_duty_cycle() and stop()
+        """
+        import Adafruit_BBIO.PWM as PWM
+        return PWM
+
+    def uart(self):
+        """
+        Returns (module): Adafruit_BBIO.UART, with setup(name)
+        """
+        import Adafruit_BBIO.UART as UART
+        return UART
+
+    def serial(self, port, baudrate):
+        """
+        Returns (serial.Serial): The opened serial port
+        """
+        import serial
+        return serial.Serial(port, baudrate)
+
+    def i2c(self, address, busnum):
+        """
+        Returns (Adafruit_I2C): The I2C device at the address
+        """
+        from Adafruit_I2C import Adafruit_I2C
+        return Adafruit_I2C(address, busnum)
+
+    def pca9685(self, address, busnum):
+        """
+        Returns (Adafruit_PCA9685.PCA9685): The PWM driver at the address
+        """
+        import Adafruit_PCA9685
+        return Adafruit_PCA9685.PCA9685(address=address, busnum=busnum)
+
+    def tof_sensors(self, channels, mux_address):
+        """
+        Args:
+            channels (list of int): TCA9548A channel of each sensor.
+            mux_address (int): I2C address of the TCA9548A.
+        Returns (list of VL53L0X.VL53L0X): A sensor on each channel.
+        """
+        # Importing opens the I2C bus and loads the ST library
+        import VL53L0X
+        return [VL53L0X.VL53L0X(TCA9548A_Num=channel, TCA9548A_Addr=mux_address) for channel in channels]
+
+
+backend = HardwareBackend()
+
+
+def use(new_backend):
+    """
+    Args:
+        new_backend: The backend every rover module uses from now on.
+    """
+    global backend
+    backend = new_backend
+
+
+def time():
+    return backend.time()
+
+
+def sleep(seconds):
+    backend.sleep(seconds)
+
+
+def adc():
+    return backend.adc()
+
+
+def pwm():
+    return backend.pwm()
+
+
+def uart():
+    return backend.uart()
+
+
+def serial(port, baudrate):
+    return backend.serial(port, baudrate)
+
+
+def i2c(address, busnum):
+    return backend.i2c(address, busnum)
+
+
+def pca9685(address, busnum):
+    return backend.pca9685(address, busnum)
+
+
+def tof_sensors(channels, mux_address):
+    return backend.tof_sensors(channels, mux_address)
@@ -0,0 +1,129 @@
+"""
+Latency tracing of teleop drive commands on the rover
+
+Every drive packet of the base station carries a trace id and the time it was
+sent on the clock of the base station. The rover stamps the latest trace with
+its own monotonic clock when the packet is received, when
+Robot.convertParmsToMotorVals() first uses it and when the first motor is
+written with it, and keeps a histogram of the time between the stages. Each
+packet sent back to the base station carries reply(): the trace id, the
+receive and motor times and the time of the reply. The base station uses
+them to work out the offset between the clocks and the latency from the
+joystick to the motors, see BaseStation/Communications/latency.py. The
+packet formats and the clock and histogram both ends use are in
+BaseStation/Communications/teleop.py, loaded from the BaseStation folder of
+the repository next to this one.
+
+The reply holds one trace, the latest one that reached the motors rather
+than the one in progress. When the main loop is slower than the drive packets
+a new packet starts a trace before every reply, so replying with the trace in
+progress would never send a motor time.
+
+A trace is stamped once per stage, later loops that reuse the same command
+don't count. The main loop of Robot is the only caller, so nothing is locked.
+Stamping is a clock read and a histogram update, cheap enough to leave on.
+"""
+
+import os
+import sys
+
+# The packet formats, the clock and the histogram are shared with the base station
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "BaseStation", "Communications"))
+from teleop import DRIVE_FORMAT, GPS_FORMAT, LEGACY_DRIVE_FORMAT, TELEMETRY_FORMAT, Histogram, now
+
+# Stages of a drive command on the rover, in order
+RECEIVED = 0
+CONVERTED = 1
+MOTORS = 2
+
+STAGE_NAMES = ("received", "converted", "motors")
+
+
+class Tracer(object):
+    """
+    Follows the latest drive command through the stages.
+
+    Attributes:
+        trace_id (int): Id of the latest drive packet, 0 if it wasn't traced.
+        sent (float): When the base station sent it, on the clock of the base station.
+        times (list of float): Time of each stage of the trace on the rover, None until reached.
+        completed (tuple of (int, float, float)): Trace id, receive and motor times of the
+            latest trace that reached the motors, None until one has.
+        histograms (dict of str to Histogram): Time from the previous stage to each stage.
+    """
+
+    def __init__(self):
+        self.trace_id = 0
+        self.sent = 0.0
+        self.times = [None] * len(STAGE_NAMES)
+        self.completed = None
+        self.histograms = dict((name, Histogram()) for name in STAGE_NAMES[1:])
+
+    def begin(self, trace_id, sent):
+        """
+        Starts following a received drive packet.
+
+        Args:
+            trace_id (int): Id of the packet, 0 for packets that aren't traced.
+            sent (float): When the base station sent it.
+        """
+        if trace_id == self.trace_id:
+            return
+        self.trace_id = trace_id
+        self.sent = sent
+        self.times = [None] * len(STAGE_NAMES)
+        if trace_id:
+            self.times[RECEIVED] = now()
+
+    def mark(self, stage):
+        """
+        Stamps a stage of the current trace, the first time it is reached.
+
+        Args:
+            stage (int): CONVERTED or MOTORS.
+        """
+        times = self.times
+        if times[RECEIVED] is None or times[stage] is not None:
+            return
+        times[stage] = now()
+        previous = stage - 1
+        while times[previous] is None:
+            previous -= 1
+        self.histograms[STAGE_NAMES[stage]].add(times[stage] - times[previous])
+        if stage == MOTORS:
+            self.completed = (self.trace_id, times[RECEIVED], times[MOTORS])
+
+    def reply(self):
+        """
+        Returns (tuple of (int, float, float, float)): The trace id, when it was received,
+            when a motor was first written with it and now. The latest trace that reached
+            the motors, the one in progress with a motor time of 0 until one has.
+        """
+        if self.completed is not None:
+            return self.completed + (now(),)
+        return (self.trace_id, self.times[RECEIVED] or 0.0, 0.0, now())
+
+    def summary(self):
+        """
+        Returns (dict of str to dict): Histogram summary of each stage.
+        """
+        return dict((name, histogram.summary()) for name, histogram in self.histograms.items())
+
+
+_tracer = Tracer()
+
+
+def begin(trace_id, sent):
+    _tracer.begin(trace_id, sent)
+
+
+def mark(stage):
+    _tracer.mark(stage)
+
+
+def reply():
+    return _tracer.reply()
+
+
+def summary():
+    return _tracer.summary()
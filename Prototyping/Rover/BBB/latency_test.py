@@ -0,0 +1,79 @@
+"""
+Checks that the base station gets the end to end latency of every joystick
+change, however fast the main loop of the rover is next to the drive packets.
+
+The Tracer of the rover and the TeleopLatency of the base station are driven
+through the order of Robot.main: receiveData(), sendData(), then converting
+and driving the motors, with the packets the base station sent in between
+sitting in the socket. No network or hardware is needed.
+
+    python latency_test.py
+"""
+
+import imp
+import os
+
+import latency
+
+BASE_STATION_LATENCY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    "..", "..", "BaseStation", "Communications", "latency.py")
+
+# Drive packets the base station sends every loop of the rover
+RATES = [0.5, 1, 2]
+
+# Packets the joystick stays still for, long enough for the rover to pick one up
+CHANGE_EVERY = 4
+
+
+def run(base_station, rate, loops=1000):
+    """
+    Runs the loops of the rover.
+
+    Args:
+        base_station (module): latency.py of the base station.
+        rate (float): Drive packets sent every loop.
+        loops (int): Loops of the rover.
+    Returns (tuple of (int, int, int)): Joystick changes, motor stage stamps of
+        the rover and end to end samples of the base station.
+    """
+    tracer = latency.Tracer()
+    teleop = base_station.TeleopLatency()
+    socket = []
+    due = 0.0
+    packets = 0
+    changes = 0
+    input_time = None
+    # One more loop without packets so the reply of the last trace goes out
+    for i in range(loops + 1):
+        due += rate if i < loops else 0
+        while due >= 1:
+            due -= 1
+            if packets % CHANGE_EVERY == 0:
+                input_time = base_station.now()
+                changes += 1
+            packets += 1
+            socket.append(teleop.sent(input_time))
+
+        # receiveData() only follows the newest packet
+        if socket:
+            tracer.begin(*socket[-1])
+            socket = []
+        teleop.replied(*tracer.reply())
+        tracer.mark(latency.CONVERTED)
+        tracer.mark(latency.MOTORS)
+
+    return changes, tracer.histograms["motors"].count, teleop.histograms["end_to_end"].count
+
+
+def main():
+    base_station = imp.load_source("base_station_latency", BASE_STATION_LATENCY)
+    for rate in RATES:
+        changes, motors, end_to_end = run(base_station, rate)
+        print "%.1f packets per loop: %d joystick changes, %d motor stamps, %d end to end samples" % (
+            rate, changes, motors, end_to_end)
+        assert end_to_end == changes, "lost the end to end latency of %d changes" % (changes - end_to_end)
+    print "ok"
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from math import hypot, atan2, degrees
 from PID import PID
 from Utils import normalize_angle
+import flight_recorder
 
 class PathFollower:
     """
@@ -36,8 +37,9 @@ class PathFollower:
         if diff_angle > 180.0:
             diff_angle -= 360.0
         self.pid.run(diff_angle)
-        print dx, dy, heading, desired_heading, self.pid.getOutput()
-        return min(max(self.pid.getOutput(), -100.0), 100.0)
+        turn = min(max(self.pid.getOutput(), -100.0), 100.0)
+        flight_recorder.record(flight_recorder.FOLLOW, location[0], location[1], heading, desired_heading, turn)
+        return turn
 
     def is_done(self, location):
         """
@@ -55,6 +57,7 @@ class PathFollower:
         self.path = path
         self.pid.reset()
         self.pid.setTarget(0.0)
+        self.record_waypoint()
 
     def remove_reached_destinations(self, location):
         while self.path != [] and \
@@ -62,3 +65,11 @@ class PathFollower:
             del self.path[0]
             self.pid.reset()
             self.pid.setTarget(0.0)
+            self.record_waypoint()
+
+    def record_waypoint(self):
+        """
+        Records the destination the robot heads to now, so a replay knows where it was going.
+        """
+        if self.path != []:
+            flight_recorder.record(flight_recorder.WAYPOINT, self.path[0][0], self.path[0][1])
@@ -0,0 +1,272 @@
+"""
+Opt-in profiling of the rover code
+
+Named timers and counters mark the hot paths, and a sampling profiler
+records the stacks of every thread. All of it is off until start() is
+called, or until SIGUSR1 is sent to a process that called
+install_signal():
+
+    kill -USR1 <pid of Robot.py>    # start
+    kill -USR1 <pid of Robot.py>    # stop and write the profile
+
+Timers are decorators or context managers, counters are plain calls:
+
+    @profiler.timed("robot.convert")
+    def convertParmsToMotorVals(self, driveParms): ...
+
+    with profiler.timer("robot.loop"):
+        ...
+    profiler.count("comms.packets")
+
+While off, a decorated function costs one extra call and a check of a
+global, timer() returns a shared object that does nothing and count()
+returns right away.
+
+stop() writes two files to PROFILE_DIR: the stacks sampled every
+SAMPLE_INTERVAL seconds in collapsed form, one "thread;caller;callee count"
+line per stack, which flamegraph.pl and speedscope read directly, and a
+table of the timers and counters.
+
+Science/Profiler.py is a copy of this module in the style of the Science
+code. Each board ships its own, the Science board only gets the Science
+folder and can't import from here. A fix to one copy goes into the other in
+the same change.
+"""
+
+import datetime
+import functools
+import os
+import signal
+import sys
+import threading
+import time
+
+from latency import now
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.01
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+
+_enabled = False
+_lock = threading.RLock()  # The signal handler can stop profiling while the main thread holds it
+_timers = {}  # Name -> [count, total seconds, max seconds]
+_counters = {}  # Name -> count
+_sampler = None
+
+
+class _NullTimer(object):
+    """
+    Timer handed out while profiling is off.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer(object):
+    """
+    Adds the time spent in a with block to a named timer.
+    """
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = now()
+        return self
+
+    def __exit__(self, *exc_info):
+        add_time(self.name, now() - self.start)
+        return False
+
+
+class Sampler(threading.Thread):
+    """
+    Samples the stack of every other thread at a fixed interval.
+
+    Attributes:
+        interval (float): Seconds between samples.
+        stacks (dict of str to int): Times each collapsed stack was seen.
+        samples (int): Samples taken.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        threading.Thread.__init__(self, name="profiler")
+        self.daemon = True
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._running = True
+        self._labels = {}  # Code object -> frame label
+
+    def stop(self):
+        self._running = False
+        self.join()
+
+    def run(self):
+        own = threading.current_thread().ident
+        while self._running:
+            time.sleep(self.interval)
+            names = dict((thread.ident, thread.name) for thread in threading.enumerate())
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    stack = self._collapse(frame, names.get(ident, "thread-%d" % ident))
+                    self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def _collapse(self, frame, thread_name):
+        labels = self._labels
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                label = labels[code] = "%s.%s" % (module, code.co_name)
+            stack.append(label)
+            frame = frame.f_back
+        stack.append(thread_name)
+        stack.reverse()
+        return ";".join(stack)
+
+
+def enabled():
+    return _enabled
+
+
+def timed(name=None):
+    """
+    Decorator that adds the time spent in a function to a timer.
+
+    Args:
+        name (str): Name of the timer, module.function if None.
+    """
+    def decorate(function):
+        label = name or "%s.%s" % (function.__module__, function.__name__)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = now()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                add_time(label, now() - start)
+        return wrapper
+    return decorate
+
+
+def timer(name):
+    """
+    Returns (context manager): Adds the time spent in the with block to the timer called name.
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def add_time(name, seconds):
+    with _lock:
+        stats = _timers.get(name)
+        if stats is None:
+            stats = _timers[name] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+
+
+def count(name, amount=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def start(interval=SAMPLE_INTERVAL):
+    """
+    Clears the timers and counters and starts profiling, does nothing if it already is.
+    """
+    global _enabled, _sampler
+    if _enabled:
+        return
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+    _sampler = Sampler(interval)
+    _sampler.start()
+    _enabled = True
+
+
+def stop(directory=PROFILE_DIR):
+    """
+    Stops profiling and writes the profile.
+
+    Returns (str): Path of the collapsed stacks, None if profiling wasn't on.
+    """
+    global _enabled, _sampler
+    if not _enabled:
+        return None
+    _enabled = False
+    _sampler.stop()
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    prefix = os.path.join(directory, datetime.datetime.now().strftime("profile-%Y%m%d-%H%M%S"))
+    write_stacks(prefix + ".folded", _sampler.stacks)
+    with open(prefix + ".txt", "w") as out:
+        out.write("%d samples every %g s\n\n" % (_sampler.samples, _sampler.interval))
+        out.write("\n".join(report()) + "\n")
+    _sampler = None
+    return prefix + ".folded"
+
+
+def toggle():
+    """
+    Starts profiling if it is off, otherwise stops it and prints where the profile was written.
+    """
+    if _enabled:
+        print "profile written to " + stop()
+    else:
+        start()
+        print "profiling"
+
+
+def install_signal(signum=signal.SIGUSR1):
+    """
+    Toggles profiling whenever the process gets signum. Must be called from the main thread.
+    """
+    signal.signal(signum, lambda received, frame: toggle())
+
+
+def write_stacks(path, stacks):
+    with open(path, "w") as out:
+        for stack, samples in sorted(stacks.items()):
+            out.write("%s %d\n" % (stack, samples))
+
+
+def report():
+    """
+    Returns (list of str): A line for each timer, slowest in total first, then each counter.
+    """
+    with _lock:
+        timers = sorted(_timers.items(), key=lambda item: -item[1][1])
+        counters = sorted(_counters.items())
+    lines = ["%-30s %8s %10s %10s %10s" % ("timer", "calls", "total ms", "mean ms", "max ms")]
+    for name, (calls, total, longest) in timers:
+        lines.append("%-30s %8d %10.1f %10.3f %10.3f" % (name, calls, total * 1000, total / calls * 1000,
+                                                         longest * 1000))
+    lines.append("")
+    lines.append("%-30s %8s" % ("counter", "count"))
+    for name, value in counters:
+        lines.append("%-30s %8d" % (name, value))
+    return lines
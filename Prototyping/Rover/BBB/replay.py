@@ -0,0 +1,356 @@
+"""
+Replays a flight log through the navigation and control code
+
+The sensor readings and commands of a log written by flight_recorder are
+fed back through Navigation, Robot.getDriveParms(), Robot.convertParmsToMotorVals(),
+PathFollower.go() and the motors, and what they compute is compared with
+what the log says they computed on the run. hal.time() is the time of the
+record being replayed, so the PID controllers see the same time steps, and
+nothing waits, so a replay runs as fast as the rover code allows.
+
+    python replay.py logs/flight-20170501-120000.bin [--tolerance 0.001]
+                     [--follow-gains KP KI KD] [--pot-gains KP KI KD]
+
+Replaying a log with unchanged code reproduces it, so any mismatch after a
+change to the control code shows what the change does to a real run, and
+--follow-gains and --pot-gains try other gains without editing the code.
+Prints a summary as JSON and exits with 1 if anything didn't match.
+
+A replay is open loop: the rover still goes where it went on the run, and
+PathFollower.go() gets the location the log recorded.
+"""
+
+import argparse
+import json
+import struct
+import sys
+import threading
+import time
+
+import flight_recorder
+import hal
+import sim
+from RangingManager import RangeScan
+
+# Records of what the rover measured or was told, fed back to the rover code
+INPUTS = (flight_recorder.POT, flight_recorder.MAG, flight_recorder.GPS, flight_recorder.COMMAND,
+          flight_recorder.DESTINATION, flight_recorder.RANGE, flight_recorder.WAYPOINT)
+
+# Records of what the rover code computed, compared with the replay
+OUTPUTS = (flight_recorder.HEADING, flight_recorder.FOLLOW, flight_recorder.DRIVE,
+           flight_recorder.MOTOR_VALS, flight_recorder.MOTOR)
+
+
+class ReplayBackend(object):
+    """
+    Backend of hal whose devices read the latest input of the log.
+
+    Attributes:
+        now (float): Time of the record being replayed.
+        latest (dict of int to tuple): The fields of the latest record of every input type.
+    """
+
+    def __init__(self):
+        self.now = sim.START_TIME
+        self.latest = {}
+        self.closed = threading.Event()
+        self._adc = ReplayADC(self)
+        self._pwm = sim.SimPWM()
+        self._uart = sim.SimUART()
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        pass
+
+    def value(self, record_type, default):
+        """
+        Returns: The first field of the latest record of the type, default if there was none yet.
+        """
+        return self.latest.get(record_type, (default,))[0]
+
+    def close(self):
+        """
+        Releases the distance sensors, call it before stopping the RangingManager.
+        """
+        self.closed.set()
+
+    def adc(self):
+        return self._adc
+
+    def pwm(self):
+        return self._pwm
+
+    def uart(self):
+        return self._uart
+
+    def serial(self, port, baudrate):
+        return ReplayGPSSerial(self)
+
+    def i2c(self, address, busnum):
+        return ReplayBNO055(self)
+
+    def pca9685(self, address, busnum):
+        return sim.SimPCA9685()
+
+    def tof_sensors(self, channels, mux_address):
+        return [ReplayVL53L0X(self) for channel in channels]
+
+
+class ReplayADC(object):
+    """
+    Adafruit_BBIO.ADC reading the latest potentiometer reading of the log.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def setup(self):
+        pass
+
+    def read(self, pin):
+        return self.backend.value(flight_recorder.POT, 0.0)
+
+
+class ReplayBNO055(object):
+    """
+    Adafruit_I2C device of the BNO055 magnetometer, reads the latest heading of the log.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def readU8(self, register):
+        return 0xA0 if register == 0x00 else 0
+
+    def write8(self, register, value):
+        pass
+
+    def readList(self, register, length):
+        heading = int(round(self.backend.value(flight_recorder.MAG, 0.0) * 16))
+        data = [heading & 0xFF, heading >> 8, 0, 0, 0, 0]
+        return data[:length]
+
+
+class ReplayGPSSerial(sim.SimGPSSerial):
+    """
+    Serial port of the GPS, sends a GGA sentence of the latest fix of the log.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.written = []
+
+    def readline(self):
+        latitude, longitude = self.backend.latest.get(flight_recorder.GPS, (0.0, 0.0))
+        return sim.gga_sentence(latitude, longitude, self.backend.now)
+
+
+class ReplayVL53L0X(object):
+    """
+    VL53L0X.VL53L0X that never measures anything, the log's scans are replayed by ReplayRanging instead.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def start_ranging(self, mode=0):
+        pass
+
+    def stop_ranging(self):
+        pass
+
+    def get_timing(self):
+        return 33000
+
+    def get_distance(self):
+        # Keeps the thread of the RangingManager from running until the replay is over
+        self.backend.closed.wait()
+        return -1
+
+
+class ReplayRanging(object):
+    """
+    Stands in for the RangingManager of Navigation, returns the latest scan of the log.
+    """
+
+    def __init__(self, backend, headings):
+        """
+        Args:
+            headings (tuple of float): Direction of each sensor, as RangingManager.headings.
+        """
+        self.backend = backend
+        self.headings = headings
+
+    def get_scan(self):
+        distances = self.backend.latest.get(flight_recorder.RANGE)
+        if distances is None:
+            return None
+        return RangeScan(self.backend.now, tuple(distance or None for distance in distances[:len(self.headings)]),
+                         self.headings)
+
+
+class Capture(object):
+    """
+    Recorder of flight_recorder that keeps the records of the replay in memory.
+
+    Attributes:
+        records (dict of int to list of tuple): The fields of every record of each type,
+            with the precision they have in a log.
+    """
+
+    def __init__(self):
+        self.records = dict((record_type, []) for record_type in flight_recorder.RECORD_TYPES)
+        self._structs = dict((record_type, struct.Struct("<" + fields))
+                             for record_type, (name, fields, names) in flight_recorder.RECORD_TYPES.items())
+
+    def record(self, record_type, *values):
+        record_struct = self._structs[record_type]
+        self.records[record_type].append(record_struct.unpack(record_struct.pack(*values)))
+
+    def close(self):
+        pass
+
+
+def compare(record_type, expected, replayed, times, tolerance):
+    """
+    Args:
+        record_type (int): An output record type.
+        expected, replayed (list of tuple): The fields of the records of the log and of the replay.
+        times (list of float): Time of each record of the log.
+        tolerance (float): Largest difference of a field that still matches.
+    Returns (dict): How the replay differs from the log.
+    """
+    name, fields, names = flight_recorder.RECORD_TYPES[record_type]
+    largest = dict((field, 0.0) for field in names)
+    mismatches = 0
+    first = None
+    for i, (logged, ours) in enumerate(zip(expected, replayed)):
+        differences = [abs(a - b) for a, b in zip(logged, ours)]
+        for field, difference in zip(names, differences):
+            largest[field] = max(largest[field], difference)
+        if max(differences) > tolerance:
+            mismatches += 1
+            if first is None:
+                first = {"index": i, "time": times[i], "logged": logged, "replayed": ours}
+    return {
+        "logged": len(expected),
+        "replayed": len(replayed),
+        "mismatches": mismatches + abs(len(expected) - len(replayed)),
+        "max_difference": largest,
+        "first_mismatch": first,
+    }
+
+
+def run(path, tolerance=1e-3, follow_gains=None, pot_gains=None):
+    """
+    Args:
+        path (str): The flight log.
+        tolerance (float): Largest difference of a field that still matches.
+        follow_gains (tuple of float): KP, KI and KD of PathFollower, its own if None.
+        pot_gains (tuple of float): KP, KI and KD of Robot.pot_pid, its own if None.
+    Returns (dict): Results of the replay.
+    """
+    log = flight_recorder.records(path)
+    backend = ReplayBackend()
+    if log:
+        backend.now = log[0][1]
+    hal.use(backend)
+
+    # Imported after the backend is chosen, like the rover would import them
+    import Robot
+    from path_following import PathFollower
+
+    robot = Robot.Robot(True, comms_ip="127.0.0.1")
+    nav = robot.get_nav()
+    nav.ranging = ReplayRanging(backend, robot.ranging.headings)
+    follower = PathFollower()
+    # The log says when a waypoint was reached
+    follower.position_epsilon = 0.0
+    if follow_gains is not None:
+        follower.pid.setCoefficients(*follow_gains)
+    if pot_gains is not None:
+        robot.pot_pid.setCoefficients(*pot_gains)
+
+    capture = Capture()
+    expected = dict((record_type, []) for record_type in OUTPUTS)
+    times = dict((record_type, []) for record_type in OUTPUTS)
+    heading = None
+    turn = None
+    motor_values = None
+
+    flight_recorder.use(capture)
+    real_start = time.time()
+    try:
+        for sequence, when, record_type, values in log:
+            backend.now = when
+            if record_type in INPUTS:
+                backend.latest[record_type] = values
+                if record_type == flight_recorder.COMMAND:
+                    robot.r_comms.receivedDrive = (bool(values[0]),) + values[1:]
+                elif record_type == flight_recorder.DESTINATION:
+                    nav.append_destination(values)
+                elif record_type == flight_recorder.WAYPOINT:
+                    follower.set_path([values])
+                continue
+            if record_type not in OUTPUTS:
+                continue
+            expected[record_type].append(values)
+            times[record_type].append(when)
+
+            # Each output record marks where the rover code made that call on the run, make it again
+            if record_type == flight_recorder.HEADING:
+                heading = nav.getMag()
+            elif record_type == flight_recorder.FOLLOW and follower.path != []:
+                turn = follower.go(values[:2], heading if heading is not None else values[2])
+            elif record_type == flight_recorder.DRIVE:
+                throttle = values[0]
+                received = robot.r_comms.receivedDrive
+                if turn is not None:
+                    # Steered by the path follower
+                    drive_parms = (throttle, turn)
+                elif received is not None and not received[0]:
+                    drive_parms = robot.getDriveParms()
+                else:
+                    drive_parms = values[:2]
+                motor_values = robot.convertParmsToMotorVals(drive_parms)
+                heading = None
+                turn = None
+            elif record_type == flight_recorder.MOTOR:
+                motor_id = values[0]
+                robot.driveMotor(motor_id, motor_values[motor_id - 1] if motor_values is not None else values[1])
+    finally:
+        real_seconds = time.time() - real_start
+        flight_recorder.stop()
+        backend.close()
+        robot.ranging.stop()
+        robot.r_comms.closeConn()
+
+    log_seconds = log[-1][1] - log[0][1] if log else 0.0
+    results = dict((flight_recorder.RECORD_TYPES[record_type][0],
+                    compare(record_type, expected[record_type], capture.records[record_type],
+                            times[record_type], tolerance))
+                   for record_type in OUTPUTS)
+    return {
+        "records": len(log),
+        "log_seconds": log_seconds,
+        "real_seconds": real_seconds,
+        "records_per_second": len(log) / real_seconds if real_seconds > 0 else float("inf"),
+        "speedup": log_seconds / real_seconds if real_seconds > 0 else float("inf"),
+        "mismatches": sum(result["mismatches"] for result in results.values()),
+        "outputs": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replays a flight log through the navigation and control code")
+    parser.add_argument("log", help="The flight log")
+    parser.add_argument("--tolerance", type=float, default=1e-3, help="Largest difference that still matches")
+    parser.add_argument("--follow-gains", type=float, nargs=3, help="KP KI KD of the path follower")
+    parser.add_argument("--pot-gains", type=float, nargs=3, help="KP KI KD of the potentiometer PID")
+    args = parser.parse_args()
+
+    results = run(args.log, args.tolerance, args.follow_gains, args.pot_gains)
+    print json.dumps(results, indent=4, sort_keys=True)
+    sys.exit(1 if results["mismatches"] else 0)
@@ -0,0 +1,547 @@
+"""
+Simulation backend of the hardware abstraction layer
+
+SimRover is a kinematic model of the articulated rover: a back and a front
+body joined by the potentiometer joint, each driven like a differential drive
+by its two motors. SimBackend hands the rover modules simulated devices that
+measure it, with noise: the potentiometer on the ADC, a GPS sending NMEA
+sentences, the BNO055 magnetometer on I2C and VL53L0X distance sensors that
+see the obstacles of the world.
+
+Time is simulated too. SimClock only moves when the thread running the
+simulation sleeps, so a run goes as fast as the rover code allows and two
+runs with the same seed give the same result. See simulate.py.
+"""
+
+import math
+import random
+import threading
+
+# Time the simulated clock starts at, PID controllers divide by the time since 0 on their first run
+START_TIME = 1500000000.0
+
+
+class SimClock(object):
+    """
+    Simulated time, advanced by the thread that created it.
+
+    Other threads that sleep, such as the thread of a RangingManager, wait until
+    the simulation reaches their wake up time. Advancing the clock waits for
+    them to finish what they do at that time before returning, so they run at
+    the same simulated times on every run.
+
+    Attributes:
+        now (float): The simulated time in seconds.
+    """
+
+    def __init__(self, start=START_TIME):
+        self.now = float(start)
+        self.listeners = []
+        self._owner = threading.current_thread()
+        self._condition = threading.Condition()
+        self._waiting = {}  # Thread to the time it wakes up at
+        self._running = set()  # Threads woken up by the last advance that haven't waited again
+        self._closed = False
+
+    def time(self):
+        return self.now
+
+    def is_simulation_thread(self):
+        """
+        Returns (bool): True if the calling thread is the one advancing the clock.
+        """
+        return threading.current_thread() is self._owner
+
+    def sleep(self, seconds):
+        """
+        Advances the clock if called by the simulation thread, otherwise waits
+        until the simulation reaches the wake up time.
+        """
+        if self.is_simulation_thread():
+            self.advance(seconds)
+        else:
+            self.wait_until(self.now + seconds)
+
+    def advance(self, seconds):
+        """
+        Moves time forward, telling every listener, and waits for the threads
+        that wake up to wait again.
+
+        Args:
+            seconds (float): How far to move.
+        """
+        if seconds <= 0:
+            return
+        end = self.now + seconds
+        # Wake sleeping threads in order, so they see the world at their wake up time
+        while True:
+            with self._condition:
+                wake = [deadline for deadline in self._waiting.values() if deadline <= end]
+            target = min(wake) if wake else end
+            step = target - self.now
+            if step > 0:
+                for listener in self.listeners:
+                    listener(step)
+            with self._condition:
+                self.now = target
+                self._condition.notify_all()
+                # A thread stuck on something else can't stop the simulation for more than a second
+                limit = 100
+                while limit > 0 and not self._closed and self._settling():
+                    self._condition.wait(0.01)
+                    limit -= 1
+            if target >= end:
+                return
+
+    def _settling(self):
+        """
+        Returns (bool): True while woken threads are still running. Called holding the condition.
+        """
+        self._running = set(thread for thread in self._running if thread.is_alive())
+        due = [thread for thread, deadline in self._waiting.items() if deadline <= self.now]
+        return bool(due or self._running)
+
+    def wait_until(self, deadline):
+        """
+        Waits, in real time, until the simulation reaches the deadline.
+        """
+        thread = threading.current_thread()
+        with self._condition:
+            self._running.discard(thread)
+            self._waiting[thread] = deadline
+            self._condition.notify_all()
+            while self.now < deadline and not self._closed:
+                self._condition.wait(0.1)
+            del self._waiting[thread]
+            if not self._closed:
+                self._running.add(thread)
+
+    def close(self):
+        """
+        Releases every waiting thread, call it before stopping the threads of the rover.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class SimRover(object):
+    """
+    Kinematic model of the articulated rover and the world around it.
+
+    Positions are in meters east and north of the origin, headings in degrees
+    clockwise from north. The model follows the motor layout of Robot:
+
+    Front
+    +---+
+    3   4
+     \ /
+      0
+     / \
+    1   2
+    +---+
+    Back
+
+    Attributes:
+        x, y (float): Position of the joint.
+        heading (float): Heading of the back body, where the magnetometer is.
+        angle (float): Angle of the front body relative to the back body, > 0 to the right.
+        obstacles (list of tuple of (float, float, float)): Circles of (x, y, radius).
+        motors (list of Motor.Motor): The motors of the robot, read every step.
+        distance (float): Distance the joint has traveled.
+        collisions (int): Steps where the rover was inside an obstacle.
+        max_step (float): Longest step of the integration in seconds.
+    """
+
+    def __init__(self, obstacles=(), x=0.0, y=0.0, heading=0.0, seed=0,
+                 max_speed=1.0, track=0.6, body_length=0.5, angle_limit=40.0,
+                 pot_left=0.55, pot_right=0.11111, origin=(47.6553, -122.3035),
+                 tof_headings=None, noise=1.0):
+        """
+        Args:
+            obstacles (list of tuple of (float, float, float)): Circles of (x, y, radius).
+            x, y, heading (float): Starting pose.
+            seed (int): Seed of the sensor noise.
+            max_speed (float): Speed of a wheel at full power in meters per second.
+            track (float): Distance between the left and right wheels in meters.
+            body_length (float): Distance from the joint to the middle of a body in meters.
+            angle_limit (float): Most the joint bends either way in degrees.
+            pot_left, pot_right (float): ADC readings of the potentiometer at the left and right limits.
+            origin (tuple of (float, float)): Latitude and longitude of x = y = 0.
+            tof_headings (dict of int to float): Heading of the distance sensor on each TCA9548A channel,
+                relative to the front body. Defaults to the sensors of Robot.
+            noise (float): Multiplies the noise of every sensor, 0 for perfect sensors.
+        """
+        self.obstacles = list(obstacles)
+        self.x = float(x)
+        self.y = float(y)
+        self.heading = float(heading)
+        self.angle = 0.0
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.max_speed = max_speed
+        self.track = track
+        self.body_length = body_length
+        self.angle_limit = angle_limit
+        self.pot_left = pot_left
+        self.pot_right = pot_right
+        self.origin = origin
+        self.tof_headings = tof_headings if tof_headings is not None else {0: -20.0, 1: 0.0, 2: 20.0}
+        self.noise = noise
+
+        self.motors = []
+        self.distance = 0.0
+        self.collisions = 0
+        self.max_step = 0.01
+
+    def attach_motors(self, motors):
+        """
+        Args:
+            motors (list of Motor.Motor): Motors 1 to 4, the world reads the power last set on each.
+        """
+        self.motors = [motor for motor in motors if motor is not None]
+
+    def motor_speeds(self):
+        """
+        Returns (list of float): Speed of the wheel of each motor in meters per second.
+        """
+        speeds = [motor.prev_motor_val / 255.0 * self.max_speed for motor in self.motors]
+        return speeds + [0.0] * (4 - len(speeds))
+
+    def step(self, dt):
+        """
+        Moves the rover for dt seconds at the current motor powers.
+        """
+        steps = int(math.ceil(dt / self.max_step))
+        for _ in range(steps):
+            self._integrate(dt / steps)
+
+    def _integrate(self, dt):
+        back_left, back_right, front_left, front_right = self.motor_speeds()
+        speed = (back_left + back_right + front_left + front_right) / 4
+        # The left side going faster turns a body right, the bodies turning apart bends the joint
+        back_turn = (back_left - back_right) / self.track
+        front_turn = (front_left - front_right) / self.track
+        angle = max(-self.angle_limit, min(self.angle_limit, self.angle + math.degrees(front_turn - back_turn) * dt))
+        bend = math.radians(angle - self.angle) / dt
+
+        # Kinematics of an articulated vehicle with no sideways slip: the front body drives along its
+        # heading and turns towards the side the joint is bent to, the back body follows it through the joint
+        gamma = math.radians(self.angle)
+        front_heading = math.radians(self.heading + self.angle)
+        front_x, front_y = self.front_position()
+        front_x += speed * math.sin(front_heading) * dt
+        front_y += speed * math.cos(front_heading) * dt
+        front_heading += (speed * math.sin(gamma) + self.body_length * bend) / \
+            (self.body_length * (1 + math.cos(gamma))) * dt
+
+        x = front_x - self.body_length * math.sin(front_heading)
+        y = front_y - self.body_length * math.cos(front_heading)
+        self.distance += math.hypot(x - self.x, y - self.y)
+        self.x = x
+        self.y = y
+        self.angle = angle
+        self.heading = (math.degrees(front_heading) - angle) % 360
+
+        if self.clearance() < 0:
+            self.collisions += 1
+
+    def front_position(self):
+        """
+        Returns (tuple of (float, float)): Middle of the front body, where the distance sensors are.
+        """
+        heading = math.radians(self.heading + self.angle)
+        return (self.x + self.body_length * math.sin(heading), self.y + self.body_length * math.cos(heading))
+
+    def clearance(self):
+        """
+        Returns (float): Distance from the joint to the edge of the closest obstacle, < 0 inside one.
+        """
+        if not self.obstacles:
+            return float("inf")
+        return min(math.hypot(self.x - ox, self.y - oy) - radius for ox, oy, radius in self.obstacles)
+
+    def range(self, channel, max_range=2.0):
+        """
+        Args:
+            channel (int): TCA9548A channel of the distance sensor.
+            max_range (float): Furthest the sensor sees in meters.
+        Returns (float): Distance in meters to the first obstacle the sensor points at, None if there is none.
+        """
+        sx, sy = self.front_position()
+        heading = math.radians(self.heading + self.angle + self.tof_headings.get(channel, 0.0))
+        ux, uy = math.sin(heading), math.cos(heading)
+        closest = None
+        for ox, oy, radius in self.obstacles:
+            # Ray and circle intersection
+            fx, fy = sx - ox, sy - oy
+            b = fx * ux + fy * uy
+            c = fx * fx + fy * fy - radius * radius
+            discriminant = b * b - c
+            if discriminant < 0:
+                continue
+            t = -b - math.sqrt(discriminant)
+            if t < 0:
+                t = -b + math.sqrt(discriminant)
+            if t >= 0 and (closest is None or t < closest):
+                closest = t
+        if closest is None or closest > max_range:
+            return None
+        return closest
+
+    def gauss(self, sigma):
+        return self.random.gauss(0, sigma * self.noise) if self.noise else 0.0
+
+    def coordinates(self, x=None, y=None):
+        """
+        Args:
+            x, y (float): A position, the joint if omitted.
+        Returns (tuple of (float, float)): Latitude and longitude of the position.
+        """
+        if x is None:
+            x, y = self.x, self.y
+        latitude = self.origin[0] + y / 111320.0
+        longitude = self.origin[1] + x / (111320.0 * math.cos(math.radians(self.origin[0])))
+        return latitude, longitude
+
+    def local(self, latitude, longitude):
+        """
+        Returns (tuple of (float, float)): The x and y of a latitude and longitude, the inverse of coordinates().
+        """
+        return ((longitude - self.origin[1]) * 111320.0 * math.cos(math.radians(self.origin[0])),
+                (latitude - self.origin[0]) * 111320.0)
+
+
+class SimADC(object):
+    """
+    Adafruit_BBIO.ADC reading the potentiometer of the joint.
+    """
+
+    def __init__(self, rover):
+        self.rover = rover
+
+    def setup(self):
+        pass
+
+    def read(self, pin):
+        position = (self.rover.angle + self.rover.angle_limit) / (2 * self.rover.angle_limit)
+        reading = self.rover.pot_left + position * (self.rover.pot_right - self.rover.pot_left)
+        return min(1.0, max(0.0, reading + self.rover.gauss(0.002)))
+
+
+class SimPWM(object):
+    """
+    Adafruit_BBIO.PWM, keeps the duty cycle of every pin.
+    """
+
+    def __init__(self):
+        self.duty_cycles = {}
+
+    def start(self, pin, duty_cycle, frequency=2000):
+        self.duty_cycles[pin] = duty_cycle
+
+    def set_duty_cycle(self, pin, duty_cycle):
+        self.duty_cycles[pin] = duty_cycle
+
+    def stop(self, pin):
+        self.duty_cycles.pop(pin, None)
+
+
+class SimUART(object):
+    """
+    Adafruit_BBIO.UART
+    """
+
+    def setup(self, name):
+        pass
+
+
+class SimGPSSerial(object):
+    """
+    Serial port of the GPS, sends a GGA sentence of the position of the rover every fix.
+    """
+
+    def __init__(self, rover, clock, period=0.2):
+        """
+        Args:
+            period (float): Seconds between fixes, the GPS is set to 5 a second.
+        """
+        self.rover = rover
+        self.clock = clock
+        self.period = period
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    def flushInput(self):
+        pass
+
+    def flushOutput(self):
+        pass
+
+    def inWaiting(self):
+        return 1
+
+    def readline(self):
+        # The simulation thread waits for the next fix like it would on the rover
+        if self.clock.is_simulation_thread():
+            self.clock.sleep(self.period - (self.clock.now % self.period))
+
+        # The noise of a fix only depends on the fix, other threads can read the GPS at any time
+        fix = int(self.clock.now / self.period)
+        noise = random.Random(self.rover.seed * 1000003 + fix)
+        sigma = 1.5 * self.rover.noise
+        latitude, longitude = self.rover.coordinates(self.rover.x + noise.gauss(0, sigma),
+                                                     self.rover.y + noise.gauss(0, sigma))
+        return gga_sentence(latitude, longitude, self.clock.now)
+
+
+def gga_sentence(latitude, longitude, when):
+    """
+    Args:
+        latitude, longitude (float): The position of the fix.
+        when (float): Time of the fix in seconds since the epoch.
+    Returns (str): The GGA sentence of a GPS fix, ending in a newline.
+    """
+    fix_time = when % 86400
+    fields = ["GPGGA", "%02d%02d%05.2f" % (fix_time // 3600, fix_time % 3600 // 60, fix_time % 60),
+              _nmea_angle(abs(latitude), 2), "N" if latitude >= 0 else "S",
+              _nmea_angle(abs(longitude), 3), "E" if longitude >= 0 else "W",
+              "1", "08", "0.9", "10.0", "M", "0.0", "M", "", ""]
+    sentence = ",".join(fields)
+    checksum = 0
+    for character in sentence:
+        checksum ^= ord(character)
+    return "$%s*%02X\r\n" % (sentence, checksum)
+
+
+def _nmea_angle(degrees, width):
+    """
+    Returns (str): An angle in the ddmm.mmmm format of NMEA, with `width` digits of degrees
+    """
+    whole = int(degrees)
+    return "%0*d%07.4f" % (width, whole, (degrees - whole) * 60)
+
+
+class SimBNO055(object):
+    """
+    Adafruit_I2C device of the BNO055 magnetometer, gives the heading of the back body.
+    """
+
+    def __init__(self, rover):
+        self.rover = rover
+
+    def readU8(self, register):
+        return 0xA0 if register == 0x00 else 0
+
+    def write8(self, register, value):
+        pass
+
+    def readList(self, register, length):
+        heading = int(round(((self.rover.heading + self.rover.gauss(2.0)) % 360) * 16))
+        data = [heading & 0xFF, heading >> 8, 0, 0, 0, 0]
+        return data[:length]
+
+
+class SimPCA9685(object):
+    """
+    Adafruit_PCA9685.PCA9685, keeps the on and off times of every channel.
+    """
+
+    def __init__(self):
+        self.channels = {}
+        self.frequency = None
+
+    def set_pwm_freq(self, frequency):
+        self.frequency = frequency
+
+    def set_pwm(self, channel, on, off):
+        self.channels[channel] = (on, off)
+
+
+class SimVL53L0X(object):
+    """
+    VL53L0X.VL53L0X measuring the distance to the obstacles of the world.
+    """
+
+    def __init__(self, rover, clock, channel, budget=0.033):
+        """
+        Args:
+            channel (int): TCA9548A channel, sets the heading of the sensor.
+            budget (float): Timing budget in seconds, one measurement is made every budget.
+        """
+        self.rover = rover
+        self.clock = clock
+        self.channel = channel
+        self.budget = budget
+        self.next_measurement = None
+
+    def start_ranging(self, mode=0):
+        self.next_measurement = self.clock.now + self.budget
+
+    def stop_ranging(self):
+        self.next_measurement = None
+
+    def get_timing(self):
+        return int(self.budget * 1000000)
+
+    def get_distance(self):
+        if self.next_measurement is None:
+            return -1
+        # Wait for the measurement in progress, like the ST library does
+        if self.clock.now < self.next_measurement:
+            self.clock.sleep(self.next_measurement - self.clock.now)
+        while self.next_measurement <= self.clock.now:
+            self.next_measurement += self.budget
+
+        distance = self.rover.range(self.channel)
+        if distance is None:
+            return 8190
+        return max(1, int(round(distance * 1000 + self.rover.gauss(10))))
+
+
+class SimBackend(object):
+    """
+    Backend of hal that measures a SimRover, time is a SimClock.
+    """
+
+    def __init__(self, rover, clock=None):
+        """
+        Args:
+            rover (SimRover): The simulated rover.
+            clock (SimClock): The simulated time, a new one if None. The world moves whenever it advances.
+        """
+        self.rover = rover
+        self.clock = clock if clock is not None else SimClock()
+        self.clock.listeners.append(rover.step)
+        self._adc = SimADC(rover)
+        self._pwm = SimPWM()
+        self._uart = SimUART()
+
+    def time(self):
+        return self.clock.time()
+
+    def sleep(self, seconds):
+        self.clock.sleep(seconds)
+
+    def adc(self):
+        return self._adc
+
+    def pwm(self):
+        return self._pwm
+
+    def uart(self):
+        return self._uart
+
+    def serial(self, port, baudrate):
+        return SimGPSSerial(self.rover, self.clock)
+
+    def i2c(self, address, busnum):
+        return SimBNO055(self.rover)
+
+    def pca9685(self, address, busnum):
+        return SimPCA9685()
+
+    def tof_sensors(self, channels, mux_address):
+        return [SimVL53L0X(self.rover, self.clock, channel) for channel in channels]
@@ -0,0 +1,134 @@
+"""
+Drives the rover code in simulation, faster than real time
+
+Robot, Navigation and PathFollower run unchanged against the devices of
+sim.SimBackend. Every step the rover reads its GPS and magnetometer, the path
+follower picks a turn and Robot turns it into motor powers, then the
+simulated clock moves on. With --planner the path around the obstacles comes
+from path_finding, which needs shapely and pyvisgraph.
+
+    python simulate.py [--seconds 120] [--rate 50] [--seed 0] [--planner] [--log run.bin] [--profile]
+
+Runs with the same arguments give the same result, so a run can be compared
+against an earlier one after changing the control code, and the real time it
+takes is a benchmark of the rover code. A run recorded with --log can be
+replayed with replay.py. --profile profiles the run, see profiler.py.
+"""
+
+import argparse
+import json
+import time
+
+import flight_recorder
+import hal
+import profiler
+import sim
+
+# Obstacles of the default world, circles of (x, y, radius) in meters
+OBSTACLES = [(4.0, 12.0, 1.0), (-3.0, 20.0, 1.5), (2.0, 28.0, 1.0)]
+
+# Where the rover drives to, in meters east and north of the start
+TARGET = (0.0, 35.0)
+
+
+def run(seconds=120.0, rate=50, seed=0, planner=False, throttle=60, tolerance=2.0, noise=1.0, log=None,
+        profile=False):
+    """
+    Args:
+        seconds (float): Simulated time to give up after.
+        rate (int): Steps of the control loop every simulated second.
+        seed (int): Seed of the sensor noise.
+        planner (bool): Plan a path around the obstacles instead of driving straight to the target.
+        throttle (int): Throttle the rover drives at.
+        tolerance (float): How close in meters a waypoint has to be to count as reached.
+        noise (float): Multiplies the noise of every sensor.
+        log (str): Flight log to record the run to, none if None.
+        profile (bool): Profile the run, the results then hold where the profile was written.
+    Returns (dict): Results of the run.
+    """
+    rover = sim.SimRover(OBSTACLES, seed=seed, noise=noise)
+    backend = sim.SimBackend(rover)
+    hal.use(backend)
+    if log is not None:
+        flight_recorder.start(log)
+
+    # Imported after the backend is chosen, like the rover would import them
+    import Robot
+    from path_following import PathFollower
+
+    robot = Robot.Robot(True, comms_ip="127.0.0.1")
+    rover.attach_motors(robot.motors)
+    nav = robot.get_nav()
+
+    follower = PathFollower()
+    follower.position_epsilon = tolerance
+    if planner:
+        from path_finding import find_path
+        follower.set_path(find_path((rover.x, rover.y), TARGET, [obstacle[:2] for obstacle in OBSTACLES], 2.5))
+    else:
+        follower.set_path([TARGET])
+
+    clock = backend.clock
+    start = clock.now
+    real_start = time.time()
+    steps = 0
+    location = (rover.x, rover.y)
+    next_fix = start
+    if profile:
+        profiler.start()
+    try:
+        while clock.now - start < seconds:
+            # The GPS only has a new fix 5 times a second, reading it waits for the next one
+            if clock.now >= next_fix:
+                latitude, longitude = nav.getGPS()
+                location = rover.local(latitude, longitude)
+                next_fix = clock.now + 0.2
+            if follower.is_done(location):
+                break
+            turn = follower.go(location, nav.getMag())
+            motor_values = robot.convertParmsToMotorVals((throttle, turn))
+            for i in range(1, 5):
+                robot.driveMotor(i, motor_values[i - 1])
+            clock.sleep(1.0 / rate)
+            steps += 1
+    finally:
+        for i in range(1, 5):
+            robot.stopMotor(i)
+        clock.close()
+        robot.ranging.stop()
+        robot.r_comms.closeConn()
+        flight_recorder.stop()
+        profile_path = profiler.stop()
+
+    real_seconds = time.time() - real_start
+    sim_seconds = clock.now - start
+    results = {
+        "reached": follower.is_done(location),
+        "sim_seconds": sim_seconds,
+        "real_seconds": real_seconds,
+        "speedup": sim_seconds / real_seconds if real_seconds > 0 else float("inf"),
+        "steps": steps,
+        "position": (rover.x, rover.y),
+        "target_error": ((rover.x - TARGET[0]) ** 2 + (rover.y - TARGET[1]) ** 2) ** .5,
+        "distance": rover.distance,
+        "collisions": rover.collisions,
+    }
+    if profile_path is not None:
+        results["profile"] = profile_path
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drives the rover code in simulation")
+    parser.add_argument("--seconds", type=float, default=120.0, help="Simulated time to give up after")
+    parser.add_argument("--rate", type=int, default=50, help="Control loop steps every simulated second")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the sensor noise")
+    parser.add_argument("--planner", action="store_true", help="Plan a path around the obstacles")
+    parser.add_argument("--noise", type=float, default=1.0, help="Multiplies the noise of every sensor")
+    parser.add_argument("--log", help="Record the run to this flight log")
+    parser.add_argument("--profile", action="store_true", help="Profile the run, see profiler.py")
+    args = parser.parse_args()
+
+    results = run(args.seconds, args.rate, args.seed, args.planner, noise=args.noise, log=args.log,
+                  profile=args.profile)
+    print json.dumps(results, indent=4, sort_keys=True)
@@ -10,7 +10,7 @@ DEFAULT_PIN = "P8_45"
 class CamFocus(Command):
 
     def __init__(self, servo_pin=DEFAULT_PIN):
-        Command.__init__(self, self._pid)
+        Command.__init__(self)
         self._motor = Servo(servo_pin)
 
     def initialize(self):
@@ -32,10 +32,13 @@ class CommHandler:
         self._continue = True
         self._receiving = False
 
-    @classmethod
-    def startCommsThread(cls):
-        comms_thread = Thread(target=cls.receiveMessagesOnThread)
+    def startCommsThread(self):
+        comms_thread = Thread(target=self.receiveMessagesOnThread, name="CommHandler")
+        comms_thread.daemon = True
         comms_thread.start()
+        parse_thread = Thread(target=Parse.thread_parsing, name="Parse")
+        parse_thread.daemon = True
+        parse_thread.start()
 
     @classmethod
     def sendAsyncPacket(cls, packet):
@@ -44,16 +47,16 @@ class CommHandler:
 
     # Meant to be threaded on system
     # Otherwise there will be an infinite loop
-    @classmethod
-    def receiveMessagesOnThread(cls):
-        cls._continue = True
+    def receiveMessagesOnThread(self):
+        self._continue = True
         try:
-            while cls._continue:
-                cls.SOCKET.listen(1)
-                client, clientAddr = cls.SOCKET.accept()
-                cls._receiving = True
-                data = client.recv(cls.BYTE_BUFFER_SIZE)
-                cls._receiving = False
+            while self._continue:
+                self.SOCKET.listen(1)
+                client, clientAddr = self.SOCKET.accept()
+                self._receiving = True
+                data = client.recv(self.BYTE_BUFFER_SIZE)
+                client.close()
+                self._receiving = False
                 Parse.queueMessage(Message(data, clientAddr))
         except socket.error:
             # Throw "Failed to begin receive process"
@@ -86,6 +89,6 @@ class Message:
 
     def __init__(self, data, fromAddr):
         self.data = Util.chartobytes(data)
-        self.ID = int(self.data[33:40])
+        self.ID = int(self.data[32:40], 2)
         self.fromAddr = fromAddr
 
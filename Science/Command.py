@@ -1,3 +1,5 @@
+import hal
+import Profiler
 from threading import Thread
 
 
@@ -5,8 +7,12 @@ class Command:
 
     commands = []
 
+    period = 0.01  # Seconds between runs, so commands don't starve the main loop
+
     def __init__(self, pid=None):
-        self._thread = Thread(target=self._threadRun)
+        self._name = self.__class__.__name__
+        self._thread = Thread(target=self._threadRun, name=self._name)
+        self._thread.daemon = True
         self._pid = pid
         self._pidCtrl = True
         self._setpoint = 0
@@ -24,7 +30,9 @@ class Command:
 
     def _threadRun(self):
         while not self.isFinished():
-            self.run(self.setpoint())
+            with Profiler.timer(self._name):
+                self.run(self.setpoint())
+            hal.sleep(self.period)
 
     def stop(self):
         self.stopSafe()
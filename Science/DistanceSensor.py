@@ -33,12 +33,14 @@ NOTE: It is recommended to call stopRanging() at the end of getting distances, b
 
 """
 
-import VL53L0X
-import time
+import hal
 import Error
 import Util
 from Sensor import Sensor
 
+# Mode of the VL53L0X library, see VL53L0X.py
+BETTER_ACCURACY_MODE = 1
+
 
 class DistanceSensor(Sensor):
 
@@ -48,7 +50,7 @@ class DistanceSensor(Sensor):
     def __init__(self):
         self._sensor = None
         try:
-            self._sensor = VL53L0X.VL53L0X()
+            self._sensor = hal.tof()
         except:
             # Throw "Communication Failure"
             self.critical_status = True
@@ -57,7 +59,7 @@ class DistanceSensor(Sensor):
     def start(self):
         if not self.critical_status:
             try:
-                self._sensor.start_ranging(VL53L0X.VL53L0X_BETTER_ACCURACY_MODE)
+                self._sensor.start_ranging(BETTER_ACCURACY_MODE)
                 self._ranging = True
             except:
                 # Throw "Could not start ranging"
@@ -77,13 +79,9 @@ class DistanceSensor(Sensor):
             return 0
         if not self._ranging:
             self.start()
-            time.sleep(0.3)
         try:
-            timing = self._sensor.get_timing()
-            if timing < 20000:
-                timing = 20000
+            # Ranging is continuous, this only waits for the measurement in progress
             self._distance = self._sensor.get_distance()
-            time.sleep(timing / 1000000.00)
         except:
             # Throw "Could not get Reading"
             Error.throw(0x0301)
@@ -1,5 +1,6 @@
+import hal
 import Parse
-from datetime import datetime
+from math import pi
 from Motor import TalonMC
 from Packet import AuxCtrlID
 from PID import PID
@@ -15,23 +16,26 @@ class DrillCtrl(Command):
         self.drillEncoder = drillEncoder
         self.currentPos = 0
         self.currentRate = 0
-        self.lastTime = datetime.now().microsecond
+        self.lastTime = hal.time()
 
     def initialize(self):
         self.drillMotor.enable()
         self.currentPos = self.drillEncoder.getValue()[0]
         self.currentRate = 0
+        self.lastTime = hal.time()
 
     def run(self, setpoint):
         # Set setpoint of PID controller to given setpoint
         self._pid.setTarget(setpoint)
 
-        # Find current rate
-        now = datetime.now().microsecond
+        # Find current rate in RPM, the encoder angle is in radians
+        now = hal.time()
         deltaT = now - self.lastTime
+        if deltaT <= 0:
+            return
         self.lastTime = now
         currentP = self.drillEncoder.getValue()[0]
-        self.currentRate = (currentP - self.currentPos) / deltaT
+        self.currentRate = (currentP - self.currentPos) / deltaT * 60 / (2 * pi)
         self.currentPos = currentP
 
         # Run PID Controller
@@ -31,7 +31,7 @@ TODO: ADD ERROR THROWING TO INITIALIZED / READ GPIO
 
 """
 import Util
-import Adafruit_BBIO.GPIO as GPIO
+import hal
 from math import pi
 from threading import Thread
 from Sensor import Sensor
@@ -44,6 +44,7 @@ class Encoder(Sensor):
     def __init__(self, pinA, pinB, ppr):
         self._pinA = pinA      # integer value for A channel
         self._pinB = pinB      # integer value for B channel
+        GPIO = hal.gpio()
         GPIO.setup(self._pinA, GPIO.IN)  # sets input GPIO pins
         GPIO.setup(self._pinB, GPIO.IN)  # sets input GPIO pins
         self._ppr = ppr        # pulses per revolution of the encoder
@@ -58,11 +59,14 @@ class Encoder(Sensor):
     # Initializes Encoder
     # Meant for internal use only
     def _setup(self):
+        GPIO = hal.gpio()
         self._lastA = GPIO.input(self._pinA)
         self._lastB = GPIO.input(self._pinB)
         self._isSetup = True
-        self._threadA = Thread(target=self._threadAChannel)
-        self._threadB = Thread(target=self._threadBChannel)
+        self._threadA = Thread(target=self._threadAChannel, name="Encoder " + str(self._pinA))
+        self._threadB = Thread(target=self._threadBChannel, name="Encoder " + str(self._pinB))
+        self._threadA.daemon = True
+        self._threadB.daemon = True
         self._threadA.start()
         self._threadB.start()
 
@@ -73,6 +77,7 @@ class Encoder(Sensor):
         # last cycle to this cycle.
         if not self._isSetup:
             self._setup()
+        GPIO = hal.gpio()
         curA = GPIO.input(self._pinA)
         curB = GPIO.input(self._pinB)
 
@@ -90,11 +95,12 @@ class Encoder(Sensor):
         self._lastB = curB
 
     def _waitForEdge(self, pin):
+        GPIO = hal.gpio()
         current = GPIO.input(pin)
         if current:
-            GPIO.waitForEdge(pin, GPIO.FALLING)
+            GPIO.wait_for_edge(pin, GPIO.FALLING)
         else:
-            GPIO.waitForEdge(pin, GPIO.RISING)
+            GPIO.wait_for_edge(pin, GPIO.RISING)
         self._update()
 
     def _waitForA(self):
@@ -135,6 +141,11 @@ class Encoder(Sensor):
         while True:
             self._waitForB()
 
+    # Starts following the channels, SensorHandler.startAll() calls this
+    def start(self):
+        if not self._isSetup:
+            self._setup()
+
     def getValue(self):
         return self.getAngle(), self.getDistance()
 
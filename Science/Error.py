@@ -1,47 +1,132 @@
+"""
+Error reporting of the Science board.
+
+throw() only counts an error against its code, so sensors can call it
+every cycle. Each code is written to stderr at most once every
+LOG_INTERVAL seconds, the errors in between are counted and reported
+with the next write. The RING_SIZE codes thrown most recently are kept
+with their counts and first/last times.
+
+Main sends one Error packet per cycle with the codes thrown since the
+last one, along with the sensor and telemetry packets. Each code is
+    code (16 bits) | times thrown since the last packet (16 bits) |
+    first time thrown (32 bits) | last time thrown (32 bits)
+with times as 32 bit UNIX timestamps, at most MAX_BATCH codes a packet.
+
+"""
 import sys
 import os
+import threading
+from collections import OrderedDict
+import hal
+import Profiler
 import Util
 import Motor
 from Packet import Packet
 from Packet import PacketType
 from Packet import getConnectionStatus
-from CommHandler import CommHandler
+
+RING_SIZE = 64  # Codes kept, the least recently thrown is dropped first
+LOG_INTERVAL = 1.0  # Seconds between writes of the same code to stderr
+MAX_BATCH = 32  # Codes in one Error packet
+
+_recent = OrderedDict()  # Code -> ErrorRecord, least recently thrown first
+_lock = threading.Lock()
 
 
-errors = []
+class ErrorRecord:
+
+    # How often an error code was thrown and when
+
+    def __init__(self, code, time):
+        self.code = code
+        self.count = 0
+        self.firstTime = time
+        self.lastTime = time
+        self.unsent = 0  # Times thrown since the last Error packet
+        self.loggedTime = None  # When it was last written to stderr
+        self.suppressed = 0  # Times thrown since then
 
 
 def clearErrors():
-    errors = []
+    with _lock:
+        _recent.clear()
 
 
 def throw(errorCode, comment="", file="", line=None, fatal=False):
     if not getConnectionStatus() and errorCode == 0x0503:
         return False
-    elif errorCode == 0x0503:
-        comment += "CHECK ETHERNET CABLE ATTACHMENT \n"
-    if len(comment) > 0:
-        comment += "Given information: " + str(comment) + "\n"
-    if file != "":
-        comment += "File: " + file
-    if not (line is None):
-        comment += " | " + "Line: " + str(line)
-    comment += "\n"
-    error_out = "Error: " + hex(errorCode) + " | Refer to documentation for more information.\n" + comment + "\n"
-    sys.stderr.write(error_out)
-    errors.append(errorCode)
-    errorPack = Packet(PacketType.Error)
-    errorPack.appendData(Util.inttobin(errorCode, 16))
-    CommHandler.sendAsyncPacket(errorPack)
+    Profiler.count("Error.throw")
+    now = hal.time()
+    with _lock:
+        record = _recent.pop(errorCode, None)
+        if record is None:
+            record = ErrorRecord(errorCode, now)
+        _recent[errorCode] = record
+        if len(_recent) > RING_SIZE:
+            _recent.popitem(last=False)
+        record.count += 1
+        record.unsent += 1
+        record.lastTime = now
+        log = record.loggedTime is None or now - record.loggedTime >= LOG_INTERVAL
+        if log:
+            suppressed = record.suppressed
+            record.loggedTime = now
+            record.suppressed = 0
+        else:
+            record.suppressed += 1
+    if log:
+        sys.stderr.write(describe(errorCode, comment, file, line, suppressed))
     if fatal:
+        # Nothing else will send it
+        errorPack = getSummaryPacket()
+        if errorPack is not None:
+            errorPack.send()
         Motor.Motor.stopAll()
         os.system("sudo reboot")
         sys.exit(0x00FF)
 
 
+# Returns the text written to stderr for an error
+def describe(errorCode, comment="", file="", line=None, suppressed=0):
+    error_out = "Error: " + hex(errorCode) + " | Refer to documentation for more information.\n"
+    if errorCode == 0x0503:
+        error_out += "CHECK ETHERNET CABLE ATTACHMENT \n"
+    if len(comment) > 0:
+        error_out += "Given information: " + str(comment) + "\n"
+    if file != "":
+        error_out += "File: " + file
+    if not (line is None):
+        error_out += " | " + "Line: " + str(line)
+    if suppressed > 0:
+        error_out += "\nThrown " + str(suppressed) + " more times since the last report"
+    return error_out + "\n\n"
+
+
+# Returns an Error packet with the codes thrown since the last one,
+# None if there are none
+def getSummaryPacket():
+    data = ""
+    with _lock:
+        pending = [record for record in _recent.values() if record.unsent > 0][:MAX_BATCH]
+        for record in pending:
+            data += Util.inttobin(record.code, 16)
+            data += Util.inttobin(min(record.unsent, 0xFFFF), 16)
+            data += Util.inttobin(int(record.firstTime), 32)
+            data += Util.inttobin(int(record.lastTime), 32)
+            record.unsent = 0
+    if len(pending) == 0:
+        return None
+    errorPack = Packet(PacketType.Error)
+    errorPack.appendData(data)
+    return errorPack
+
+
+# Returns the ErrorRecord of every code kept, least recently thrown first
 def getErrors():
-    return errors
+    with _lock:
+        return list(_recent.values())
 
 
 def areErrors():
-    return len(errors) > 0
+    return len(_recent) > 0
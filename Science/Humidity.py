@@ -16,7 +16,7 @@ NOTE: Beaglebone Black ADC has a 12-bit resolution
 import Util
 import Error
 import sys
-import Adafruit_BBIO.ADC as ADC  # Ignore compilation errors
+import hal
 from Sensor import Sensor
 
 
@@ -34,7 +34,7 @@ class Humidity(Sensor):
         # Setup the ADC if not already done
         if not Util.ADC_Status():
             try:
-                ADC.setup()
+                hal.adc().setup()
                 Util.setADC_Status(True)
             except:
                 # Throw "Communication Failure"
@@ -52,8 +52,8 @@ class Humidity(Sensor):
         if self.critical_status:
             return 0
         try:
-            reading = ADC.read(self._pin)
-            reading = ADC.read(self._pin) * 1.8  # To get voltage
+            reading = hal.adc().read(self._pin)
+            reading = hal.adc().read(self._pin) * 1.8  # To get voltage
         except:
             # Throw "Could not get reading"
             Error.throw(0x0401)
@@ -12,7 +12,7 @@ Questions/Comments? Email: jadenjb@uw.edu
 
 import Util
 import Error
-import Adafruit_BBIO.GPIO as GPIO  # Ignore compiler errors
+import hal
 from Sensor import Sensor
 
 
@@ -22,6 +22,7 @@ class Limit(Sensor):
     def __init__(self, pin):
         self._pin = str(pin)
         try:
+            GPIO = hal.gpio()
             GPIO.setup(self._pin, GPIO.IN)
         except:
             # Throw "Could not setup DIO Pin"
@@ -35,7 +36,7 @@ class Limit(Sensor):
             return 0
         val = 0
         try:
-            val = GPIO.input(self._pin)
+            val = hal.gpio().input(self._pin)
         except:
             # Throw "Could not read DIO Pin"
             Error.throw(0x0003)
@@ -1,5 +1,4 @@
-import Adafruit_GPIO.PWM as PWM
-import time
+import hal
 
 
 """
@@ -14,15 +13,17 @@ class Motor:
 
     def __init__(self, pin):
         self._pin = pin
-        self._motor = PWM.BBIO_PWM_Adapter(PWM.get_platform_pwm())
+        self._motor = hal.pwm()
         self._motor.start(self._pin, 0.0, self._freq)
         self.motors += [self]
 
     def enable(self):
         pass
 
+    # Sets the power from 0 to 1, there is no reverse yet so the
+    # negative outputs of the PID controllers stop the motor
     def set(self, value):
-        self._motor.set_duty_cycle(self._pin, value * 100.0)
+        self._motor.set_duty_cycle(self._pin, max(0.0, min(1.0, value)) * 100.0)
 
     def stop(self):
         self._motor.stop(self._pin)
@@ -133,9 +134,9 @@ class TalonCalibration:
         self._motor = motor
 
     def calibrate(self):
-        start_time = time.time()
-        while time.time() - start_time < 0.5:
+        start_time = hal.time()
+        while hal.time() - start_time < 0.5:
             self._motor.set(1.0)
-        start_time = time.time()
-        while time.time() - start_time < 0.5:
+        start_time = hal.time()
+        while hal.time() - start_time < 0.5:
             self._motor.set(0.0)
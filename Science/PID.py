@@ -37,7 +37,7 @@ I'd rather find out now than later! jadenjb@uw.edu
 Thanks!
 """
 
-import time
+import hal
 
 
 class PID:
@@ -62,8 +62,10 @@ class PID:
     # Runs PID Algorithm
     # Designed to be ran iteratively
     def run(self, input):
-        curTime = time.time()
+        curTime = hal.time()
         dT = curTime - self._lastTime
+        if dT <= 0:
+            return  # Called again before the clock moved, nothing to integrate
         error = self._target - input
         self._pVal = self._p * error
         self._iVal += self._i * (dT * error)
@@ -8,8 +8,9 @@ Questions/Comments? Email: jadenjb@uw.edu
 
 """
 import socket
-import time
+import hal
 import Error
+import Profiler
 import Util
 
 CONNECTION_STATUS = True
@@ -26,16 +27,16 @@ class Packet:
         self._id = id
         self._recieved = ""
         if targetPort == None:
-            targetIP = self.DEF_TARGET_IP
-            targetPort = self.DEF_TARGET_PORT
+            targetIP = self.DEFAULT_TARGET_IP
+            targetPort = self.DEFAULT_TARGET_PORT
         elif targetIP == None:
-            targetIP = self.DEF_TARGET_IP
+            targetIP = self.DEFAULT_TARGET_IP
         self._targetIP = targetIP
         self._targetPort = targetPort
 
     # Appends 32bit UNIX timestamp to beginning of packet
     def addTimeID(self):
-        timestamp = Util.inttobin(int(time.time()), 32)
+        timestamp = Util.inttobin(int(hal.time()), 32)
         id = Util.inttobin(self._id)
         self._data = timestamp + id + self._data
 
@@ -53,6 +54,7 @@ class Packet:
 
     # Sends data to constructor-specified client
     # Returns whether or not send is successful
+    @Profiler.timed("Packet.send")
     def send(self):
         if self._data == Util.inttobin(0x0503, 16) and not getConnectionStatus():
             return False
@@ -72,9 +74,9 @@ class Packet:
 
     @classmethod
     def setDefaultTarget(cls, targetIP, targetPort):
-        cls.DEF_TARGET_IP = targetIP
-        cls.DEF_TARGET_PORT = targetPort
-        time.sleep(0.03)
+        cls.DEFAULT_TARGET_IP = targetIP
+        cls.DEFAULT_TARGET_PORT = targetPort
+        hal.sleep(0.03)
 
 
 # Packet Type Enumeration:
@@ -102,6 +104,7 @@ class CameraID:
 class SysCtrlID:
     Ping = 0x00
     Reboot = 0x01
+    Profile = 0x02  # Profiler.START or Profiler.STOP
 
 
 def setStatus(status):
@@ -1,7 +1,8 @@
 import Error
+import Queue
 from Packet import PacketType
 
-msgQueue = []
+msgQueue = Queue.Queue()
 
 # [ LAST TIMESTAMP, CMD_VAL_ID1, CMD_VAL_ID2, ... ]
 aux_ctrl = []
@@ -21,22 +22,20 @@ reset = False
 Queue a message to the handler
 """
 def queueMessage(msg):
-    msgQueue[len(msgQueue) - 1] = msg
+    msgQueue.put(msg)
 
 """
-Get Message from Queue
+Get Message from Queue, waits for one if it is empty
 """
 def nextMsg():
-    temp = msgQueue[0]
-    del msgQueue[0]
-    return temp
+    return msgQueue.get()
 
 """
 Parse message into timestamp and id
 """
 def parse(msg):
     global reset
-    if len(msgQueue) == 0 and reset:
+    if msgQueue.empty() and reset:
         reset = False  # Set reset back to default value
     if msg.ID == PacketType.AuxControl:
         parse_aux(msg)
@@ -52,7 +51,7 @@ def parse(msg):
 Parse Auxilliary Ctrl Packet
 """
 def parse_aux(msg):
-    aux_ctrl[0] = int(msg.data[0:33], 2)
+    aux_ctrl[0] = int(msg.data[0:32], 2)
     cmd_id = int(msg.data[40:48], 2)
     cmd_value = int(msg.data[48:80], 2)
     aux_ctrl[cmd_id + 1] = cmd_value
@@ -62,17 +61,17 @@ def parse_aux(msg):
 Parse System Ctrl Packet
 """
 def parse_sysctrl(msg):
-    cam_ctrl[0] = int(msg.data[0:33], 2)
+    sys_ctrl[0] = int(msg.data[0:32], 2)
     cmd_id = int(msg.data[40:48], 2)
     cmd_value = int(msg.data[48:80], 2)
-    cam_ctrl[cmd_id + 1] = cmd_value
+    sys_ctrl[cmd_id + 1] = cmd_value
 
 
 """
 Parse Img Request
 """
 def parse_imgreq(msg):
-    cam_ctrl[0] = int(msg.data[0:33], 2)
+    cam_ctrl[0] = int(msg.data[0:32], 2)
     cmd_id = int(msg.data[40:48], 2)
     cmd_value = int(msg.data[48:192], 2)
     if cmd_value != "I can haz picture?":
@@ -86,7 +85,7 @@ def parse_imgreq(msg):
 Parsing Handler
 """
 def parse_all():
-    while len(msgQueue) > 0:
+    while not msgQueue.empty():
         parse(nextMsg())
 
 
@@ -94,10 +93,14 @@ def parse_all():
 Threading method, call to setup thread
 """
 def thread_parsing():
+    global reset
     while True:
+        msg = nextMsg()
         if reset:
-            msgQueue = []
-        parse_all()
+            # Drop what was queued before the reset
+            reset = not msgQueue.empty()
+        else:
+            parse(msg)
 
 
 """
@@ -112,6 +115,7 @@ def resetCam():
 Setup Parsing with all zero arrays
 """
 def setupParsing():
+    global aux_ctrl, sys_ctrl, cam_ctrl
     aux_ctrl = [0] * 32
     sys_ctrl = [0] * 32
     cam_ctrl = [0] + [False] * 31
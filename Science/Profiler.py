@@ -0,0 +1,249 @@
+"""
+Opt-in profiling of the Science board.
+
+Named timers and counters mark the hot paths, and a sampling profiler
+records the stacks of every thread. All of it is off until start() is
+called, a SysControl packet with SysCtrlID.Profile arrives (1 starts,
+2 stops and writes the profile) or SIGUSR1 is sent to Main.py, which
+toggles it.
+
+Timers are decorators or context managers, counters are plain calls:
+
+    @Profiler.timed("Main.runCycle")
+    def runCycle(commHandling): ...
+
+    with Profiler.timer("DrillCtrl"):
+        ...
+    Profiler.count("Error.throw")
+
+While off, a decorated function costs one extra call and a check of a
+global, timer() returns a shared object that does nothing and count()
+returns right away.
+
+stop() writes two files to PROFILE_DIR: the stacks sampled every
+SAMPLE_INTERVAL seconds in collapsed form, one "thread;caller;callee count"
+line per stack, which flamegraph.pl and speedscope read directly, and a
+table of the timers and counters. Times are wall clock, not hal.time(),
+so the simulation's clock doesn't skew them.
+
+Prototyping/Rover/BBB/profiler.py is a copy of this module in the style of
+the rover code. Each board ships its own, the Science board only gets the
+Science folder and can't import from the rover's. A fix to one copy goes
+into the other in the same change.
+
+"""
+import datetime
+import functools
+import os
+import signal
+import sys
+import threading
+import time
+
+SAMPLE_INTERVAL = 0.01  # Seconds between stack samples
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+
+# Values of a SysCtrlID.Profile command
+START = 1
+STOP = 2
+
+_enabled = False
+_lock = threading.RLock()  # The signal handler can stop profiling while the main thread holds it
+_timers = {}  # Name -> [count, total seconds, max seconds]
+_counters = {}  # Name -> count
+_sampler = None
+
+
+class _NullTimer:
+
+    # Timer handed out while profiling is off
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excInfo):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+
+    # Adds the time spent in a with block to a named timer
+
+    def __init__(self, name):
+        self.name = name
+        self.startTime = None
+
+    def __enter__(self):
+        self.startTime = time.time()
+        return self
+
+    def __exit__(self, *excInfo):
+        addTime(self.name, time.time() - self.startTime)
+        return False
+
+
+class Sampler(threading.Thread):
+
+    # Samples the stack of every other thread every interval seconds,
+    # stacks holds how often each collapsed stack was seen
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        threading.Thread.__init__(self, name="Profiler")
+        self.daemon = True
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._running = True
+        self._labels = {}  # Code object -> frame label
+
+    def stop(self):
+        self._running = False
+        self.join()
+
+    def run(self):
+        own = threading.current_thread().ident
+        while self._running:
+            time.sleep(self.interval)
+            names = dict((thread.ident, thread.name) for thread in threading.enumerate())
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    stack = self._collapse(frame, names.get(ident, "Thread-%d" % ident))
+                    self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    # Returns thread;outermost;...;innermost with a module.function label per frame
+    def _collapse(self, frame, threadName):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                label = self._labels[code] = "%s.%s" % (module, code.co_name)
+            stack.append(label)
+            frame = frame.f_back
+        stack.append(threadName)
+        stack.reverse()
+        return ";".join(stack)
+
+
+def isEnabled():
+    return _enabled
+
+
+# Decorator adding the time spent in a function to a timer,
+# named module.function if no name is given
+def timed(name=None):
+    def decorate(function):
+        label = name or "%s.%s" % (function.__module__, function.__name__)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            startTime = time.time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                addTime(label, time.time() - startTime)
+        return wrapper
+    return decorate
+
+
+# Returns a context manager adding the time spent in its with block to a timer
+def timer(name):
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def addTime(name, seconds):
+    with _lock:
+        stats = _timers.get(name)
+        if stats is None:
+            stats = _timers[name] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+
+
+def count(name, amount=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+# Clears the timers and counters and starts profiling,
+# does nothing if it already is
+def start(interval=SAMPLE_INTERVAL):
+    global _enabled, _sampler
+    with _lock:
+        if _enabled:
+            return
+        _timers.clear()
+        _counters.clear()
+        _sampler = Sampler(interval)
+        _sampler.start()
+        _enabled = True
+    sys.stderr.write("Profiling\n")
+
+
+# Stops profiling and writes the profile. Returns the path
+# of the collapsed stacks, None if profiling wasn't on.
+def stop(directory=PROFILE_DIR):
+    global _enabled, _sampler
+    with _lock:
+        if not _enabled:
+            return None
+        _enabled = False
+        sampler = _sampler
+        _sampler = None
+    sampler.stop()
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    prefix = os.path.join(directory, datetime.datetime.now().strftime("profile-%Y%m%d-%H%M%S"))
+    writeStacks(prefix + ".folded", sampler.stacks)
+    with open(prefix + ".txt", "w") as out:
+        out.write("%d samples every %g s\n\n" % (sampler.samples, sampler.interval))
+        out.write("\n".join(report()) + "\n")
+    sys.stderr.write("Profile written to " + prefix + ".folded\n")
+    return prefix + ".folded"
+
+
+def toggle():
+    if _enabled:
+        stop()
+    else:
+        start()
+
+
+# Toggles profiling whenever the process gets signum,
+# must be called from the main thread
+def installSignal(signum=signal.SIGUSR1):
+    signal.signal(signum, lambda received, frame: toggle())
+
+
+def writeStacks(path, stacks):
+    with open(path, "w") as out:
+        for stack, samples in sorted(stacks.items()):
+            out.write("%s %d\n" % (stack, samples))
+
+
+# Returns a line for each timer, slowest in total first, then each counter
+def report():
+    with _lock:
+        timers = sorted(_timers.items(), key=lambda item: -item[1][1])
+        counters = sorted(_counters.items())
+    lines = ["%-30s %8s %10s %10s %10s" % ("timer", "calls", "total ms", "mean ms", "max ms")]
+    for name, (calls, total, longest) in timers:
+        lines.append("%-30s %8d %10.1f %10.3f %10.3f" % (name, calls, total * 1000, total / calls * 1000,
+                                                         longest * 1000))
+    lines.append("")
+    lines.append("%-30s %8s" % ("counter", "count"))
+    for name, value in counters:
+        lines.append("%-30s %8d" % (name, value))
+    return lines
@@ -1,3 +1,6 @@
+import Profiler
+
+
 class Sensor:
 
     critical_status = False
@@ -52,6 +55,7 @@ class SensorHandler:
             cls._auxSensors.append(arg)
 
     @classmethod
+    @Profiler.timed("SensorHandler.updateAll")
     def updateAll(cls):
         for sensor in (cls._sensors + cls._auxSensors):
             sensor.update()
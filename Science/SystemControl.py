@@ -1,8 +1,8 @@
 import os
-import time
+import hal
 import Parse
 import Error
-import Adafruit_BBIO.GPIO as GPIO  # Ignore compiler errors
+import Profiler
 from Command import Command
 from Packet import SysCtrlID, CameraID
 
@@ -14,31 +14,40 @@ class SystemControl(Command):
     def __init__(self, microscopeRelayPin):
         self.microscopeRelayPin = microscopeRelayPin
         try:
-            GPIO.setup(self.microscopeRelayPin, GPIO.IN)
+            GPIO = hal.gpio()
+            GPIO.setup(self.microscopeRelayPin, GPIO.OUT)
         except:
             # Throw "Could not setup DIO Pin"
             Error.throw(0x0002)
         Command.__init__(self)
 
     def initialize(self):
+        GPIO = hal.gpio()
         GPIO.output(self.microscopeRelayPin, GPIO.LOW)
 
     def run(self, reading):
         PING = Parse.sys_ctrl[SysCtrlID.Ping + 1] == 1
         REBOOT = Parse.sys_ctrl[SysCtrlID.Reboot + 1] == 1
         MICROSCOPE_CAPTURE = Parse.cam_ctrl[CameraID.Microscope + 1] == 1
+        PROFILE = Parse.sys_ctrl[SysCtrlID.Profile + 1]
         Parse.sys_ctrl[SysCtrlID.Ping + 1] = 0
         Parse.sys_ctrl[SysCtrlID.Reboot + 1] = 0
+        Parse.sys_ctrl[SysCtrlID.Profile + 1] = 0
         Parse.cam_ctrl[CameraID.Microscope + 1] = 0
         if PING:
             if not Error.areErrors():
                 Error.throw(0x0000)
             else:
                 Error.throw(0x00FE)
+        if PROFILE == Profiler.START:
+            Profiler.start()
+        elif PROFILE == Profiler.STOP:
+            Profiler.stop()
         if REBOOT:
             os.system("sudo reboot")
         if MICROSCOPE_CAPTURE:
+            GPIO = hal.gpio()
             GPIO.output(self.microscopeRelayPin, GPIO.HIGH)
-            time.sleep(self.microscopeTriggerTime)
+            hal.sleep(self.microscopeTriggerTime)
             GPIO.output(self.microscopeRelayPin, GPIO.LOW)
-        time.sleep(1)
+        hal.sleep(1)
@@ -1,32 +1,187 @@
+"""
+System telemetry of the Science board.
+
+A thread samples the CPU, memory and storage of the BeagleBone every
+SAMPLE_INTERVAL seconds from /proc and statvfs and encodes the sample
+once, so the main loop only copies the encoded string into its packet.
+CPU usage is the change of the jiffy counters since the last sample, so
+it covers the whole interval and doesn't depend on the clock.
+
+The packet holds the FIELDS in order, starting with the VERSION of the
+layout. Change VERSION whenever FIELDS changes.
+
+"""
+import os
 import threading
+import hal
 import Util
 
+PROC_STAT = "/proc/stat"
+PROC_MEMINFO = "/proc/meminfo"
+PROC_TASKS = "/proc/self/task"
+
 
 class SystemTelemetry:
 
-    telemetry = {
-        "CPU_USAGE": (0, 16),
-        "RAM_USAGE": (0, 16),
-        "RAM_CAPACITY": (0, 16),
-        "ACTIVE_THREADS": (threading.active_count(), 16),
-        "FLASH_USAGE": (0, 16),
-        "FLASH_CAPACITY": (0, 16),
-        "SD_CARD_USAGE": (0, 32),
-        "SD_CARD_CAPACITY": (0, 32)
-    }
+    VERSION = 1
+
+    # Name and bits of every field, in packet order. Usages are in hundredths
+    # of a percent, CPU usage of the process and threads is of one core.
+    # Sizes are in megabytes.
+    FIELDS = [
+        ("VERSION", 8),
+        ("CPU_USAGE", 16),
+        ("PROCESS_CPU_USAGE", 16),
+        ("BUSIEST_THREAD_CPU_USAGE", 16),
+        ("RAM_USAGE", 16),
+        ("RAM_CAPACITY", 16),
+        ("ACTIVE_THREADS", 16),
+        ("FLASH_USAGE", 16),
+        ("FLASH_CAPACITY", 16),
+        ("SD_CARD_USAGE", 32),
+        ("SD_CARD_CAPACITY", 32)
+    ]
 
+    SAMPLE_INTERVAL = 1.0  # Seconds between samples
+    FLASH_PATH = "/"  # Mount point of the eMMC
+    SD_CARD_PATH = "/media/card"  # Mount point of the SD card
+
+    telemetry = dict((name, 0) for name, bits in FIELDS)
+    telemetry["VERSION"] = VERSION
+    threadUsage = {}  # Thread id -> CPU usage since the last sample
+
+    _data = None
+    _lastCPU = None  # (busy, total) jiffies of all cores
+    _lastTasks = {}  # Thread id -> jiffies
+    _cores = 1
+    _thread = None
+    _lock = threading.Lock()
+
+    # Takes the first sample and starts sampling on a thread
     @classmethod
     def initializeTelemetry(cls):
-        cls.telemetry["ACTIVE_THREADS"] = (threading.active_count(), cls.telemetry["ACTIVE_THREADS"][1])
+        cls._cores = max(1, cls._countCores())
+        cls.updateTelemetry()
+        if cls._thread is None:
+            cls._thread = threading.Thread(target=cls._sampleOnThread, name="SystemTelemetry")
+            cls._thread.daemon = True
+            cls._thread.start()
+
+    @classmethod
+    def _sampleOnThread(cls):
+        while True:
+            hal.sleep(cls.SAMPLE_INTERVAL)
+            cls.updateTelemetry()
 
+    # Samples every field now and encodes the packet data
     @classmethod
     def updateTelemetry(cls):
-        cls.telemetry["ACTIVE_THREADS"] = (threading.active_count(), cls.telemetry["ACTIVE_THREADS"][1])
+        with cls._lock:
+            telemetry = dict(cls.telemetry)
+            coreDelta = cls._sampleCPU(telemetry)
+            cls._sampleThreads(telemetry, coreDelta)
+            cls._sampleMemory(telemetry)
+            telemetry["FLASH_USAGE"], telemetry["FLASH_CAPACITY"] = cls._diskUsage(cls.FLASH_PATH)
+            telemetry["SD_CARD_USAGE"], telemetry["SD_CARD_CAPACITY"] = cls._diskUsage(cls.SD_CARD_PATH)
+            telemetry["ACTIVE_THREADS"] = threading.active_count()
+            data = ""
+            for name, bits in cls.FIELDS:
+                # Saturate instead of overflowing into the next field
+                value = min(max(int(telemetry[name]), 0), (1 << bits) - 1)
+                data += Util.inttobin(value, bits)
+            cls.telemetry = telemetry
+            cls._data = data
 
+    # Returns the encoded fields of the latest sample
     @classmethod
     def getTelemetryData(cls):
-        data = ""
-        telemetry_keys = cls.telemetry.keys()
-        for i in range(0, len(telemetry_keys)):
-            data += Util.inttobin(cls.telemetry[telemetry_keys[i]][0], cls.telemetry[telemetry_keys[i]][1])
-        return data
+        if cls._data is None:
+            cls.updateTelemetry()
+        return cls._data
+
+    # Sets CPU_USAGE, returns the jiffies of one core since the last sample
+    @classmethod
+    def _sampleCPU(cls, telemetry):
+        try:
+            with open(PROC_STAT) as stat:
+                fields = [int(field) for field in stat.readline().split()[1:]]
+        except (IOError, ValueError):
+            return 0
+        # user, nice, system, idle, iowait, irq, softirq, steal...
+        idle = sum(fields[3:5])
+        total = sum(fields[:8])
+        delta = 0
+        if cls._lastCPU is not None:
+            busyDelta = (total - idle) - cls._lastCPU[0]
+            delta = total - cls._lastCPU[1]
+            if delta > 0:
+                telemetry["CPU_USAGE"] = 10000 * busyDelta / delta
+        cls._lastCPU = (total - idle, total)
+        return float(delta) / cls._cores
+
+    # Sets the CPU usage of the process and its busiest thread from the
+    # jiffies each thread used over the jiffies of one core
+    @classmethod
+    def _sampleThreads(cls, telemetry, coreDelta):
+        tasks = {}
+        try:
+            taskIDs = os.listdir(PROC_TASKS)
+        except OSError:
+            return
+        for taskID in taskIDs:
+            try:
+                with open(os.path.join(PROC_TASKS, taskID, "stat")) as stat:
+                    # The name in parentheses can contain spaces
+                    fields = stat.read().rsplit(")", 1)[1].split()
+                # utime and stime
+                tasks[taskID] = int(fields[11]) + int(fields[12])
+            except (IOError, IndexError, ValueError):
+                pass
+        usage = {}
+        if coreDelta > 0:
+            for taskID, jiffies in tasks.items():
+                if taskID in cls._lastTasks:
+                    usage[taskID] = 10000 * (jiffies - cls._lastTasks[taskID]) / coreDelta
+            telemetry["PROCESS_CPU_USAGE"] = sum(usage.values())
+            telemetry["BUSIEST_THREAD_CPU_USAGE"] = max(usage.values() or [0])
+        cls._lastTasks = tasks
+        cls.threadUsage = usage
+
+    # Sets RAM_USAGE and RAM_CAPACITY
+    @classmethod
+    def _sampleMemory(cls, telemetry):
+        memory = {}
+        try:
+            with open(PROC_MEMINFO) as meminfo:
+                for line in meminfo:
+                    fields = line.split()
+                    memory[fields[0].rstrip(":")] = int(fields[1])
+        except (IOError, IndexError, ValueError):
+            return
+        total = memory.get("MemTotal", 0)
+        # Older kernels, like the one of the BeagleBone, have no MemAvailable
+        available = memory.get("MemAvailable",
+                               memory.get("MemFree", 0) + memory.get("Buffers", 0) + memory.get("Cached", 0))
+        telemetry["RAM_USAGE"] = (total - available) / 1024
+        telemetry["RAM_CAPACITY"] = total / 1024
+
+    # Returns the used and total megabytes of the file system at path, zeros if it isn't mounted
+    @classmethod
+    def _diskUsage(cls, path):
+        if not os.path.ismount(path):
+            return 0, 0
+        try:
+            stats = os.statvfs(path)
+        except OSError:
+            return 0, 0
+        total = stats.f_blocks * stats.f_frsize
+        free = stats.f_bfree * stats.f_frsize
+        return (total - free) / (1 << 20), total / (1 << 20)
+
+    @classmethod
+    def _countCores(cls):
+        try:
+            with open(PROC_STAT) as stat:
+                return len([line for line in stat if line.startswith("cpu") and line[3].isdigit()])
+        except IOError:
+            return 1
@@ -8,9 +8,9 @@ This code has been tested.
 
 """
 import Error
-import time
+import math
+import hal
 import Util
-import Adafruit_MAX31855.MAX31855 as MAX31855
 from Sensor import Sensor
 
 
@@ -20,7 +20,7 @@ class Thermocouple(Sensor):
         self._device = None
         self.critical_status = False
         try:
-            self._device = MAX31855.MAX31855(clock, cs, data)
+            self._device = hal.max31855(clock, cs, data)
         except:
             # Throw "Communication Failure"
             Error.throw(0x0108, "Could not initialize thermocouple communications")
@@ -42,15 +42,14 @@ class Thermocouple(Sensor):
         self.checkError()
         if self.critical_status:
             return 0
-        self.checkError()
-        time.sleep(0.01)
+        hal.sleep(0.01)
         internal_temp = 0
         try:
             internal_temp = self._device.readInternalC()
         except:
             # Throw "Could not get internal reading"
             Error.throw(0x0102)
-        if not Util.isValidUnsigned(internal_temp):
+        if not isValidTemp(internal_temp):
             # Throw "Reading Invalid"
             Error.throw(0x0103)
         return internal_temp
@@ -59,17 +58,17 @@ class Thermocouple(Sensor):
         self.checkError()
         if self.critical_status:
             return 0
-        time.sleep(0.01)
+        hal.sleep(0.01)
         temp = 0
         try:
             temp = self._device.readTempC()
         except:
             # Throw "Could not get reading"
             Error.throw(0x0101)
-        if not Util.isValidUnsigned(temp):
+        if not isValidTemp(temp):
             # Throw "Invalid Reading"
             Error.throw(0x0103)
-        return self._device.readTempC()
+        return temp
 
     # Returns true if error detected, false
     # if otherwise. Sets critical status to
@@ -79,18 +78,18 @@ class Thermocouple(Sensor):
         if self.critical_status:
             return True
         status = self._device.readState()
-        if status == '':
+        if not any(status.values()):
             return False
-        if status == 'openCircuit':
+        if status['openCircuit']:
             # Throw "Open Circuit" failure
             Error.throw(0x0104)
-        if status == 'shortGND':
+        if status['shortGND']:
             # Throw "GND Short" failure
             Error.throw(0x0105)
-        if status == 'shortVCC':
+        if status['shortVCC']:
             # Throw "VCC Short" failure
             Error.throw(0x0106)
-        if status == 'fault':
+        if status['fault']:
             # Throw "General Failure"
             Error.throw(0x0107)
 
@@ -104,4 +103,10 @@ class Thermocouple(Sensor):
         raw = self.getRawData() >> 4  # Get rid of status bits
         internalTemp = raw & 0x7FF  # Grab last 11 bits (internal temp reading)
         thermocoupleTemp = raw >> 14  # Grab thermocouple reading
-        return Util.inttobin((thermocoupleTemp << 11) & internalTemp, 32)
+        return Util.inttobin((thermocoupleTemp << 11) | internalTemp, 32)
+
+
+# Temperatures can be below zero, the MAX31855 library
+# returns NaN when the thermocouple reports a fault
+def isValidTemp(temp):
+    return isinstance(temp, (int, float)) and not math.isnan(temp)
@@ -7,7 +7,7 @@ This code has been tested.
 """
 import Util
 import Error
-import Adafruit_GPIO.I2C as I2C
+import hal
 from Sensor import Sensor
 
 
@@ -23,8 +23,8 @@ class UV(Sensor):
         self._uvl = None
         self._uvm = None
         try:
-            self._uvl = I2C.Device(LSB_ADDR, I2C.get_default_bus())
-            self._uvm = I2C.Device(LSB_ADDR + 1, I2C.get_default_bus())
+            self._uvl = hal.i2c(LSB_ADDR)
+            self._uvm = hal.i2c(LSB_ADDR + 1)
         except:
             # Throw "Communication Failure"
             self.critical_status = True
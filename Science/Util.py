@@ -107,6 +107,7 @@ Sets the status of the on board ADC to the given boolean value.
 TESTED? No
 """
 def setADC_Status(status):
+    global ADC_SETUP
     ADC_SETUP = status
 
 
@@ -0,0 +1,87 @@
+"""
+Benchmarks of the packet serialization of the Science board.
+
+Run by benchmark.py at the root of the repository or on its own:
+
+    python benchmark_science.py [--repeat 5]
+
+Packets are built the way Packet.send() builds them, without the socket.
+Nothing touches the board, the system telemetry case reads /proc.
+
+"""
+import os
+import sys
+from contextlib import contextmanager
+import Util
+import Parse
+import Error
+from CommHandler import Message
+from Packet import Packet, PacketType, AuxCtrlID
+from SystemTelemetry import SystemTelemetry
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import benchmark
+
+# Error codes thrown for the summary packet, as many as fit in one
+ERROR_CODES = range(0x0100, 0x0100 + Error.MAX_BATCH)
+
+
+# Sends stderr to /dev/null, Error writes every code it hasn't seen lately
+@contextmanager
+def quiet():
+    stderr = sys.stderr
+    sys.stderr = open(os.devnull, "w")
+    try:
+        yield
+    finally:
+        sys.stderr.close()
+        sys.stderr = stderr
+
+
+# Returns the bytes Packet.send() would send
+def serialize(packet):
+    packet.addTimeID()
+    return Util.full_bin_to_chr(packet._data)
+
+
+# Builds a Primary Sensor packet of four 32 bit readings
+def sensorPacket():
+    packet = Packet(PacketType.PrimarySensor)
+    packet.appendData(Util.inttobin(1234, 32) + Util.inttobin(56, 32) +
+                      Util.inttobin(0x12345678, 32) + Util.inttobin(789, 32))
+    return serialize(packet)
+
+
+# Throws every code once and builds the Error packet with them
+def errorPacket():
+    for code in ERROR_CODES:
+        Error.throw(code)
+    return serialize(Error.getSummaryPacket())
+
+
+def cases(repeat):
+    Parse.setupParsing()
+    control = Packet(PacketType.AuxControl)
+    control.appendData(Util.inttobin(AuxCtrlID.DrillRPM, 8) + Util.inttobin(60, 32))
+    controlData = serialize(control)
+    SystemTelemetry.updateTelemetry()
+    telemetryData = SystemTelemetry.getTelemetryData()
+
+    results = [
+        benchmark.measure("inttobin 32 bits", lambda: Util.inttobin(0x12345678, 32), repeat=repeat),
+        benchmark.measure("full_bin_to_chr telemetry", lambda: Util.full_bin_to_chr(telemetryData),
+                          repeat=repeat),
+        benchmark.measure("primary sensor packet", sensorPacket, repeat=repeat),
+        benchmark.measure("parse aux control packet", lambda: Parse.parse(Message(controlData, None)),
+                          repeat=repeat),
+        benchmark.measure("system telemetry sample", SystemTelemetry.updateTelemetry, repeat=repeat),
+    ]
+    with quiet():
+        results.append(benchmark.measure("throw repeated error", lambda: Error.throw(0x0301), repeat=repeat))
+        results.append(benchmark.measure("error packet of %d codes" % len(ERROR_CODES), errorPacket,
+                                         repeat=repeat))
+    return results
+
+
+if __name__ == "__main__":
+    benchmark.main(cases, "Benchmarks the packet serialization of the Science board")
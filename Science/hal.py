@@ -0,0 +1,100 @@
+"""
+Hardware abstraction layer of the Science board
+
+Sensors, motors and commands get the ADC, GPIO, PWM, I2C devices, the
+thermocouple amplifier, the distance sensor and the clock from here instead
+of importing the BeagleBone libraries themselves. The hardware backend
+imports those libraries on first use, so the Science modules can be imported
+anywhere, and use() swaps in another backend such as sim.SimBackend to run
+the Science process without the board.
+
+Call use() before Main.setup() or before creating any sensor, motor or
+command, they open their devices when they are created.
+
+"""
+import time as _time
+
+
+class HardwareBackend(object):
+
+    # The Beaglebone: Adafruit libraries and the system clock
+
+    def time(self):
+        return _time.time()
+
+    def sleep(self, seconds):
+        _time.sleep(seconds)
+
+    # Returns Adafruit_BBIO.ADC, with setup() and read(pin)
+    def adc(self):
+        import Adafruit_BBIO.ADC as ADC  # Ignore compilation errors
+        return ADC
+
+    # Returns Adafruit_BBIO.GPIO, with setup(), input(), output() and wait_for_edge()
+    def gpio(self):
+        import Adafruit_BBIO.GPIO as GPIO  # Ignore compilation errors
+        return GPIO
+
+    # Returns PWM outputs with start(), set_duty_cycle(), set_frequency() and stop()
+    def pwm(self):
+        import Adafruit_GPIO.PWM as PWM
+        return PWM.BBIO_PWM_Adapter(PWM.get_platform_pwm())
+
+    # Returns the I2C device at the address, on the default bus if none is given
+    def i2c(self, address, busnum=None):
+        import Adafruit_GPIO.I2C as I2C
+        if busnum is None:
+            busnum = I2C.get_default_bus()
+        return I2C.Device(address, busnum)
+
+    # Returns the MAX31855 thermocouple amplifier on software SPI pins
+    def max31855(self, clk, cs, do):
+        import Adafruit_MAX31855.MAX31855 as MAX31855
+        return MAX31855.MAX31855(clk, cs, do)
+
+    # Returns the VL53L0X Time-of-Flight Distance Sensor at the address
+    def tof(self, address=0x29):
+        # Importing opens the I2C bus and loads the ST library
+        import VL53L0X
+        return VL53L0X.VL53L0X(address)
+
+
+backend = HardwareBackend()
+
+
+# Every Science module uses new_backend from now on
+def use(new_backend):
+    global backend
+    backend = new_backend
+
+
+def time():
+    return backend.time()
+
+
+def sleep(seconds):
+    backend.sleep(seconds)
+
+
+def adc():
+    return backend.adc()
+
+
+def gpio():
+    return backend.gpio()
+
+
+def pwm():
+    return backend.pwm()
+
+
+def i2c(address, busnum=None):
+    return backend.i2c(address, busnum)
+
+
+def max31855(clk, cs, do):
+    return backend.max31855(clk, cs, do)
+
+
+def tof(address=0x29):
+    return backend.tof(address)
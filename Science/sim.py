@@ -0,0 +1,500 @@
+"""
+Simulated Science board
+
+SimBackend stands in for the Beaglebone and everything wired to it, so
+Main, the sensors and the commands run unchanged on any Linux machine:
+
+    board = sim.SimScience(sim.ScaledClock(speed=10))
+    hal.use(sim.SimBackend(board))
+
+SimScience models the drill spindle that DrillCtrl drives and the first
+encoder reads, the lead screw that MoveDrill drives to raise and lower the
+drill, read by the distance sensor, the limit switches at the ends of its
+travel and a thermocouple in the drill bit that heats up while it drills.
+The UV, humidity and temperature signals can be replaced by scripted ones,
+and faults are injected by the Error code the Science code should throw
+for them.
+
+Time runs on a ScaledClock, in real time or a number of times faster.
+Devices take about as long to read as the real ones, which paces the main
+loop like on the board.
+
+"""
+import math
+import random
+import threading
+import time as _time
+
+import Adafruit_GPIO.PWM as PWM
+import Adafruit_MAX31855.MAX31855 as MAX31855
+
+START_TIME = 1500000000.0
+
+# Faults injectFault() accepts, by the Error code they should cause
+FAULTS = {
+    0x0001: "ADC fails to set up",
+    0x0002: "Limit switch and relay pins fail to set up",
+    0x0003: "Limit switch pins can't be read",
+    0x0101: "Thermocouple temperature can't be read",
+    0x0102: "Thermocouple internal temperature can't be read",
+    0x0104: "Thermocouple open circuit",
+    0x0105: "Thermocouple shorted to GND",
+    0x0106: "Thermocouple shorted to VCC",
+    0x0107: "Thermocouple amplifier fault",
+    0x0108: "Thermocouple amplifier doesn't respond",
+    0x0201: "UV sensor can't be read",
+    0x0202: "UV sensor reads nothing",
+    0x0203: "UV sensor doesn't respond",
+    0x0301: "Distance sensor can't be read",
+    0x0302: "Distance sensor reads nothing",
+    0x0303: "Distance sensor doesn't respond",
+    0x0304: "Distance sensor fails to start ranging",
+    0x0401: "Humidity sensor can't be read",
+    0x0402: "Humidity sensor reads below zero",
+}
+
+# Timing budget in seconds of each VL53L0X mode, see VL53L0X.py
+RANGING_BUDGETS = {0: 0.033, 1: 0.066, 2: 0.2, 3: 0.033, 4: 0.02}
+
+# Levels of channels A and B for each quarter of an encoder cycle,
+# in the order Encoder counts as clockwise
+QUADRATURE = ((0, 0), (1, 0), (1, 1), (0, 1))
+
+
+class ScaledClock(object):
+
+    # Simulated time that runs speed times faster than real time
+    def __init__(self, speed=1.0, start=START_TIME):
+        self.speed = float(speed)
+        self.start = start
+        self._realStart = _time.time()
+
+    def time(self):
+        return self.start + (_time.time() - self._realStart) * self.speed
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            _time.sleep(seconds / self.speed)
+
+    # Returns simulated seconds since the clock started
+    def elapsed(self):
+        return self.time() - self.start
+
+
+class SimScience(object):
+
+    # Wiring, the same as Main
+    DRILL_MOTOR_PIN = "P8_13"
+    ROTATE_MOTOR_PIN = "P8_46"
+    ARMATURE_MOTOR_PIN = "P8_19"
+    DRILL_ENCODER_PINS = ("P8_22", "P8_24")
+    ROTATE_ENCODER_PINS = ("P8_28", "P8_30")
+    TOP_LIMIT_PIN = "P8_12"
+    BOTTOM_LIMIT_PIN = "P8_10"
+    HOME_LIMIT_PIN = "P8_8"
+    RELAY_PIN = "P9_15"
+    HUMIDITY_PIN = "AIN1"
+    UV_ADDRESS = 0x38
+    ENCODER_PPR = 220
+
+    # Drill spindle
+    DRILL_MAX_RPM = 120.0  # At full power in the air
+    DRILL_TIME_CONSTANT = 0.4  # Seconds to get most of the way to a new speed
+    SOIL_LOAD = 0.5  # Fraction of the speed lost with the whole bit in the soil
+
+    # Lead screw lowering the drill, the motor code has no reverse to raise it yet
+    ARMATURE_SPEED = 20.0  # mm/s at full power
+    SOIL_DRAG = 0.5  # Fraction of the speed lost with the bit in the soil
+    MIN_HEIGHT = 50.0  # mm from the distance sensor to the ground at the ends of the travel
+    MAX_HEIGHT = 400.0
+    BIT_LENGTH = 150.0  # Height at which the bit touches the ground
+
+    # Rotation of the armature
+    ROTATE_SPEED = 30.0  # degrees/s at full power
+    HOME_TOLERANCE = 2.0  # degrees either side of 0 where the home switch is pressed
+
+    # Thermocouple in the drill bit
+    HEATING = 2.0  # degrees C/s at full speed with the whole bit in the soil
+    COOLING_TIME_CONSTANT = 30.0  # Seconds
+
+    # Seconds each device takes to read
+    ADC_LATENCY = 0.0001
+    I2C_LATENCY = 0.0003  # One byte at 100 kHz
+    SPI_LATENCY = 0.002  # 32 bits of software SPI
+
+    # Longest wait between checks for an encoder edge, in seconds
+    EDGE_POLL = 0.05
+
+    def __init__(self, clock=None, seed=0, noise=1.0, height=300.0):
+        self.clock = clock if clock is not None else ScaledClock()
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.noise = noise
+        self.signals = {}  # name -> function of elapsed seconds, see signal()
+        self.faults = []  # (Error code, start, end) in elapsed seconds
+        self.duties = {}  # PWM pin -> duty cycle of the started pins
+        self.outputs = {}  # GPIO pin -> level written
+
+        self.drillRpm = 0.0
+        self.drillAngle = 0.0  # radians
+        self.height = float(height)  # mm
+        self.rotation = 0.0  # degrees
+        self.bitTemperature = self.signal("ambient", 20.0)
+
+        self._lock = threading.RLock()
+        self._lastUpdate = self.clock.time()
+
+    # Replaces a physical signal with function(elapsed seconds):
+    # "uv" raw UV counts, "humidity" ADC reading from 0 to 1,
+    # "ambient" and "board" temperatures in degrees C
+    def script(self, name, function):
+        self.signals[name] = function
+
+    def signal(self, name, default):
+        if name in self.signals:
+            return self.signals[name](self.clock.elapsed())
+        return default
+
+    # Makes the devices fail in the way that should make the Science code
+    # throw errorCode, from start to end seconds after the clock started
+    def injectFault(self, errorCode, start=0.0, end=None):
+        if errorCode not in FAULTS:
+            raise ValueError("No simulated fault for Error code " + hex(errorCode))
+        self.faults.append((errorCode, start, end))
+
+    def faultActive(self, errorCode):
+        now = self.clock.elapsed()
+        for code, start, end in self.faults:
+            if code == errorCode and start <= now and (end is None or now < end):
+                return True
+        return False
+
+    def gauss(self, sigma):
+        with self._lock:
+            return self.random.gauss(0, sigma * self.noise) if self.noise else 0.0
+
+    # Fraction of the drill bit in the soil
+    def depth(self):
+        return max(0.0, min(1.0, (self.BIT_LENGTH - self.height) / (self.BIT_LENGTH - self.MIN_HEIGHT)))
+
+    # Returns power from 0 to 1 of the motor controller on a PWM pin
+    def power(self, pin):
+        return self.duties.get(pin, 0.0) / 100.0
+
+    def setDuty(self, pin, dutyCycle):
+        with self._lock:
+            self.update()  # The old duty cycle applies until now
+            if dutyCycle is None:
+                self.duties.pop(pin, None)
+            else:
+                self.duties[pin] = dutyCycle
+
+    # Moves the plant to the current time
+    def update(self):
+        with self._lock:
+            now = self.clock.time()
+            dt = now - self._lastUpdate
+            self._lastUpdate = now
+            steps = int(math.ceil(dt / 0.01))
+            for i in range(steps):
+                self._integrate(dt / steps)
+
+    def _integrate(self, dt):
+        depth = self.depth()
+        target = self.power(self.DRILL_MOTOR_PIN) * self.DRILL_MAX_RPM * (1 - self.SOIL_LOAD * depth)
+        self.drillRpm += (target - self.drillRpm) * min(1.0, dt / self.DRILL_TIME_CONSTANT)
+        self.drillAngle += self.drillRpm * 2 * math.pi / 60 * dt
+
+        speed = self.power(self.ARMATURE_MOTOR_PIN) * self.ARMATURE_SPEED
+        if depth > 0:
+            speed *= 1 - self.SOIL_DRAG
+        self.height = max(self.MIN_HEIGHT, min(self.MAX_HEIGHT, self.height - speed * dt))
+
+        self.rotation += self.power(self.ROTATE_MOTOR_PIN) * self.ROTATE_SPEED * dt
+
+        ambient = self.signal("ambient", 20.0)
+        heating = self.HEATING * self.drillRpm / self.DRILL_MAX_RPM * depth
+        self.bitTemperature += (heating + (ambient - self.bitTemperature) / self.COOLING_TIME_CONSTANT) * dt
+
+    # Returns the angle in radians and encoder channel of a pin, None if no encoder is on it
+    def _encoder(self, pin):
+        if pin in self.DRILL_ENCODER_PINS:
+            return self.drillAngle, self.DRILL_ENCODER_PINS.index(pin)
+        if pin in self.ROTATE_ENCODER_PINS:
+            return math.radians(self.rotation), self.ROTATE_ENCODER_PINS.index(pin)
+        return None
+
+    # Returns the level of a GPIO input
+    def level(self, pin):
+        with self._lock:
+            self.update()
+            if pin == self.TOP_LIMIT_PIN:
+                return int(self.height >= self.MAX_HEIGHT)
+            if pin == self.BOTTOM_LIMIT_PIN:
+                return int(self.height <= self.MIN_HEIGHT)
+            if pin == self.HOME_LIMIT_PIN:
+                return int(abs(self.rotation) <= self.HOME_TOLERANCE)
+            encoder = self._encoder(pin)
+            if encoder is not None:
+                angle, channel = encoder
+                step = int(math.floor(angle / (2 * math.pi) * self.ENCODER_PPR))
+                return QUADRATURE[step % 4][channel]
+            return self.outputs.get(pin, 0)
+
+    # Returns simulated seconds until an encoder pin may change, None if it isn't moving
+    def timeToNextStep(self, pin):
+        with self._lock:
+            if pin in self.DRILL_ENCODER_PINS:
+                rate = self.drillRpm / 60.0
+            elif pin in self.ROTATE_ENCODER_PINS:
+                rate = self.power(self.ROTATE_MOTOR_PIN) * self.ROTATE_SPEED / 360.0
+            else:
+                return None
+            if abs(rate) < 1e-6:
+                return None
+            return 1.0 / (abs(rate) * self.ENCODER_PPR)
+
+    # Returns the state of the plant
+    def state(self):
+        with self._lock:
+            self.update()
+            return {
+                "drill_rpm": self.drillRpm,
+                "height": self.height,
+                "depth": self.depth(),
+                "rotation": self.rotation,
+                "bit_temperature": self.bitTemperature,
+            }
+
+
+class SimADC(object):
+
+    # Adafruit_BBIO.ADC reading the humidity sensor
+
+    def __init__(self, board):
+        self.board = board
+
+    def setup(self):
+        if self.board.faultActive(0x0001):
+            raise RuntimeError("Unable to setup ADC system")
+
+    # Returns the reading from 0 to 1 (0 to 1.8 V)
+    def read(self, pin):
+        self.board.clock.sleep(self.board.ADC_LATENCY)
+        if pin != self.board.HUMIDITY_PIN:
+            return 0.0
+        if self.board.faultActive(0x0401):
+            raise RuntimeError("Unable to read ADC")
+        if self.board.faultActive(0x0402):
+            return -1.0
+        with self.board._lock:
+            self.board.update()
+            humidity = 0.25 + 0.35 * self.board.depth()
+        humidity = self.board.signal("humidity", humidity) + self.board.gauss(0.005)
+        return max(0.0, min(1.0, humidity))
+
+
+class SimGPIO(object):
+
+    # Adafruit_BBIO.GPIO wired to the limit switches, encoders and microscope relay
+
+    IN = 1
+    OUT = 0
+    HIGH = 1
+    LOW = 0
+    RISING = 1
+    FALLING = 2
+    BOTH = 3
+
+    def __init__(self, board):
+        self.board = board
+
+    def _isLimit(self, pin):
+        return pin in (self.board.TOP_LIMIT_PIN, self.board.BOTTOM_LIMIT_PIN, self.board.HOME_LIMIT_PIN)
+
+    def setup(self, pin, direction):
+        if (self._isLimit(pin) or pin == self.board.RELAY_PIN) and self.board.faultActive(0x0002):
+            raise RuntimeError("Unable to setup " + pin)
+
+    def input(self, pin):
+        if self._isLimit(pin) and self.board.faultActive(0x0003):
+            raise RuntimeError("Unable to read " + pin)
+        return self.board.level(pin)
+
+    def output(self, pin, value):
+        with self.board._lock:
+            self.board.outputs[pin] = value
+
+    # Waits for the pin to change, checking again when the next encoder step is due
+    def wait_for_edge(self, pin, edge):
+        start = self.board.level(pin)
+        while True:
+            level = self.board.level(pin)
+            if (edge == self.RISING and level == 1) or (edge == self.FALLING and level == 0) or \
+                    (edge == self.BOTH and level != start):
+                return
+            wait = self.board.timeToNextStep(pin)
+            if wait is None or wait > self.board.EDGE_POLL:
+                wait = self.board.EDGE_POLL
+            self.board.clock.sleep(wait)
+
+
+class SimPWM(object):
+
+    # Adafruit_BBIO.PWM driving the motor controllers and the focus servo
+
+    def __init__(self, board):
+        self.board = board
+
+    def start(self, pin, dutycycle, frequency_hz=2000):
+        self.board.setDuty(pin, dutycycle)
+
+    def set_duty_cycle(self, pin, dutycycle):
+        self.board.setDuty(pin, dutycycle)
+
+    def set_frequency(self, pin, frequency_hz):
+        pass
+
+    def stop(self, pin):
+        self.board.setDuty(pin, None)
+
+
+class SimUVDevice(object):
+
+    # Adafruit_GPIO.I2C.Device of the UV sensor, the low byte at
+    # UV_ADDRESS and the high byte at the address after it
+
+    def __init__(self, board, address):
+        if board.faultActive(0x0203):
+            raise IOError("No device at " + hex(address))
+        self.board = board
+        self.address = address
+
+    def writeRaw8(self, value):
+        self.board.clock.sleep(self.board.I2C_LATENCY)
+
+    def readRaw8(self):
+        self.board.clock.sleep(self.board.I2C_LATENCY)
+        if self.board.faultActive(0x0201):
+            raise IOError("I2C read failed")
+        if self.board.faultActive(0x0202):
+            return 0
+        counts = self.board.signal("uv", 400.0) * (1 + self.board.gauss(0.02))
+        counts = max(0, min(0xFFFF, int(round(counts))))
+        if self.address == self.board.UV_ADDRESS:
+            return counts & 0xFF
+        return counts >> 8
+
+
+class SimMAX31855(MAX31855.MAX31855):
+
+    # The thermocouple amplifier, the library decodes what _read32() returns
+
+    def __init__(self, board):
+        if board.faultActive(0x0108):
+            raise IOError("MAX31855 doesn't respond")
+        self.board = board
+
+    def _read32(self):
+        self.board.clock.sleep(self.board.SPI_LATENCY)
+        if self.board.faultActive(0x0108):
+            raise IOError("MAX31855 doesn't respond")
+        with self.board._lock:
+            self.board.update()
+            temperature = self.board.bitTemperature
+        temperature += self.board.gauss(0.25)
+        internal = self.board.signal("board", 35.0) + self.board.gauss(0.0625)
+
+        value = (int(round(temperature * 4)) & 0x3FFF) << 18
+        value |= (int(round(internal * 16)) & 0xFFF) << 4
+        for bit, code in enumerate((0x0104, 0x0105, 0x0106)):
+            if self.board.faultActive(code):
+                value |= 1 << bit
+        if value & 0x7 or self.board.faultActive(0x0107):
+            value |= 1 << 16
+        return value
+
+    def readTempC(self):
+        if self.board.faultActive(0x0101):
+            raise IOError("MAX31855 read failed")
+        return MAX31855.MAX31855.readTempC(self)
+
+    def readInternalC(self):
+        if self.board.faultActive(0x0102):
+            raise IOError("MAX31855 read failed")
+        return MAX31855.MAX31855.readInternalC(self)
+
+
+class SimVL53L0X(object):
+
+    # VL53L0X.VL53L0X looking down at the ground from the drill carriage
+
+    def __init__(self, board, address=0x29):
+        if board.faultActive(0x0303):
+            raise IOError("No VL53L0X at " + hex(address))
+        self.board = board
+        self.address = address
+        self.budget = None
+        self.rangingStart = None
+
+    def start_ranging(self, mode=0):
+        if self.board.faultActive(0x0304):
+            raise IOError("VL53L0X failed to start ranging")
+        self.budget = RANGING_BUDGETS.get(mode, RANGING_BUDGETS[0])
+        self.rangingStart = self.board.clock.time()
+
+    def stop_ranging(self):
+        self.rangingStart = None
+
+    # Waits for the next measurement like the library does in continuous mode
+    def get_distance(self):
+        clock = self.board.clock
+        if self.rangingStart is None:
+            clock.sleep(RANGING_BUDGETS[0])
+        else:
+            measured = clock.time() - self.rangingStart
+            clock.sleep(self.budget - measured % self.budget)
+        if self.board.faultActive(0x0301):
+            raise IOError("VL53L0X read failed")
+        if self.board.faultActive(0x0302):
+            return 0
+        with self.board._lock:
+            self.board.update()
+            height = self.board.height
+        return max(1, int(round(height + self.board.gauss(3.0))))
+
+
+class SimBackend(object):
+
+    # Backend of hal running the Science code against a SimScience board
+
+    def __init__(self, board):
+        self.board = board
+        self.clock = board.clock
+        self._adc = SimADC(board)
+        self._gpio = SimGPIO(board)
+
+    def time(self):
+        return self.clock.time()
+
+    def sleep(self, seconds):
+        self.clock.sleep(seconds)
+
+    def adc(self):
+        return self._adc
+
+    def gpio(self):
+        return self._gpio
+
+    def pwm(self):
+        # The adapter checks the duty cycles like on the board
+        return PWM.BBIO_PWM_Adapter(SimPWM(self.board))
+
+    def i2c(self, address, busnum=None):
+        return SimUVDevice(self.board, address)
+
+    def max31855(self, clk, cs, do):
+        return SimMAX31855(self.board)
+
+    def tof(self, address=0x29):
+        return SimVL53L0X(self.board, address)
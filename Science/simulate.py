@@ -0,0 +1,227 @@
+"""
+Runs the Science process against the simulated board
+
+Main sets up the sensors, commands and communications on sim.SimBackend
+and its main loop runs for the given simulated time. A stand-in for the
+base station receives the packets, counts them by type and sends the
+commands given with --command to the receive port like the base station
+would.
+
+    python simulate.py [--seconds 30] [--speed 1] [--seed 0]
+                       [--command 1:DrillRPM=60] [--fault 0x0301@5-10]
+                       [--drill-gains KP KI KD] [--armature-gains KP KI KD] [--profile]
+
+Commands are TIME:NAME=VALUE with NAME from Packet.AuxCtrlID or
+Packet.SysCtrlID, e.g. 5:Profile=1 starts the profiler, faults are
+an Error code from sim.FAULTS with an optional @START-END in seconds.
+Prints the cycle time of the main loop, the packets the base station got,
+the errors thrown and the state of the drill as JSON. --profile profiles
+the whole run, see Profiler.py.
+
+The gains of Main aren't tuned yet, so DrillCtrl and MoveDrill run with
+SIM_DRILL_GAINS and SIM_ARMATURE_GAINS unless others are given. With the
+default commands the drill ends up spinning at about 47 RPM, 97 mm above
+the ground with half of the bit in the soil.
+
+Real time (--speed 1) gives the cycle times of the board, a faster clock
+also makes the Science code itself look that much slower.
+
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+import hal
+import sim
+import Profiler
+import Util
+
+# Commands sent when none are given: spin the drill up and lower it into the soil
+DEFAULT_COMMANDS = ["1:DrillRPM=60", "1:MoveDrill=100"]
+
+# Gains used when none are given, Main.DRILL_GAINS and ARMATURE_GAINS are all 0 until the board is tuned.
+# Proportional only, PID.setTarget() clears the integral every run. The armature gain is negative since
+# power lowers the drill, and the drill settles short of its setpoint without an integral.
+SIM_DRILL_GAINS = (0.05, 0, 0)
+SIM_ARMATURE_GAINS = (-0.05, 0, 0)
+
+
+class BaseStation(object):
+
+    # Receives the packets of the Science process, one connection each
+
+    def __init__(self, address="127.0.0.1"):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind((address, 0))
+        self.server.listen(64)
+        self.address = self.server.getsockname()
+        self.packets = {}  # Packet type -> number received
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            try:
+                client, clientAddr = self.server.accept()
+            except socket.error:
+                return
+            data = ""
+            while True:
+                chunk = client.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+            client.close()
+            if len(data) >= 5:
+                # 32 bit timestamp then the 8 bit packet type
+                with self._lock:
+                    packetType = ord(data[4])
+                    self.packets[packetType] = self.packets.get(packetType, 0) + 1
+                    self.bytes += len(data)
+
+    def stop(self):
+        self._running = False
+        self.server.close()
+
+
+# Returns a TCP port nothing is listening on
+def freePort(address="127.0.0.1"):
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.bind((address, 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+# Parses TIME:NAME=VALUE into (time, packet type, command id, value)
+def parseCommand(text):
+    from Packet import AuxCtrlID, SysCtrlID, PacketType
+    at, assignment = text.split(":", 1)
+    name, value = assignment.split("=", 1)
+    if hasattr(AuxCtrlID, name):
+        return float(at), PacketType.AuxControl, getattr(AuxCtrlID, name), int(value)
+    return float(at), PacketType.SysControl, getattr(SysCtrlID, name), int(value)
+
+
+# Parses CODE[@START[-END]] into (Error code, start, end)
+def parseFault(text):
+    code, window = (text.split("@", 1) + [""])[:2]
+    start, end = (window.split("-", 1) + [""])[:2]
+    return int(code, 0), float(start or 0), float(end) if end else None
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run(seconds=30.0, speed=1.0, seed=0, commands=DEFAULT_COMMANDS, faults=(),
+        drillGains=SIM_DRILL_GAINS, armatureGains=SIM_ARMATURE_GAINS, profile=False):
+    clock = sim.ScaledClock(speed)
+    board = sim.SimScience(clock, seed)
+    for fault in faults:
+        board.injectFault(*parseFault(fault))
+    hal.use(sim.SimBackend(board))
+
+    # Imported after the backend is chosen, like on the board
+    import Main
+    import Error
+    from Motor import Motor
+    from Packet import Packet, PacketType
+
+    if drillGains is not None:
+        Main.DRILL_GAINS = tuple(drillGains)
+    if armatureGains is not None:
+        Main.ARMATURE_GAINS = tuple(armatureGains)
+
+    baseStation = BaseStation()
+    receivePort = freePort()
+    commHandling = Main.setup("127.0.0.1", baseStation.address[1], "127.0.0.1", receivePort)
+    pending = sorted(parseCommand(command) for command in commands)
+
+    realStart = time.time()
+    simStart = clock.time()
+    realCycles = []
+    simCycles = []
+    if profile:
+        Profiler.start()
+    try:
+        while clock.time() - simStart < seconds:
+            while pending and clock.time() - simStart >= pending[0][0]:
+                at, packetType, commandId, value = pending.pop(0)
+                command = Packet(packetType, "127.0.0.1", receivePort)
+                command.appendData(Util.inttobin(commandId, 8) + Util.inttobin(value, 32))
+                command.send()
+            realCycle = time.time()
+            simCycle = clock.time()
+            Main.runCycle(commHandling)
+            realCycles.append(time.time() - realCycle)
+            simCycles.append(clock.time() - simCycle)
+    finally:
+        Motor.stopAll()
+        profilePath = Profiler.stop()
+        time.sleep(0.2)  # Let the last packets arrive
+        baseStation.stop()
+
+    realSeconds = time.time() - realStart
+    simSeconds = clock.time() - simStart
+    typeNames = dict((value, name) for name, value in vars(PacketType).items() if not name.startswith("_"))
+    thrown = {}
+    for record in Error.getErrors():
+        thrown[hex(record.code)] = record.count
+    results = {
+        "sim_seconds": simSeconds,
+        "real_seconds": realSeconds,
+        "cycles": len(simCycles),
+        "cycle_rate": len(simCycles) / simSeconds,
+        "cycle_ms": {
+            "mean": sum(simCycles) / max(1, len(simCycles)) * 1000,
+            "p95": percentile(simCycles, 0.95) * 1000,
+            "max": max(simCycles or [0]) * 1000,
+            "real_mean": sum(realCycles) / max(1, len(realCycles)) * 1000,
+        },
+        "packets": dict((typeNames.get(packetType, hex(packetType)), count)
+                        for packetType, count in baseStation.packets.items()),
+        "packet_rate": sum(baseStation.packets.values()) / simSeconds,
+        "bytes": baseStation.bytes,
+        "errors": thrown,
+        "faults_seen": dict((hex(code), hex(code) in thrown) for code, start, end in board.faults),
+        "plant": board.state(),
+        "threads": threading.active_count(),
+    }
+    if profilePath is not None:
+        results["profile"] = profilePath
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the Science process against the simulated board")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Simulated time to run for")
+    parser.add_argument("--speed", type=float, default=1.0, help="Times faster than real time")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the sensor noise")
+    parser.add_argument("--command", action="append", help="TIME:NAME=VALUE, a command of the base station")
+    parser.add_argument("--fault", action="append", default=[], help="CODE[@START[-END]], a fault to inject")
+    parser.add_argument("--drill-gains", type=float, nargs=3, default=SIM_DRILL_GAINS,
+                        help="KP KI KD of DrillCtrl")
+    parser.add_argument("--armature-gains", type=float, nargs=3, default=SIM_ARMATURE_GAINS,
+                        help="KP KI KD of MoveDrill")
+    parser.add_argument("--profile", action="store_true", help="Profile the run, see Profiler.py")
+    args = parser.parse_args()
+
+    results = run(args.seconds, args.speed, args.seed, args.command or DEFAULT_COMMANDS, args.fault,
+                  args.drill_gains, args.armature_gains, args.profile)
+    print json.dumps(results, indent=4, sort_keys=True)
+    sys.stdout.flush()
+
+    # The sensor and command threads never finish, like on the board
+    os._exit(0)
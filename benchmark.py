@@ -0,0 +1,212 @@
+#! /usr/bin/env python2
+"""
+Benchmarks of the hot paths of the rover, the base station and the Science board
+
+Every suite is a benchmark_*.py script next to the code it times, listed in SUITES. Each one runs in its own
+process from its own directory, like the code it imports expects, so the rover and the Science board can have
+modules with the same names. Nothing needs hardware, the rover and the Science board run on their sim backends.
+Cases whose dependencies are missing are reported as skipped.
+
+    python benchmark.py [--suite comms] [--repeat 5] [--output results.json] [--compare old.json]
+
+The results are saved as JSON along with the commit they were measured on, benchmark-<commit>.json by default,
+and --compare prints how each case changed against an earlier file:
+
+    git checkout master && python benchmark.py --output before.json
+    git checkout my-branch && python benchmark.py --compare before.json
+
+A single suite can also be run on its own, it prints its table:
+
+    cd Science && python benchmark_science.py
+
+The suites import this module for measure() and main().
+"""
+
+from __future__ import division, print_function
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Name and script of every suite, relative to ROOT
+SUITES = [
+    ("comms", "Prototyping/BaseStation/Communications/benchmark_comms.py"),
+    ("science", "Science/benchmark_science.py"),
+    ("rover", "Prototyping/Rover/BBB/benchmark_rover.py"),
+    ("ik", "Prototyping/BaseStation/InverseKinematics/benchmark_ik.py"),
+    ("map", "Prototyping/BaseStation/ui/ui_components/map/benchmark_map.py"),
+]
+
+# Seconds one timed run of a case takes at least, the number of calls in a run is doubled until it does
+RUN_TIME = 0.05
+
+# Changes of more than this fraction are flagged by --compare
+THRESHOLD = 0.1
+
+
+def measure(name, function, calls=1, repeat=5):
+    """
+    Times a case
+    :param name: Name of the case, unique in its suite
+    :param function: Takes no arguments and runs the case
+    :param calls: Operations one call of function does, the time is per operation
+    :param repeat: Timed runs, the best one is the result
+    :return: Dictionary of the name, the best and median microseconds per operation and the operations per run
+    """
+    number = 1
+    while timeit.timeit(function, number=number) < RUN_TIME and number < 1 << 20:
+        number *= 2
+    times = sorted(timeit.repeat(function, repeat=repeat, number=number))
+    operations = number * calls
+    return {
+        "name": name,
+        "us": times[0] / operations * 1e6,
+        "median_us": times[len(times) // 2] / operations * 1e6,
+        "operations": operations,
+    }
+
+
+def skipped(name, reason):
+    """
+    :return: Result of a case that can't run here, reason is usually the ImportError
+    """
+    return {"name": name, "skipped": str(reason)}
+
+
+def print_results(results):
+    print("%-40s %12s %12s %10s" % ("case", "best us", "median us", "ops/s"))
+    for result in results:
+        if "skipped" in result:
+            print("%-40s skipped: %s" % (result["name"], result["skipped"]))
+        else:
+            print("%-40s %12.3f %12.3f %10.0f" % (result["name"], result["us"], result["median_us"],
+                                                  1e6 / result["us"] if result["us"] else float("inf")))
+
+
+def main(cases, description):
+    """
+    Entry point of a suite script
+    :param cases: Takes the number of timed runs and returns the list of results, see measure() and skipped()
+    :param description: Shown by --help
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs of each case, the best one counts")
+    parser.add_argument("--json", help="Write the results to this file instead of printing them")
+    args = parser.parse_args()
+
+    results = cases(args.repeat)
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump({"python": platform.python_version(), "results": results}, out)
+    else:
+        print_results(results)
+
+
+def run_suite(script, repeat, python):
+    """
+    Runs a suite script in its own process
+    :return: Dictionary of the python version and the results, or of the error if the script failed
+    """
+    path = os.path.join(ROOT, script)
+    handle, output = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+    try:
+        # The suites print whatever the code they time prints, keep it off our output
+        with open(os.devnull, "w") as devnull:
+            code = subprocess.call([python, path, "--repeat", str(repeat), "--json", output],
+                                   cwd=os.path.dirname(path), stdout=devnull)
+        if code != 0:
+            return {"error": "exited with %d" % code}
+        with open(output) as results:
+            return json.load(results)
+    finally:
+        os.remove(output)
+
+
+def git_commit():
+    """
+    :return: Tuple of the commit checked out, None outside of git, and whether the tree has changes
+    """
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT).decode().strip()
+        status = subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT)
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(status.strip())
+
+
+def compare(old, new, threshold=THRESHOLD):
+    """
+    Prints the change of every case in both result files
+    :return: Number of cases that got slower by more than threshold
+    """
+    print("\ncompared to %s" % (old.get("commit") or "an unknown commit")[:10])
+    print("%-50s %12s %12s %8s" % ("case", "old us", "new us", "change"))
+    slower = 0
+    for suite, suite_results in sorted(new["suites"].items()):
+        old_results = dict((result["name"], result)
+                           for result in old.get("suites", {}).get(suite, {}).get("results", []))
+        for result in suite_results.get("results", []):
+            before = old_results.get(result["name"])
+            if before is None or "us" not in before or "us" not in result:
+                continue
+            change = result["us"] / before["us"] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  slower"
+                slower += 1
+            elif change < -threshold:
+                flag = "  faster"
+            print("%-50s %12.3f %12.3f %+7.0f%%%s" % (suite + ": " + result["name"], before["us"], result["us"],
+                                                      change * 100, flag))
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the hot paths of the rover, base station and Science")
+    parser.add_argument("--suite", action="append", choices=[name for name, script in SUITES],
+                        help="Only run this suite, can be given more than once")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs of each case, the best one counts")
+    parser.add_argument("--python", default=sys.executable, help="Interpreter to run the suites with")
+    parser.add_argument("--output", help="JSON file to save the results to, benchmark-<commit>.json by default")
+    parser.add_argument("--compare", help="JSON file of earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Fraction a case has to change by for --compare to flag it")
+    args = parser.parse_args()
+
+    commit, dirty = git_commit()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "date": datetime.datetime.now().isoformat(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "suites": {},
+    }
+    for name, script in SUITES:
+        if args.suite and name not in args.suite:
+            continue
+        print("\n" + name)
+        report["suites"][name] = suite = run_suite(script, args.repeat, args.python)
+        if "error" in suite:
+            print("failed: " + suite["error"])
+        else:
+            print_results(suite["results"])
+
+    output = args.output or "benchmark-%s.json" % (commit[:10] if commit else "unknown")
+    with open(output, "w") as out:
+        json.dump(report, out, indent=4, sort_keys=True)
+    print("\nsaved to " + output)
+
+    if args.compare:
+        with open(args.compare) as old:
+            # Fails if anything got slower, so scripts can check a change
+            sys.exit(1 if compare(json.load(old), report, args.threshold) else 0)